@@ -0,0 +1,11 @@
+"""
+Scheduler micro-benchmarks.
+
+    python -m benchmarks.bench_scheduler                      # run, print table
+    python -m benchmarks.bench_scheduler --save               # refresh the baseline
+    python -m benchmarks.bench_scheduler --compare            # flag regressions
+
+Workloads are generated from a seed (`benchmarks.workload`) and anchored on a
+fixed Monday, with the schedulers' clock frozen to it, so two runs on the same
+machine time exactly the same inputs whatever the date.
+"""
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+bench_scheduler.py — timing harness for `src/scheduler.py`.
+
+Times `schedule_tasks`, `find_next_available_slot` and
+`get_next_valid_time_for_space` (plus the bitmap engine when NumPy is
+installed) on seeded workloads of 10, 100, 1k and 10k tasks. Each case is run
+`--repeat` times and the best wall-clock time is kept, which is the least noisy
+figure on a shared machine.
+
+Usage:
+    python -m benchmarks.bench_scheduler
+    python -m benchmarks.bench_scheduler --sizes 10 100 --repeat 5
+    python -m benchmarks.bench_scheduler --save                 # write baseline
+    python -m benchmarks.bench_scheduler --compare              # vs baseline
+    python -m benchmarks.bench_scheduler --compare --threshold 0.5
+
+`--compare` exits with status 1 when any case is slower than the baseline by
+more than `--threshold` (a ratio: 0.25 means 25 % slower).
+
+Space windows are weekday/hour based, so the problem depends on the clock:
+workloads and probes are anchored on `ANCHOR` (a Monday 00:00), and the
+schedulers' own `datetime.now()` is frozen to it while cases run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Make `src/` importable the same way migrate_db.py does.
+HERE = Path(__file__).resolve().parent
+SRC = HERE.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import bitmap_scheduler  # noqa: E402
+import scheduler  # noqa: E402
+from scheduler import (  # noqa: E402
+    BusyIntervals,
+    compile_space_constraints,
+    find_next_available_slot,
+    get_next_valid_time_for_space,
+    round_to_next_30min,
+    schedule_tasks,
+    task_space_key,
+)
+from bitmap_scheduler import np as _numpy, schedule_tasks_bitmap  # noqa: E402
+
+from benchmarks.workload import generate_workload  # noqa: E402
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+DEFAULT_BASELINE = HERE / "baselines" / "scheduler.json"
+DEFAULT_THRESHOLD = 0.25
+PROBES = 1000
+ANCHOR = datetime(2030, 1, 7)  # a Monday
+
+
+class _FrozenDatetime(datetime):
+    """`datetime` whose now() is always ANCHOR."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return ANCHOR
+
+
+@contextmanager
+def frozen_clock():
+    """Freeze the clock the schedulers read (`datetime.now()`) at ANCHOR."""
+    modules = (scheduler, bitmap_scheduler)
+    saved = [module.datetime for module in modules]
+    for module in modules:
+        module.datetime = _FrozenDatetime
+    try:
+        yield
+    finally:
+        for module, original in zip(modules, saved):
+            module.datetime = original
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+
+def case_schedule_tasks(workload, rng):
+    tasks, events, constraints = workload
+    return lambda: schedule_tasks(tasks, events, constraints)
+
+
+def case_schedule_tasks_bitmap(workload, rng):
+    tasks, events, constraints = workload
+    return lambda: schedule_tasks_bitmap(tasks, events, constraints)
+
+
+def case_find_next_available_slot(workload, rng):
+    """PROBES slot searches against the workload's external + frozen busy set."""
+    tasks, events, constraints = workload
+    busy = BusyIntervals(
+        [(e['start'], e['end']) for e in events] +
+        [(t.scheduled_start, t.scheduled_end) for t in tasks if t.frozen]
+    )
+    windows = compile_space_constraints(constraints)
+    now = round_to_next_30min(ANCHOR)
+    probes = [
+        (now + timedelta(minutes=30 * rng.randrange(48 * 30)),
+         timedelta(minutes=t.estimated_duration),
+         task_space_key(t, windows),
+         t.deadline)
+        for t in (rng.choice(tasks) for _ in range(PROBES))
+    ]
+
+    def run():
+        for start, duration, space, deadline in probes:
+            find_next_available_slot(start, duration, busy, space, windows, deadline)
+    return run
+
+
+def case_get_next_valid_time_for_space(workload, rng):
+    """PROBES next-window lookups spread over the workload's spaces."""
+    tasks, _, constraints = workload
+    windows = compile_space_constraints(constraints)
+    now = ANCHOR
+    probes = [
+        (now + timedelta(minutes=rng.randrange(60 * 24 * 14)), task_space_key(t, windows))
+        for t in (rng.choice(tasks) for _ in range(PROBES))
+    ]
+
+    def run():
+        for current, space in probes:
+            get_next_valid_time_for_space(current, space, windows)
+    return run
+
+
+CASES = {
+    "schedule_tasks": case_schedule_tasks,
+    "find_next_available_slot": case_find_next_available_slot,
+    "get_next_valid_time_for_space": case_get_next_valid_time_for_space,
+}
+if _numpy is not None:
+    CASES["schedule_tasks_bitmap"] = case_schedule_tasks_bitmap
+
+
+# ---------------------------------------------------------------------------
+# Run / compare
+# ---------------------------------------------------------------------------
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_benchmarks(sizes, repeat: int, seed: int, cases=None) -> dict:
+    """Return {case: {size: best seconds}} for every requested case and size."""
+    results = {}
+    with frozen_clock():
+        for size in sizes:
+            workload = generate_workload(size, seed=seed, now=ANCHOR)
+            for name, factory in CASES.items():
+                if cases and name not in cases:
+                    continue
+                fn = factory(workload, random.Random(seed))
+                results.setdefault(name, {})[str(size)] = best_of(fn, repeat)
+                print(f"[bench] {name:<32} n={size:<6} {results[name][str(size)] * 1000:10.2f} ms")
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """List of (case, size, baseline_s, current_s, ratio) slower than allowed."""
+    regressions = []
+    for name, by_size in results.items():
+        for size, current in by_size.items():
+            previous = baseline.get(name, {}).get(size)
+            if not previous:
+                continue
+            ratio = current / previous
+            if ratio > 1 + threshold:
+                regressions.append((name, size, previous, current, ratio))
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per case; the best one counts.")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--case", action="append", choices=sorted(CASES), help="Only run these cases.")
+    ap.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    ap.add_argument("--save", action="store_true", help="Write results as the new baseline.")
+    ap.add_argument("--compare", action="store_true", help="Compare against the baseline.")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="Allowed slowdown ratio before flagging (default: 0.25).")
+    args = ap.parse_args()
+
+    results = run_benchmarks(args.sizes, args.repeat, args.seed, args.case)
+
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "meta": {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "seed": args.seed,
+                "anchor": ANCHOR.isoformat(),
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        args.baseline.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n")
+        print(f"[bench] baseline written to {args.baseline}")
+
+    if args.compare:
+        if not args.baseline.exists():
+            sys.exit(f"[bench] no baseline at {args.baseline} (run with --save first)")
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, size, previous, current, ratio in regressions:
+            print(f"[bench] REGRESSION {name} n={size}: "
+                  f"{previous * 1000:.2f} ms -> {current * 1000:.2f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"[bench] no regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
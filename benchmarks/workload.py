@@ -0,0 +1,87 @@
+"""
+Seeded synthetic workloads for the scheduler.
+
+Produces the three inputs of `scheduler.schedule_tasks`: `TaskSnapshot`
+records (what `/api/schedule` feeds the scheduler), external events and a
+space-constraint dict keyed by space id and name like `app.load_space_constraints`.
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from scheduler import TaskSnapshot  # noqa: E402
+
+# Mirrors the default spaces seeded by app.py
+SPACES = [
+    (1, 'work', [{'day': d, 'start': '09:00', 'end': '17:00'} for d in range(1, 6)]),
+    (2, 'study', []),
+    (3, 'association', [{'day': 3, 'start': '18:00', 'end': '22:00'}]),
+]
+
+DURATIONS = (15, 30, 45, 60, 90, 120, 180)
+
+
+def generate_workload(n_tasks, seed=0, now=None, frozen_ratio=0.1, deadline_ratio=0.3,
+                      events_per_task=0.5, horizon_days=60):
+    """
+    Build (tasks, external_events, space_constraints) for `n_tasks` tasks.
+
+    Args:
+        n_tasks: Number of tasks to generate
+        seed: RNG seed; the same seed always yields the same workload
+        now: Anchor for deadlines/events (defaults to the current time)
+        frozen_ratio: Share of tasks that are frozen in an existing slot
+        deadline_ratio: Share of tasks that carry a deadline
+        events_per_task: External events generated per task
+        horizon_days: Spread of deadlines, events and frozen slots
+    """
+    rng = random.Random(seed)
+    now = (now or datetime.now()).replace(second=0, microsecond=0)
+    horizon_minutes = horizon_days * 24 * 60
+
+    def random_time():
+        return now + timedelta(minutes=15 * rng.randrange(horizon_minutes // 15))
+
+    tasks = []
+    for i in range(n_tasks):
+        space_id, space_name, _ = rng.choice(SPACES + [(None, None, None)])
+        duration = rng.choice(DURATIONS)
+        task = TaskSnapshot(
+            id=i + 1,
+            priority=rng.randint(0, 10),
+            deadline=random_time() if rng.random() < deadline_ratio else None,
+            created_at=now - timedelta(minutes=rng.randrange(100000)),
+            estimated_duration=duration,
+            space=space_name,
+            space_id=space_id,
+            frozen=False,
+            scheduled_start=None,
+            scheduled_end=None,
+        )
+        if rng.random() < frozen_ratio:
+            task.frozen = True
+            task.scheduled_start = random_time()
+            task.scheduled_end = task.scheduled_start + timedelta(minutes=duration)
+        tasks.append(task)
+
+    external_events = []
+    for _ in range(int(n_tasks * events_per_task)):
+        start = random_time()
+        external_events.append({
+            'start': start,
+            'end': start + timedelta(minutes=rng.choice(DURATIONS)),
+            'title': 'Busy',
+        })
+
+    space_constraints = {}
+    for space_id, space_name, constraints in SPACES:
+        space_constraints[space_id] = constraints
+        space_constraints[space_name] = constraints
+
+    return tasks, external_events, space_constraints
@@ -7,6 +7,8 @@ the actual SQLite database file and applies the *additive* diff:
 
   1. CREATE missing tables (e.g. `notes` landing on a prod DB that predates it).
   2. ALTER TABLE ADD COLUMN for columns present on the model but absent in the DB.
+  3. CREATE INDEX for model-declared indexes missing on existing tables
+     (e.g. `ix_tasks_scheduled_start`).
 
 It NEVER drops tables, columns, or data. It is idempotent — running it twice is
 a no-op the second time. Use it before `docker compose up` after pulling code
@@ -142,7 +144,8 @@ def _truthy_default(col) -> bool:
 def diff(engine):
     """
     Compute the additive diff between db.metadata (desired) and the DB (actual).
-    Returns (missing_tables: list[Table], missing_columns: list[(table, col)]).
+    Returns (missing_tables: list[Table], missing_columns: list[(table, col)],
+    missing_indexes: list[Index]).
     Does NOT detect extra/dropped schema or type drift — additive-only by design.
     """
     insp = inspect(engine)
@@ -162,16 +165,26 @@ def diff(engine):
             if col.name not in existing_cols:
                 missing_columns.append((table, col))
 
-    return missing_tables, missing_columns
+    missing_indexes = []
+    for table_name, table in db.metadata.tables.items():
+        if table_name not in existing_tables:
+            continue  # CREATE TABLE emits the table's indexes
+        existing_indexes = {ix["name"] for ix in insp.get_indexes(table_name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                missing_indexes.append(index)
+
+    return missing_tables, missing_columns, missing_indexes
 
 
 # ---------------------------------------------------------------------------
 # Apply
 # ---------------------------------------------------------------------------
 
-def apply_diff(engine, missing_tables, missing_columns, dry_run: bool) -> None:
+def apply_diff(engine, missing_tables, missing_columns, missing_indexes,
+               dry_run: bool) -> None:
     """Execute the additive DDL. Each statement in its own transaction."""
-    if not missing_tables and not missing_columns:
+    if not missing_tables and not missing_columns and not missing_indexes:
         print("[migrate] Schema is up to date — nothing to do.")
         return
 
@@ -202,6 +215,13 @@ def apply_diff(engine, missing_tables, missing_columns, dry_run: bool) -> None:
             with engine.begin() as conn:
                 conn.execute(text(stmt))
 
+    # Missing indexes on existing tables — after the columns they cover exist.
+    for index in missing_indexes:
+        cols = ", ".join(c.name for c in index.columns)
+        print(f"[migrate] CREATE INDEX {index.name} ON {index.table.name} ({cols})")
+        if not dry_run:
+            index.create(engine)
+
 
 # ---------------------------------------------------------------------------
 # Main
@@ -225,9 +245,9 @@ def main():
     print(f"[migrate] URI:   {uri}")
     print(f"[migrate] mode:  {'DRY-RUN' if args.dry_run else 'APPLY'}")
 
-    missing_tables, missing_columns = diff(engine)
+    missing_tables, missing_columns, missing_indexes = diff(engine)
 
-    if not missing_tables and not missing_columns:
+    if not missing_tables and not missing_columns and not missing_indexes:
         print("[migrate] Schema is up to date — nothing to do.")
         return
 
@@ -237,6 +257,9 @@ def main():
         print(f"  + table  {t.name} ({cols})")
     for table, col in missing_columns:
         print(f"  + column {table.name}.{col.name} ({column_ddl(col)})")
+    for index in missing_indexes:
+        cols = ", ".join(c.name for c in index.columns)
+        print(f"  + index  {index.name} on {index.table.name} ({cols})")
 
     if args.dry_run:
         print("[migrate] dry-run — no changes written.")
@@ -249,7 +272,7 @@ def main():
             print("[migrate] aborted.")
             return
 
-    apply_diff(engine, missing_tables, missing_columns, dry_run=False)
+    apply_diff(engine, missing_tables, missing_columns, missing_indexes, dry_run=False)
     print("[migrate] done.")
 
 
@@ -5,9 +5,34 @@ Uses a unified interface with provider-specific implementations.
 
 import json
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 import requests
+from requests.adapters import HTTPAdapter
+
+# Keep-alive connections per provider host; parse and cleanify calls reuse them
+AI_POOL_SIZE = 10
+
+# Cleanify splits longer notes into chunks of about this many characters
+# (well under the 2048-token output cap) and tidies up to CLEANIFY_WORKERS
+# chunks at once
+CLEANIFY_CHUNK_CHARS = 4000
+CLEANIFY_WORKERS = 4
+
+
+def fallback_tasks(text: str) -> List[Dict[str, Any]]:
+    """Single task built from the raw text, used when the AI is unavailable"""
+    return [{
+        'title': text[:100],
+        'description': text,
+        'space_id': None,
+        'priority': 5,
+        'deadline': None,
+        'estimated_duration': 60
+    }]
 
 
 class AIProvider:
@@ -31,6 +56,14 @@ class AIProvider:
         """
         raise NotImplementedError
 
+    def cleanify_stream(self, note_text: str, system_prompt: str) -> Iterator[str]:
+        """Like `cleanify`, but yield the model text in chunks as it is
+        generated. Providers without a streaming API yield it all at once."""
+        yield self.cleanify(note_text, system_prompt)
+
+    def close(self) -> None:
+        """Release pooled connections (called when the provider is replaced)"""
+
     def _process_response(self, response_text: str) -> List[Dict[str, Any]]:
         """Process raw response text to extract task data"""
         # Try to extract JSON from the response
@@ -85,19 +118,27 @@ class AIProvider:
 
 class OpenAIProvider(AIProvider):
     """OpenAI-compatible API provider (works with Mistral, OpenAI, etc.)"""
-    
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, model: Optional[str] = None):
+        super().__init__(api_key, base_url, model)
+        # One pooled keep-alive session: no TCP/TLS handshake per request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=AI_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    @property
+    def chat_url(self) -> str:
+        return f"{self.base_url}/chat/completions" if self.base_url else "https://api.openai.com/v1/chat/completions"
+
     def parse_task(self, text: str, system_prompt: str) -> List[Dict[str, Any]]:
         """Use OpenAI-compatible API to parse tasks"""
         if not self.api_key:
             # Fallback to simple parsing if no API key
-            return [{
-                'title': text[:100],
-                'description': text,
-                'space_id': None,
-                'priority': 5,
-                'deadline': None,
-                'estimated_duration': 60
-            }]
+            return fallback_tasks(text)
         
         # Add current date and time to the user message for context
         now = datetime.now()
@@ -119,8 +160,8 @@ class OpenAIProvider(AIProvider):
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/chat/completions" if self.base_url else "https://api.openai.com/v1/chat/completions",
+            response = self.session.post(
+                self.chat_url,
                 headers=headers,
                 json=data,
                 timeout=30
@@ -136,14 +177,7 @@ class OpenAIProvider(AIProvider):
         except Exception as e:
             print(f"Error calling AI API: {e}")
             # Fallback to simple parsing
-            return [{
-                'title': text[:100],
-                'description': text,
-                'space_id': None,
-                'priority': 5,
-                'deadline': None,
-                'estimated_duration': 60
-            }]
+            return fallback_tasks(text)
 
     def cleanify(self, note_text: str, system_prompt: str) -> str:
         """Use OpenAI-compatible API to tidy a note. Returns raw model text."""
@@ -166,8 +200,8 @@ class OpenAIProvider(AIProvider):
             "temperature": 0.3
         }
 
-        response = requests.post(
-            f"{self.base_url}/chat/completions" if self.base_url else "https://api.openai.com/v1/chat/completions",
+        response = self.session.post(
+            self.chat_url,
             headers=headers,
             json=data,
             timeout=30
@@ -175,6 +209,42 @@ class OpenAIProvider(AIProvider):
         response.raise_for_status()
         return response.json()['choices'][0]['message']['content']
 
+    def cleanify_stream(self, note_text: str, system_prompt: str) -> Iterator[str]:
+        """Stream the tidied note from the chat completions SSE response."""
+        if not self.api_key:
+            yield note_text
+            return
+
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+
+        data = {
+            "model": self.model or "gpt-3.5-turbo",
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": note_text}
+            ],
+            "max_tokens": 2048,
+            "temperature": 0.3,
+            "stream": True
+        }
+
+        # timeout applies per read: a slow model may stream for longer than 30 s
+        with self.session.post(self.chat_url, headers=headers, json=data, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith(b'data:'):
+                    continue
+                payload = line[5:].strip()
+                if payload == b'[DONE]':
+                    break
+                choices = json.loads(payload).get('choices')
+                text = choices[0].get('delta', {}).get('content') if choices else None
+                if text:
+                    yield text
+
 
 class AnthropicProvider(AIProvider):
     """Anthropic Claude provider"""
@@ -186,19 +256,16 @@ class AnthropicProvider(AIProvider):
             self.client = Anthropic(api_key=api_key, base_url=base_url)
         except ImportError:
             self.client = None
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
     
     def parse_task(self, text: str, system_prompt: str) -> List[Dict[str, Any]]:
         """Use Anthropic Claude to parse tasks"""
         if not self.api_key or not self.client:
             # Fallback to simple parsing if no API key or client not available
-            return [{
-                'title': text[:100],
-                'description': text,
-                'space_id': None,
-                'priority': 5,
-                'deadline': None,
-                'estimated_duration': 60
-            }]
+            return fallback_tasks(text)
         
         # Add current date and time to the user message for context
         now = datetime.now()
@@ -223,14 +290,7 @@ class AnthropicProvider(AIProvider):
         except Exception as e:
             print(f"Error calling Anthropic API: {e}")
             # Fallback to simple parsing
-            return [{
-                'title': text[:100],
-                'description': text,
-                'space_id': None,
-                'priority': 5,
-                'deadline': None,
-                'estimated_duration': 60
-            }]
+            return fallback_tasks(text)
 
     def cleanify(self, note_text: str, system_prompt: str) -> str:
         """Use Anthropic Claude to tidy a note. Returns raw model text."""
@@ -249,22 +309,63 @@ class AnthropicProvider(AIProvider):
         )
         return response.content[0].text
 
+    def cleanify_stream(self, note_text: str, system_prompt: str) -> Iterator[str]:
+        """Stream the tidied note through the Messages streaming API."""
+        if not self.api_key or not self.client:
+            yield note_text
+            return
+
+        with self.client.messages.stream(
+            model=self.model or "claude-haiku-4-5",
+            max_tokens=2048,
+            temperature=0.3,
+            system=system_prompt,
+            messages=[
+                {"role": "user", "content": note_text}
+            ]
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
+
+
+# Process-wide provider, keyed by the settings it was built from
+_provider: Optional[AIProvider] = None
+_provider_settings = None
+_provider_lock = threading.Lock()
+
 
 def get_ai_provider() -> AIProvider:
-    """Get the appropriate AI provider based on environment variables"""
+    """Get the appropriate AI provider based on environment variables.
+
+    The provider (and its pooled HTTP connections) is shared by the whole
+    process and only rebuilt when AI_API_KEY, AI_API_BASE_URL or AI_MODEL
+    change.
+    """
+    global _provider, _provider_settings
     api_key = os.getenv('AI_API_KEY')
     base_url = os.getenv('AI_API_BASE_URL', 'https://api.openai.com/v1/')
     model = os.getenv('AI_MODEL', 'gpt-3.5-turbo')
-    
-    # Check if it's an Anthropic URL
-    if 'anthropic.com' in base_url:
-        return AnthropicProvider(api_key=api_key, base_url=base_url, model=model)
-    else:
-        # Default to OpenAI-compatible provider (works with Mistral, OpenAI, etc.)
-        return OpenAIProvider(api_key=api_key, base_url=base_url, model=model)
+    settings = (api_key, base_url, model)
 
+    with _provider_lock:
+        if _provider is not None and _provider_settings == settings:
+            return _provider
 
-def parse_task_with_ai(text: str, system_prompt: str) -> List[Dict[str, Any]]:
+        previous = _provider
+        # Check if it's an Anthropic URL
+        if 'anthropic.com' in base_url:
+            _provider = AnthropicProvider(api_key=api_key, base_url=base_url, model=model)
+        else:
+            # Default to OpenAI-compatible provider (works with Mistral, OpenAI, etc.)
+            _provider = OpenAIProvider(api_key=api_key, base_url=base_url, model=model)
+        _provider_settings = settings
+
+    if previous is not None:
+        previous.close()
+    return _provider
+
+
+def parse_task_with_ai(text: str, system_prompt: str, cache=None) -> List[Dict[str, Any]]:
     """
     Parse a text input using AI to extract task information.
     
@@ -278,22 +379,229 @@ def parse_task_with_ai(text: str, system_prompt: str) -> List[Dict[str, Any]]:
     
     Note: The AI may return multiple tasks if the input clearly describes
     multiple distinct tasks, but will prefer returning a single task.
+
+    With an `llm_cache.LLMCache`, an identical request (same text, prompt and
+    model, within the same hour) is answered from the cache. The fallback
+    result of an unavailable AI is never cached.
     """
     provider = get_ai_provider()
-    return provider.parse_task(text, system_prompt)
+    key = _cache_key(cache, 'parse', text, system_prompt, provider)
+    cached = _cache_get(cache, key)
+    if cached is not None:
+        return cached
+
+    tasks = provider.parse_task(text, system_prompt)
+    if key is not None and tasks and tasks != fallback_tasks(text):
+        _cache_put(cache, key, 'parse', tasks)
+    return tasks
 
 
-def cleanify_note_with_ai(note_text: str, system_prompt: str) -> str:
+def cleanify_note_with_ai(note_text: str, system_prompt: str, cache=None) -> str:
     """
     Tidy a note's markdown text via AI. Returns cleaned text on success.
 
+    Long notes are split with `split_markdown` and their chunks tidied
+    concurrently, then reassembled in order; with a `cache`, chunks cleaned
+    before (or already clean) are not sent again, see `_cleanify_chunks`.
+
     Graceful degradation: on ANY exception or empty/None response, returns the
-    input `note_text` unchanged. No exception escapes to the caller.
+    input `note_text` unchanged (per chunk for long notes: a failed chunk
+    keeps its original text). No exception escapes to the caller.
     """
     try:
-        result = get_ai_provider().cleanify(note_text, system_prompt)
-        if not result:
+        chunks = split_markdown(note_text)
+        results = list(_cleanify_chunks(get_ai_provider(), chunks, system_prompt, cache))
+        if all(result is None for result in results):
             return note_text
-        return result
+        if len(chunks) == 1:
+            return results[0]
+        return '\n\n'.join(_join_part(result, chunk) for result, chunk in zip(results, chunks))
     except Exception:
-        return note_text
\ No newline at end of file
+        return note_text
+
+
+def stream_cleanify_note_with_ai(note_text: str, system_prompt: str, cache=None):
+    """
+    Streaming counterpart of `cleanify_note_with_ai`, yielding (event, data):
+    ('delta', {'text'}) for each chunk of model text, then either
+    ('done', {'content'}) with the whole result, or ('error', {'content',
+    'error'}) where content is the input `note_text` unchanged (same graceful
+    degradation: a failed or empty stream keeps the original text). A cache
+    hit is a single 'done'; only completed streams are cached.
+
+    A note split into several chunks is tidied concurrently like in
+    `cleanify_note_with_ai`, and each chunk is sent as one delta, in order,
+    as soon as it and the ones before it are done.
+    """
+    try:
+        provider = get_ai_provider()
+        chunks = split_markdown(note_text)
+        if len(chunks) > 1:
+            parts = []
+            cleaned = False
+            for chunk, result in zip(chunks, _cleanify_chunks(provider, chunks, system_prompt, cache)):
+                cleaned = cleaned or result is not None
+                text = ('\n\n' if parts else '') + _join_part(result, chunk)
+                parts.append(text)
+                yield 'delta', {'text': text}
+            if not cleaned:
+                yield 'error', {'content': note_text, 'error': 'No chunk could be cleaned'}
+                return
+            yield 'done', {'content': ''.join(parts)}
+            return
+
+        key = _cache_key(cache, 'cleanify', note_text, system_prompt, provider)
+        cached = _cache_get(cache, key)
+        if cached is not None:
+            yield 'done', {'content': cached}
+            return
+
+        parts = []
+        for text in provider.cleanify_stream(note_text, system_prompt):
+            if text:
+                parts.append(text)
+                yield 'delta', {'text': text}
+        result = ''.join(parts)
+    except Exception as e:
+        yield 'error', {'content': note_text, 'error': str(e) or e.__class__.__name__}
+        return
+
+    if not result:
+        yield 'error', {'content': note_text, 'error': 'Empty response'}
+        return
+    if key is not None and result != note_text:
+        _remember_cleaned(cache, key, result, system_prompt, provider)
+    yield 'done', {'content': result}
+
+
+_HEADING = re.compile(r'#{1,6}(\s|$)')
+_FENCE = re.compile(r'(```|~~~)')
+
+
+def split_markdown(text: str, max_chars: Optional[int] = None) -> List[str]:
+    """
+    Split a note into chunks for Cleanify of at most `max_chars` where
+    possible. Whole heading sections are packed together and a chunk is cut
+    before a heading when the next section does not fit; only a section
+    longer than `max_chars` is cut at paragraph (blank line) boundaries.
+    Fenced code blocks are never cut. A note of at most `max_chars` (default
+    CLEANIFY_CHUNK_CHARS) is one chunk, unchanged.
+    """
+    max_chars = max_chars or CLEANIFY_CHUNK_CHARS
+    if len(text) <= max_chars:
+        return [text]
+
+    sections = []
+    for block in _markdown_blocks(text):
+        if not sections or _HEADING.match(block):
+            sections.append([])
+        sections[-1].append(block)
+
+    chunks = []
+    current = []
+    size = 0
+    for section in sections:
+        section_size = sum(len(block) + 2 for block in section)
+        if current and size + section_size - 2 > max_chars:
+            chunks.append('\n\n'.join(current))
+            current = []
+            size = 0
+        for block in section:
+            if current and size + len(block) > max_chars:
+                chunks.append('\n\n'.join(current))
+                current = []
+                size = 0
+            current.append(block)
+            size += len(block) + 2
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+def _markdown_blocks(text: str) -> List[str]:
+    """Paragraphs of a markdown text (a heading line always starts one), with
+    fenced code blocks kept whole."""
+    blocks = []
+    lines = []
+    in_fence = False
+    for line in text.replace('\r\n', '\n').split('\n'):
+        stripped = line.strip()
+        if _FENCE.match(stripped):
+            in_fence = not in_fence
+        elif not in_fence:
+            if not stripped:
+                if lines:
+                    blocks.append('\n'.join(lines))
+                    lines = []
+                continue
+            if _HEADING.match(line) and lines:
+                blocks.append('\n'.join(lines))
+                lines = []
+        lines.append(line)
+    if lines:
+        blocks.append('\n'.join(lines))
+    return blocks
+
+
+def _join_part(result, chunk):
+    """A chunk's cleaned text for reassembly (its original on failure)."""
+    return (result if result is not None else chunk).strip('\n')
+
+
+def _cleanify_chunks(provider, chunks, system_prompt, cache):
+    """
+    Yield the cleaned text of each chunk, in order (None where the AI failed).
+
+    Uncached chunks go to the provider concurrently; cache reads and writes
+    stay on the calling thread. Besides chunk -> result, each result is
+    remembered as already clean (result -> result), so re-running Cleanify
+    after a small edit only sends the sections that changed.
+    """
+    keys = [_cache_key(cache, 'cleanify', chunk, system_prompt, provider) for chunk in chunks]
+    cached = [_cache_get(cache, key) for key in keys]
+
+    def clean(index):
+        if cached[index] is not None:
+            return cached[index]
+        try:
+            return provider.cleanify(chunks[index], system_prompt) or None
+        except Exception as e:
+            print(f"Error calling AI API for cleanify chunk {index}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(CLEANIFY_WORKERS, len(chunks))) as executor:
+        for index, result in enumerate(executor.map(clean, range(len(chunks)))):
+            if result is not None and cached[index] is None and keys[index] is not None and result != chunks[index]:
+                _remember_cleaned(cache, keys[index], result, system_prompt, provider)
+            yield result
+
+
+def _remember_cleaned(cache, key, result, system_prompt, provider):
+    _cache_put(cache, key, 'cleanify', result)
+    _cache_put(cache, _cache_key(cache, 'cleanify', result, system_prompt, provider), 'cleanify', result)
+
+
+# Cache failures never fail the AI call: they are logged and treated as misses
+
+def _cache_key(cache, kind, text, system_prompt, provider):
+    """Key of the request in `cache`, or None without a usable cache"""
+    if cache is None or not cache.enabled:
+        return None
+    return cache.key(kind, text, system_prompt, provider.model)
+
+
+def _cache_get(cache, key):
+    if key is None:
+        return None
+    try:
+        return cache.get(key)
+    except Exception as e:
+        print(f"Error reading AI cache: {e}")
+        return None
+
+
+def _cache_put(cache, key, kind, response):
+    try:
+        cache.put(key, kind, response)
+    except Exception as e:
+        print(f"Error writing AI cache: {e}")
@@ -1,17 +1,44 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response, stream_with_context
 from datetime import datetime, timedelta
-from models import db, Task, Space, ChangeLog, CalendarSource, Note
+from models import db, Task, Space, ChangeLog, CalendarSource, ExternalEvent, Note
 from config import Config
 import json
 import os
-from ai_parser import parse_task_with_ai, cleanify_note_with_ai
-from scheduler import schedule_tasks
-from calendar_integration import fetch_external_events
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ai_parser import parse_task_with_ai, cleanify_note_with_ai, stream_cleanify_note_with_ai
+from scheduler import (
+    schedule_tasks, reschedule_incremental, task_sort_key, analyze_feasibility,
+    TaskSnapshot, changed_placements, schedule_fingerprint
+)
+from sqlalchemy import func, update
+from bitmap_scheduler import schedule_tasks_bitmap
+from schedule_optimizer import optimize_schedule
+from calendar_sync import CalendarSyncWorker, load_stored_events, DAYS_AHEAD
+from schedule_jobs import ScheduleJobManager, ScheduleLockBusy, schedule_lock
+from busy_cache import BusyCache
+from llm_cache import LLMCache
 
 app = Flask(__name__)
 app.config.from_object(Config)
 db.init_app(app)
 
+# Scheduling engines selectable via Config.SCHEDULER_ENGINE (same contract)
+SCHEDULER_ENGINES = {
+    'greedy': schedule_tasks,
+    'bitmap': schedule_tasks_bitmap,
+}
+
+# Keeps external_events in sync with the calendar sources (started by the
+# first request of each serving process, see start_calendar_sync)
+calendar_sync = CalendarSyncWorker(app, poll_interval=app.config['CALENDAR_SYNC_POLL'])
+
+# Merged external busy intervals, shared by schedule runs and the events endpoint
+busy_cache = BusyCache()
+
+# Persistent cache of AI parse / Cleanify responses
+llm_cache = LLMCache(ttl=app.config['LLM_CACHE_TTL'], max_entries=app.config['LLM_CACHE_MAX_ENTRIES'])
+
 # Helper function to parse ISO datetime strings
 def parse_iso_datetime(iso_string):
     """Parse ISO datetime string in local timezone format."""
@@ -37,6 +64,15 @@ def login_required(f):
     return decorated_function
 
 
+@app.before_request
+def start_calendar_sync():
+    """Start the sync worker in whichever process serves requests: the dev
+    server's child (never the reloader's watcher), `flask run`, or each
+    WSGI worker."""
+    if app.config['CALENDAR_SYNC_ENABLED']:
+        calendar_sync.start()
+
+
 @app.route('/')
 def index():
     if not session.get('authenticated'):
@@ -116,18 +152,9 @@ def create_task():
     return jsonify(task.to_dict()), 201
 
 
-@app.route('/api/tasks/parse', methods=['POST'])
-@login_required
-def parse_task():
-    data = request.json
-    text = data.get('text')
-    space_hint = data.get('space_hint')
-
-    if not text:
-        return jsonify({'error': 'No text provided'}), 400
-
-    ### Append list of spaces to the system prompt
-
+def build_parse_prompt(space_hint=None):
+    """System prompt for task parsing: the configured prompt plus the
+    available spaces (and the space hint, if any)."""
     spaces = Space.query.all()
     # Include space ID, name, and description for AI context
     spaces_info = "\n".join([f"- ID: {space.id}, Name: {space.name}, Description: {space.description}" for space in spaces])
@@ -137,11 +164,12 @@ def parse_task():
     # If space_hint is provided, add it to the system prompt
     if space_hint:
         system_prompt += f"\n\nIMPORTANT: This task should be assigned to the '{space_hint}' space unless the user explicitly specifies a different space."
+    return system_prompt
 
-    # parse_task_with_ai now returns a list of tasks
-    tasks_data = parse_task_with_ai(text, system_prompt)
 
-    # Create all tasks returned by the AI
+def create_parsed_tasks(tasks_data):
+    """Add a Task and its 'create' ChangeLog for each parsed task dict
+    (flushed, not committed). Returns the tasks."""
     created_tasks = []
     for task_data in tasks_data:
         task = Task(
@@ -165,7 +193,27 @@ def parse_task():
         )
         db.session.add(log)
         created_tasks.append(task)
+    return created_tasks
+
+
+@app.route('/api/tasks/parse', methods=['POST'])
+@login_required
+def parse_task():
+    data = request.json
+    text = data.get('text')
+    space_hint = data.get('space_hint')
+
+    if not text:
+        return jsonify({'error': 'No text provided'}), 400
+
+    ### Append list of spaces to the system prompt
+    system_prompt = build_parse_prompt(space_hint)
 
+    # parse_task_with_ai now returns a list of tasks
+    tasks_data = parse_task_with_ai(text, system_prompt, cache=llm_cache)
+
+    # Create all tasks returned by the AI
+    created_tasks = create_parsed_tasks(tasks_data)
     db.session.commit()
 
     # Return all created tasks
@@ -177,11 +225,73 @@ def parse_task():
         return jsonify([task.to_dict() for task in created_tasks]), 201
 
 
+@app.route('/api/tasks/parse/batch', methods=['POST'])
+@login_required
+def parse_tasks_batch():
+    """
+    Parse several inputs at once and create all their tasks in one transaction.
+
+    Body: {"inputs": ["...", ...], "space_hint": optional}. The inputs are
+    parsed concurrently (at most AI_BATCH_WORKERS AI calls in flight) and the
+    response is NDJSON: one line per input as soon as it is parsed,
+    {"index", "tasks": [drafts]} or {"index", "error"}, then a final line
+    {"done": true, "tasks": [created tasks, in input order]} once the rows are
+    committed (or {"done": true, "error"} if the commit failed).
+    """
+    data = request.get_json(silent=True) or {}
+    inputs = data.get('inputs')
+    if (not isinstance(inputs, list) or not inputs
+            or not all(isinstance(text, str) and text.strip() for text in inputs)):
+        return jsonify({'error': 'inputs must be a non-empty list of texts'}), 400
+    if len(inputs) > app.config['AI_BATCH_MAX_INPUTS']:
+        return jsonify({'error': f"At most {app.config['AI_BATCH_MAX_INPUTS']} inputs per batch"}), 400
+
+    system_prompt = build_parse_prompt(data.get('space_hint'))
+
+    def parse(text):
+        # Worker thread: the AI cache needs an app context
+        with app.app_context():
+            return parse_task_with_ai(text, system_prompt, cache=llm_cache)
+
+    def generate():
+        parsed = {}
+        executor = ThreadPoolExecutor(max_workers=min(app.config['AI_BATCH_WORKERS'], len(inputs)))
+        try:
+            futures = {executor.submit(parse, text): index for index, text in enumerate(inputs)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    parsed[index] = future.result()
+                    line = {'index': index, 'tasks': parsed[index]}
+                except Exception as e:
+                    line = {'index': index, 'error': str(e)}
+                yield json.dumps(line) + '\n'
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        # One transaction for every task and change log of the batch
+        try:
+            created_tasks = create_parsed_tasks(
+                [task_data for index in sorted(parsed) for task_data in parsed[index]]
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            yield json.dumps({'done': True, 'error': str(e)}) + '\n'
+            return
+        yield json.dumps({'done': True, 'tasks': [task.to_dict() for task in created_tasks]}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 @app.route('/api/tasks/<int:task_id>', methods=['PUT'])
 @login_required
 def update_task(task_id):
     task = Task.query.get_or_404(task_id)
     old_value = task.to_dict()
+    old_key = task_sort_key(task)
+    old_slot = (task.scheduled_start, task.scheduled_end)
+    was_frozen = task.frozen
 
     data = request.json
 
@@ -221,6 +331,30 @@ def update_task(task_id):
     db.session.add(log)
     db.session.commit()
 
+    # ?reschedule=incremental: re-place only the tasks this change can affect
+    if request.args.get('reschedule') == 'incremental':
+        rescheduled = 0
+        if any(old_value[field] != value for field, value in task.to_dict().items()
+               if field in SCHEDULING_FIELDS):
+            new_slot = (task.scheduled_start, task.scheduled_end)
+            freed_slot = None
+            if all(old_slot) and (task.completed or new_slot != old_slot):
+                freed_slot = old_slot
+            pivot = None
+            if not (was_frozen or task.frozen):
+                # Frozen slots block every rank; otherwise only ranks from
+                # the task's old or new position onward can change.
+                pivot = old_key if task.completed else min(old_key, task_sort_key(task))
+            rescheduled = reschedule_after_change(
+                pivot,
+                changed_id=None if task.completed else task.id,
+                freed_slot=freed_slot,
+                pinned='scheduled_start' in data
+            )
+        result = task.to_dict()
+        result['rescheduled'] = rescheduled
+        return jsonify(result)
+
     return jsonify(task.to_dict())
 
 
@@ -229,6 +363,9 @@ def update_task(task_id):
 def delete_task(task_id):
     task = Task.query.get_or_404(task_id)
     old_value = task.to_dict()
+    old_key = task_sort_key(task)
+    old_slot = (task.scheduled_start, task.scheduled_end)
+    was_active = not task.completed
 
     db.session.delete(task)
     db.session.commit()
@@ -243,6 +380,16 @@ def delete_task(task_id):
     db.session.add(log)
     db.session.commit()
 
+    # ?reschedule=incremental: let lower-ranked tasks move into the freed slot
+    if request.args.get('reschedule') == 'incremental':
+        rescheduled = 0
+        if was_active and all(old_slot):
+            rescheduled = reschedule_after_change(
+                None if old_value['frozen'] else old_key,
+                freed_slot=old_slot
+            )
+        return jsonify({'success': True, 'rescheduled': rescheduled})
+
     return jsonify({'success': True})
 
 
@@ -348,39 +495,231 @@ def reorder_tasks():
     return jsonify({'success': True})
 
 
-@app.route('/api/schedule', methods=['POST'])
-@login_required
-def auto_schedule():
-    # Get all incomplete tasks
-    tasks = Task.query.filter_by(completed=False).order_by(Task.priority.desc(), Task.deadline.asc()).all()
+def load_external_events():
+    """Stored events of the enabled calendar sources over the next DAYS_AHEAD
+    days (kept current by the calendar sync worker; no network access).
 
-    # Get external calendar events
-    external_events = []
-    calendar_sources = CalendarSource.query.filter_by(enabled=True).all()
-    for source in calendar_sources:
-        events = fetch_external_events(source.ics_url)
-        external_events.extend(events)
-        source.last_fetched = datetime.utcnow()
+    Returns (events, statuses), see load_calendar_statuses.
+    """
+    now = datetime.now()
+    return load_stored_events(now, now + timedelta(days=DAYS_AHEAD)), load_calendar_statuses(now)
 
-    db.session.commit()
 
-    # Get spaces and their constraints
-    spaces = Space.query.all()
-    space_constraints = {space.name: space.get_time_constraints() for space in spaces}
+def load_busy_events():
+    """External busy time over the next DAYS_AHEAD days, merged, from the
+    process-wide busy cache: what the scheduler reads instead of full events.
 
-    # Schedule tasks
-    scheduled_tasks = schedule_tasks(tasks, external_events, space_constraints)
+    Returns (events, statuses), see load_calendar_statuses.
+    """
+    now = datetime.now()
+    return busy_cache.busy_events(now, now + timedelta(days=DAYS_AHEAD)), load_calendar_statuses(now)
 
-    # Update tasks with scheduled times
-    for task_data in scheduled_tasks:
-        task = Task.query.get(task_data['id'])
-        if task:
-            task.scheduled_start = task_data['scheduled_start']
-            task.scheduled_end = task_data['scheduled_end']
 
+def load_calendar_statuses(now):
+    """One status dict per enabled source, with its event count in the window:
+    'ok' once it has been synced, 'pending' before its first sync, 'stale'
+    (last good events served) or 'error' (none yet) while its syncs fail."""
+    counts = dict(
+        db.session.query(ExternalEvent.source_id, func.count(ExternalEvent.id))
+        .filter(ExternalEvent.start < now + timedelta(days=DAYS_AHEAD), ExternalEvent.end > now)
+        .group_by(ExternalEvent.source_id)
+    )
+
+    statuses = []
+    for source in CalendarSource.query.filter_by(enabled=True).all():
+        if source.consecutive_failures:
+            # Failing feed: its last good events (if any) are still served
+            status = 'stale' if source.last_fetched else 'error'
+        else:
+            status = 'ok' if source.last_fetched else 'pending'
+        statuses.append({
+            'id': source.id,
+            'name': source.name,
+            'status': status,
+            'events': counts.get(source.id, 0),
+            'last_fetched': source.last_fetched.isoformat() if source.last_fetched else None,
+            'error': source.last_error,
+            'retry_after': source.retry_after.isoformat() if source.retry_after else None
+        })
+    return statuses
+
+
+def load_task_snapshot():
+    """Incomplete tasks as detached TaskSnapshot records (plain column query,
+    no ORM instances)."""
+    rows = db.session.query(
+        *(getattr(Task, name) for name in TaskSnapshot.__slots__)
+    ).filter(Task.completed.is_(False))
+    return [TaskSnapshot(*row) for row in rows]
+
+
+def load_task_versions():
+    """(id, updated_at) of every incomplete task, for schedule fingerprints."""
+    return db.session.query(Task.id, Task.updated_at).filter(Task.completed.is_(False)).all()
+
+
+def write_schedule(placements, snapshot):
+    """Persist placements with one executemany UPDATE, skipping rows whose slot
+    did not change, and commit. Returns the number of rows written."""
+    changed = changed_placements(placements, snapshot)
+    if changed:
+        db.session.execute(update(Task), [
+            {
+                'id': p['id'],
+                'scheduled_start': p['scheduled_start'],
+                'scheduled_end': p['scheduled_end']
+            }
+            for p in changed
+        ])
     db.session.commit()
+    return len(changed)
+
+
+def load_space_constraints():
+    """Space time constraints keyed by space_id and by the deprecated Task.space
+    name (the scheduler compiles each list once per run)."""
+    space_constraints = {}
+    for space in Space.query.all():
+        constraints = space.get_time_constraints()
+        space_constraints[space.id] = constraints
+        space_constraints[space.name] = constraints
+    return space_constraints
+
 
-    return jsonify({'success': True, 'scheduled_tasks': len(scheduled_tasks)})
+def reschedule_after_change(pivot, changed_id=None, freed_slot=None, pinned=False):
+    """Incrementally re-place the tasks affected by one mutation; returns the
+    number of tasks whose slot changed (0 if a full schedule holds the lock)."""
+    try:
+        with schedule_lock(uuid.uuid4().hex, wait=app.config['SCHEDULE_LOCK_WAIT']):
+            snapshot = load_task_snapshot()
+            external_events, _ = load_busy_events()
+            moved = reschedule_incremental(
+                snapshot,
+                external_events,
+                load_space_constraints(),
+                pivot=pivot,
+                changed_id=changed_id,
+                freed_slot=freed_slot,
+                pinned=pinned
+            )
+            return write_schedule(moved, snapshot)
+    except ScheduleLockBusy:
+        return 0
+
+
+# Fields whose change can move a task's placement
+SCHEDULING_FIELDS = (
+    'space', 'space_id', 'priority', 'deadline', 'estimated_duration',
+    'scheduled_start', 'scheduled_end', 'completed', 'frozen'
+)
+
+
+# Fingerprint of the inputs of the last full schedule run and its result
+last_schedule = {'fingerprint': None, 'result': None}
+
+
+def run_schedule(options, owner):
+    """Schedule every incomplete task around the stored external busy time and
+    write the result. No feed is fetched: busy intervals come from
+    `busy_cache` (see load_busy_events), kept current by the calendar sync.
+
+    Runs as a schedule job (see schedule_jobs), holding the DB-level schedule
+    lock while it reads and writes. When the inputs match the last run's
+    fingerprint, the cached result is returned and nothing is written.
+    Returns the job result.
+    """
+    engine_name = app.config['SCHEDULER_ENGINE']
+    with schedule_lock(owner, wait=app.config['SCHEDULE_LOCK_WAIT']):
+        # Detached snapshot of the incomplete tasks (only the scheduler's columns)
+        snapshot = load_task_snapshot()
+
+        external_events, calendar_sources = load_busy_events()
+        space_constraints = load_space_constraints()
+
+        def fingerprint():
+            return schedule_fingerprint(
+                load_task_versions(), external_events, space_constraints,
+                datetime.now(), extra=[engine_name, options]
+            )
+
+        if fingerprint() == last_schedule['fingerprint']:
+            return dict(
+                last_schedule['result'],
+                updated_tasks=0,
+                cached=True,
+                calendar_sources=calendar_sources
+            )
+
+        if 'time_budget' in options:
+            scheduled_tasks = optimize_schedule(
+                snapshot,
+                external_events,
+                space_constraints,
+                time_budget=options['time_budget'],
+                workers=app.config['OPTIMIZER_WORKERS'] or None
+            )
+        else:
+            # Schedule tasks with the configured engine
+            engine = SCHEDULER_ENGINES.get(engine_name, schedule_tasks)
+            scheduled_tasks = engine(snapshot, external_events, space_constraints)
+
+        # One bulk UPDATE for the rows that moved
+        updated_tasks = write_schedule(scheduled_tasks, snapshot)
+        # Taken after the write: moved rows got a new updated_at
+        new_fingerprint = fingerprint()
+
+    # Report tasks whose deadlines cannot all be met, and by how much
+    overcommitted = analyze_feasibility(snapshot, external_events, space_constraints)
+    if overcommitted:
+        titles = dict(db.session.query(Task.id, Task.title).filter(
+            Task.id.in_([entry['id'] for entry in overcommitted])
+        ))
+        for entry in overcommitted:
+            entry['title'] = titles.get(entry['id'])
+            entry['deadline'] = entry['deadline'].isoformat()
+
+    result = {
+        'success': True,
+        'scheduled_tasks': len(scheduled_tasks),
+        'updated_tasks': updated_tasks,
+        'overcommitted': overcommitted,
+        'calendar_sources': calendar_sources,
+        'cached': False
+    }
+    last_schedule.update(fingerprint=new_fingerprint, result=result)
+    return result
+
+
+schedule_jobs = ScheduleJobManager(app, run_schedule)
+
+
+@app.route('/api/schedule', methods=['POST'])
+@login_required
+def auto_schedule():
+    # Optional optimizing mode: {"optimize": true, "time_budget": <seconds>}
+    data = request.get_json(silent=True) or {}
+    options = {}
+    if data.get('optimize'):
+        try:
+            time_budget = float(data.get('time_budget', 2.0))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'time_budget must be a number of seconds'}), 400
+        options['time_budget'] = min(max(time_budget, 0.0), app.config['OPTIMIZER_MAX_BUDGET'])
+
+    # Runs in the background; identical requests share the in-flight job
+    job, coalesced = schedule_jobs.submit(options)
+    result = job.to_dict()
+    result['coalesced'] = coalesced
+    return jsonify(result), 202
+
+
+@app.route('/api/schedule/jobs/<job_id>', methods=['GET'])
+@login_required
+def get_schedule_job(job_id):
+    job = schedule_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown schedule job'}), 404
+    return jsonify(job.to_dict())
 
 
 # Space endpoints
@@ -450,11 +789,16 @@ def create_calendar_source():
     source = CalendarSource(
         name=data['name'],
         ics_url=data['ics_url'],
-        enabled=data.get('enabled', True)
+        enabled=data.get('enabled', True),
+        sync_interval=data.get('sync_interval', 15)
     )
 
     db.session.add(source)
     db.session.commit()
+    busy_cache.invalidate(source.id)
+
+    # Fetch the new feed now rather than at the next poll
+    calendar_sync.wake()
 
     return jsonify(source.to_dict()), 201
 
@@ -463,30 +807,99 @@ def create_calendar_source():
 @login_required
 def delete_calendar_source(source_id):
     source = CalendarSource.query.get_or_404(source_id)
+    ExternalEvent.query.filter_by(source_id=source.id).delete()
     db.session.delete(source)
     db.session.commit()
+    busy_cache.invalidate(source_id)
     return jsonify({'success': True})
 
 
+@app.route('/api/calendar-sources/busy-cache', methods=['GET'])
+@login_required
+def get_busy_cache_stats():
+    """Size (sources, merged intervals, array bytes) and hit/miss counters of the busy cache."""
+    return jsonify(busy_cache.stats())
+
+
 @app.route('/api/external-events', methods=['GET'])
 @login_required
 def get_external_events():
-    all_events = []
-    sources = CalendarSource.query.filter_by(enabled=True).all()
-
-    for source in sources:
-        events = fetch_external_events(source.ics_url)
-        # Convert datetime objects to ISO format strings for JSON serialization
-        for event in events:
-            if isinstance(event.get('start'), datetime):
-                event['start'] = event['start'].isoformat()
-            if isinstance(event.get('end'), datetime):
-                event['end'] = event['end'].isoformat()
-        all_events.extend(events)
-
+    # ?busy=true: merged busy intervals only (free/busy view), from the busy cache
+    if request.args.get('busy', 'false').lower() == 'true':
+        all_events, statuses = load_busy_events()
+    else:
+        all_events, statuses = load_external_events()
+
+    # Convert datetime objects to ISO format strings for JSON serialization
+    for event in all_events:
+        if isinstance(event.get('start'), datetime):
+            event['start'] = event['start'].isoformat()
+        if isinstance(event.get('end'), datetime):
+            event['end'] = event['end'].isoformat()
+
+    # ?include_status=true: also report which feeds answered
+    if request.args.get('include_status', 'false').lower() == 'true':
+        return jsonify({'events': all_events, 'sources': statuses})
     return jsonify(all_events)
 
 
+# Longest task the calendar range query looks back for (keeps the
+# scheduled_start predicate a bounded index range)
+MAX_TASK_SPAN = timedelta(days=7)
+
+
+@app.route('/api/calendar', methods=['GET'])
+@login_required
+def get_calendar():
+    """Tasks and external events overlapping [start, end), shaped for FullCalendar."""
+    try:
+        start = parse_iso_datetime(request.args.get('start'))
+        end = parse_iso_datetime(request.args.get('end'))
+    except ValueError:
+        start = end = None
+    if not start or not end or end <= start:
+        return jsonify({'error': 'start and end must be ISO datetimes with start < end'}), 400
+    include_completed = request.args.get('include_completed', 'false').lower() == 'true'
+
+    query = Task.query.filter(
+        Task.scheduled_start >= start - MAX_TASK_SPAN,
+        Task.scheduled_start < end,
+        Task.scheduled_end > start
+    )
+    if not include_completed:
+        query = query.filter_by(completed=False)
+
+    events = []
+    for task in query.order_by(Task.scheduled_start):
+        class_name = 'task-event'
+        if task.completed:
+            class_name += ' completed-task'
+        elif task.frozen:
+            class_name += ' frozen-task'
+        events.append({
+            'id': f'task-{task.id}',
+            'title': f'❄️ {task.title}' if task.frozen else task.title,
+            'start': task.scheduled_start.isoformat(),
+            'end': task.scheduled_end.isoformat(),
+            'className': class_name,
+            'editable': not task.completed,  # Prevent editing completed tasks
+            'extendedProps': {'type': 'task', 'taskId': task.id}
+        })
+
+    for event in load_stored_events(start, end):
+        events.append({
+            'id': f"external-{event['id']}",
+            'title': event['title'],
+            'start': event['start'].isoformat(),
+            'end': event['end'].isoformat(),
+            'className': 'external-event',
+            'editable': False,
+            'extendedProps': {'type': 'external', 'description': event['description']}
+        })
+
+    return jsonify(events)
+
+
 # Change log endpoints
 @app.route('/api/logs', methods=['GET'])
 @login_required
@@ -597,16 +1010,39 @@ def delete_note(note_id):
 @login_required
 def cleanify_note(note_id):
     note = Note.query.get_or_404(note_id)
+    content = cleanify_note_with_ai(note.content_markdown, build_cleanify_prompt(note), cache=llm_cache)
+    return jsonify({'content': content})
+
+
+@app.route('/api/notes/<int:note_id>/cleanify/stream', methods=['POST'])
+@login_required
+def cleanify_note_stream(note_id):
+    """Cleanify as Server-Sent Events: `delta` events carry chunks of model
+    text as they arrive, then `done` ({content}) or `error` ({content: the
+    original text, error}). Like /cleanify, nothing is persisted."""
+    note = Note.query.get_or_404(note_id)
+    events = stream_cleanify_note_with_ai(note.content_markdown, build_cleanify_prompt(note), cache=llm_cache)
+
+    def generate():
+        for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 
+def build_cleanify_prompt(note):
+    """Cleanify system prompt plus the note's Space context."""
     space = note.space_rel
     system_prompt = app.config['NOTES_CLEANIFY_PROMPT']
     system_prompt += (
         f"\n\nNote's Space context:\nName: {space.name}\n"
         f"Description: {space.description or ''}"
     )
-
-    content = cleanify_note_with_ai(note.content_markdown, system_prompt)
-    return jsonify({'content': content})
+    return system_prompt
 
 
 @app.route('/api/notes/<int:note_id>/promote-to-task', methods=['POST'])
@@ -627,7 +1063,7 @@ def promote_note_to_task(note_id):
     system_prompt = app.config['SYSTEM_PROMPT'] + "\n\nAvailable spaces:\n" + spaces_info
 
     # Reuse the existing AI parse path (no new AI code path; PRD decision G).
-    drafts = parse_task_with_ai(selected_text, system_prompt)
+    drafts = parse_task_with_ai(selected_text, system_prompt, cache=llm_cache)
 
     # Default each draft's space_id to the note's space_id when the LLM did not
     # pick one (default, NOT override — LLM-chosen spaces are left alone).
@@ -641,6 +1077,13 @@ def promote_note_to_task(note_id):
     return jsonify(drafts)
 
 
+@app.route('/api/llm-cache/stats', methods=['GET'])
+@login_required
+def get_llm_cache_stats():
+    """Size, limits and hit/miss/eviction counters of the AI response cache."""
+    return jsonify(llm_cache.stats())
+
+
 @app.route('/notes')
 def notes_page():
     if not session.get('authenticated'):
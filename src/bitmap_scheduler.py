@@ -0,0 +1,141 @@
+"""
+Slot-bitmap scheduling engine.
+
+Same input/output contract as `scheduler.schedule_tasks`, but the horizon is
+turned into a grid of 30-minute slots (anchored like `round_to_next_30min`):
+one boolean occupancy array for external events, frozen tasks and already
+placed tasks, plus one precomputed "inside a window" mask per space. First-fit
+for a task spanning k slots is a vectorized run-length search over the grid
+instead of a Python loop over candidate starts.
+
+Selected with `SCHEDULER_ENGINE=bitmap`. Falls back to the default engine when
+NumPy is not installed.
+"""
+
+import math
+from datetime import datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from scheduler import (
+    SECONDS_PER_WEEK,
+    _second_of_week,
+    compile_space_constraints,
+    round_to_next_30min,
+    schedule_tasks,
+    task_sort_key,
+    task_space_key,
+)
+
+SLOT = timedelta(minutes=30)
+SLOT_SECONDS = int(SLOT.total_seconds())
+DEFAULT_HORIZON_DAYS = 90
+MAX_HORIZON_DAYS = 366
+
+
+def schedule_tasks_bitmap(tasks, external_events, space_constraints):
+    """
+    Schedule tasks on a 30-minute slot bitmap.
+
+    Args, return value and placement order are those of
+    `scheduler.schedule_tasks`. Durations are rounded up to whole slots when
+    reserving the grid, which matches the greedy engine resuming its search on
+    the 30-minute grid after each busy block.
+    """
+    if np is None:
+        return schedule_tasks(tasks, external_events, space_constraints)
+
+    frozen_tasks = [t for t in tasks if t.frozen and t.scheduled_start and t.scheduled_end]
+    sorted_tasks = sorted((t for t in tasks if not t.frozen), key=task_sort_key)
+
+    now = round_to_next_30min(datetime.now())
+    horizon = now + timedelta(days=DEFAULT_HORIZON_DAYS)
+    deadlines = [t.deadline for t in sorted_tasks if t.deadline]
+    if deadlines:
+        horizon = min(max(horizon, max(deadlines)), now + timedelta(days=MAX_HORIZON_DAYS))
+    n_slots = _slot_ceil(now, horizon)
+
+    occupied = _occupancy(
+        now,
+        n_slots,
+        [(event['start'], event['end']) for event in external_events] +
+        [(t.scheduled_start, t.scheduled_end) for t in frozen_tasks]
+    )
+
+    space_windows = compile_space_constraints(space_constraints)
+    masks = {}
+
+    scheduled_tasks = []
+    for task in sorted_tasks:
+        duration = timedelta(minutes=task.estimated_duration or 60)
+        k = max(1, math.ceil(duration / SLOT))
+
+        if task.deadline:
+            limit = _slot_ceil(now, task.deadline - duration)
+        else:
+            limit = _slot_ceil(now, now + timedelta(days=DEFAULT_HORIZON_DAYS))
+        limit = min(limit, n_slots - k + 1)
+        if limit <= 0:
+            continue
+
+        windows = space_windows.get(task_space_key(task, space_windows))
+        free = ~occupied
+        if windows is not None:
+            if id(windows) not in masks:
+                masks[id(windows)] = _window_mask(now, n_slots, windows)
+            free &= masks[id(windows)]
+
+        start_index = _first_run(free, k, limit)
+        if start_index is None:
+            continue
+
+        occupied[start_index:start_index + k] = True
+        slot_start = now + start_index * SLOT
+        scheduled_tasks.append({
+            'id': task.id,
+            'scheduled_start': slot_start,
+            'scheduled_end': slot_start + duration
+        })
+
+    return scheduled_tasks
+
+
+def _slot_ceil(now, dt):
+    """Number of slots from `now` needed to reach `dt` (0 if `dt` is not after `now`)."""
+    if dt <= now:
+        return 0
+    return math.ceil((dt - now).total_seconds() / SLOT_SECONDS)
+
+
+def _occupancy(now, n_slots, intervals):
+    """Boolean array marking every slot touched by one of `intervals`."""
+    delta = np.zeros(n_slots + 1, dtype=np.int32)
+    if intervals:
+        starts = np.array([(s - now).total_seconds() for s, _ in intervals])
+        ends = np.array([(e - now).total_seconds() for _, e in intervals])
+        first = np.clip(np.floor(starts / SLOT_SECONDS), 0, n_slots).astype(np.int64)
+        last = np.clip(np.ceil(ends / SLOT_SECONDS), 0, n_slots).astype(np.int64)
+        keep = last > first
+        np.add.at(delta, first[keep], 1)
+        np.add.at(delta, last[keep], -1)
+    return np.cumsum(delta[:-1]) > 0
+
+
+def _window_mask(now, n_slots, windows):
+    """True for slots lying entirely inside one of the space's weekly windows."""
+    bounds = np.array(list(windows), dtype=np.int64).reshape(-1, 2)
+    if not len(bounds):
+        return np.zeros(n_slots, dtype=bool)
+    offsets = (_second_of_week(now) + np.arange(n_slots, dtype=np.int64) * SLOT_SECONDS) % SECONDS_PER_WEEK
+    i = np.searchsorted(bounds[:, 0], offsets, side='right') - 1
+    return (i >= 0) & (offsets + SLOT_SECONDS <= bounds[np.maximum(i, 0), 1])
+
+
+def _first_run(free, k, limit):
+    """Index of the first run of `k` free slots starting before `limit`, or None."""
+    counts = np.concatenate(([0], np.cumsum(free, dtype=np.int32)))
+    fits = np.flatnonzero(counts[k:k + limit] - counts[:limit] == k)
+    return int(fits[0]) if fits.size else None
@@ -0,0 +1,149 @@
+"""
+Process-wide cache of external busy time.
+
+The scheduler only needs to know *when* the external calendars are busy, not
+what the events are. `BusyCache` keeps, per calendar source, the source's
+stored events merged into disjoint intervals and held as two sorted parallel
+arrays of epoch-minute starts and ends (`array('i')`, 4 bytes per bound).
+A range lookup is two bisects per source, and the arrays are shared by every
+request and schedule job in the process instead of re-reading event rows.
+
+An entry is valid for the `last_fetched` value its source had when it was
+built: the sync worker bumps `last_fetched` on every sync that reaches the
+feed, so the next lookup rebuilds that source only. Adding or deleting a
+source through `/api/calendar-sources` invalidates its entry explicitly.
+"""
+
+import heapq
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+from models import db, CalendarSource, ExternalEvent
+
+EPOCH = datetime(1970, 1, 1)
+MINUTE = timedelta(minutes=1)
+
+
+def to_epoch_minute(dt, round_up=False):
+    """Naive datetime -> minutes since EPOCH (floor, or ceiling with `round_up`)."""
+    minutes, remainder = divmod(dt - EPOCH, MINUTE)
+    return minutes + 1 if round_up and remainder else minutes
+
+
+def from_epoch_minute(minutes):
+    return EPOCH + timedelta(minutes=minutes)
+
+
+class SourceIntervals:
+    """Merged busy intervals of one source as sorted epoch-minute arrays."""
+
+    __slots__ = ('version', 'starts', 'ends')
+
+    def __init__(self, version, intervals):
+        self.version = version
+        self.starts = array('i')
+        self.ends = array('i')
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if self.ends and start <= self.ends[-1]:
+                if end > self.ends[-1]:
+                    self.ends[-1] = end
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlapping(self, start, end):
+        """(start, end) minute pairs overlapping [start, end), in order."""
+        lo = bisect_right(self.ends, start)
+        hi = bisect_left(self.starts, end, lo=lo)
+        return zip(self.starts[lo:hi], self.ends[lo:hi])
+
+    @property
+    def nbytes(self):
+        return (self.starts.buffer_info()[1] + self.ends.buffer_info()[1]) * self.starts.itemsize
+
+
+class BusyCache:
+    """Merged busy intervals per enabled calendar source, rebuilt lazily."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources = {}
+        self.hits = 0
+        self.misses = 0
+
+    def busy_events(self, start, end):
+        """
+        Busy time of the enabled sources overlapping [start, end), merged
+        across sources, as the scheduler's event dicts ({'start', 'end'}).
+        """
+        lo, hi = to_epoch_minute(start), to_epoch_minute(end, round_up=True)
+        merged = []
+        for busy_start, busy_end in heapq.merge(
+            *(entry.overlapping(lo, hi) for entry in self._current().values())
+        ):
+            if merged and busy_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], busy_end)
+            else:
+                merged.append([busy_start, busy_end])
+        return [
+            {'start': from_epoch_minute(busy_start), 'end': from_epoch_minute(busy_end)}
+            for busy_start, busy_end in merged
+        ]
+
+    def invalidate(self, source_id=None):
+        """Drop one source's entry, or every entry."""
+        with self._lock:
+            if source_id is None:
+                self._sources.clear()
+            else:
+                self._sources.pop(source_id, None)
+
+    def stats(self):
+        with self._lock:
+            entries = dict(self._sources)
+            hits, misses = self.hits, self.misses
+        return {
+            'sources': len(entries),
+            'intervals': sum(len(entry) for entry in entries.values()),
+            'bytes': sum(entry.nbytes for entry in entries.values()),
+            'hits': hits,
+            'misses': misses
+        }
+
+    def _current(self):
+        """Entries of the enabled sources, rebuilding the stale ones."""
+        versions = dict(
+            db.session.query(CalendarSource.id, CalendarSource.last_fetched)
+            .filter(CalendarSource.enabled.is_(True))
+        )
+        with self._lock:
+            for source_id in set(self._sources) - set(versions):
+                del self._sources[source_id]
+            entries = dict(self._sources)
+
+        hits = 0
+        for source_id, version in versions.items():
+            entry = entries.get(source_id)
+            if entry is not None and entry.version == version:
+                hits += 1
+                continue
+            entries[source_id] = SourceIntervals(version, (
+                (to_epoch_minute(event_start), to_epoch_minute(event_end, round_up=True))
+                for event_start, event_end in db.session.query(
+                    ExternalEvent.start, ExternalEvent.end
+                ).filter(ExternalEvent.source_id == source_id)
+            ))
+
+        with self._lock:
+            for source_id in versions:
+                self._sources[source_id] = entries[source_id]
+            self.hits += hits
+            self.misses += len(versions) - hits
+        return entries
@@ -1,60 +1,526 @@
+import mmap
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
 import requests
-from icalendar import Calendar
 from datetime import datetime, timedelta
+from functools import lru_cache
+from urllib.parse import unquote, urlparse
+
+from dateutil.rrule import rruleset, rrulestr
+
+FETCH_TIMEOUT = 10
+
+
+def fetch_all_external_events(sources, deadline=15.0, max_workers=8, days_ahead=30, ttl=0.0,
+                              validators=None):
+    """
+    Fetch several ICS calendars concurrently under one shared deadline.
+
+    Args:
+        sources: Iterable of (key, ics_url) pairs
+        deadline: Seconds the whole batch may take; feeds still running then
+            are reported as timed out and their events are left out
+        max_workers: Upper bound on concurrent fetches
+        days_ahead: Number of days ahead to fetch events for
+        ttl: Seconds a parsed feed is served from cache (see fetch_feed)
+        validators: Optional dict mapping source keys to stored
+            (etag, last_modified) pairs (see fetch_feed)
+
+    Returns:
+        (events, statuses): the events of every feed that answered, each
+        tagged with its source key as 'source_id', and a
+        dict mapping each key to {'status': 'ok' | 'error' | 'timeout',
+        'events': count, 'error': message or None, 'elapsed_ms': int}; an
+        'ok' status also carries fetch_feed's cache, etag and last_modified
+        (cache 'not_modified': the feed answered 304 to the stored validators
+        and contributed no events)
+    """
+    sources = list(sources)
+    validators = validators or {}
+    if not sources:
+        return [], {}
+
+    started = time.monotonic()
+    deadline_at = started + deadline
+    elapsed = {}
+
+    def fetch(key, ics_url):
+        # Never wait on one socket longer than the batch has left
+        timeout = max(0.1, min(FETCH_TIMEOUT, deadline_at - time.monotonic()))
+        try:
+            return fetch_feed(ics_url, days_ahead, timeout=timeout, ttl=ttl,
+                              validators=validators.get(key))
+        finally:
+            elapsed[key] = time.monotonic() - started
 
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(sources)))
+    try:
+        futures = {key: executor.submit(fetch, key, ics_url) for key, ics_url in sources}
+        wait(futures.values(), timeout=max(0.0, deadline_at - time.monotonic()))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
-def fetch_external_events(ics_url, days_ahead=30):
+    events = []
+    statuses = {}
+    batch_elapsed = time.monotonic() - started
+    for key, future in futures.items():
+        status = {
+            'status': 'ok',
+            'events': 0,
+            'error': None,
+            'elapsed_ms': int(elapsed.get(key, batch_elapsed) * 1000)
+        }
+        if not future.done():
+            status.update(status='timeout', error=f'No answer within {deadline:g}s')
+        elif future.exception() is not None:
+            status.update(status='error', error=str(future.exception()))
+        else:
+            feed_events, info = future.result()
+            feed_events = feed_events or []
+            for event in feed_events:
+                event['source_id'] = key
+            events.extend(feed_events)
+            status['events'] = len(feed_events)
+            status.update(info)
+        statuses[key] = status
+
+    return events, statuses
+
+
+def fetch_external_events(ics_url, days_ahead=30, timeout=FETCH_TIMEOUT, ttl=0.0):
     """
     Fetch events from an external ICS calendar URL.
 
     Args:
         ics_url: URL to the ICS calendar
         days_ahead: Number of days ahead to fetch events for
+        timeout: Seconds to wait for the server
+        ttl: Seconds a parsed feed is served from cache without asking the server
 
     Returns:
         List of event dicts with start, end, title, and description
     """
-    response = requests.get(ics_url, timeout=10)
-    response.raise_for_status()
+    return fetch_feed(ics_url, days_ahead, timeout, ttl)[0]
 
-    cal = Calendar.from_ical(response.content)
 
-    events = []
+class _CachedFeed:
+    """Parsed events of one feed plus the validators the server sent with them."""
+
+    __slots__ = ('events', 'parsed_at', 'checked_at', 'etag', 'last_modified')
+
+    def __init__(self, events, parsed_at, checked_at, etag, last_modified):
+        self.events = events
+        self.parsed_at = parsed_at
+        self.checked_at = checked_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+# Parsed feeds by (ics_url, days_ahead), shared by all requests of the process
+_feed_cache = {}
+_feed_cache_lock = threading.Lock()
+
+# Feeds are parsed this far past the requested window, so a cached parse (and
+# a 304 for it) stays complete while the window slides forward.
+PARSE_MARGIN = timedelta(days=1)
+
+
+def fetch_feed(ics_url, days_ahead=30, timeout=FETCH_TIMEOUT, ttl=0.0, validators=None):
+    """
+    Fetch one feed through the parsed-event cache.
+
+    Within `ttl` seconds of the last check the cached events are returned
+    without any request. After that the server is asked with If-None-Match /
+    If-Modified-Since, and a 304 keeps the cached parse.
+
+    Without a cached parse (first fetch in this process), `validators`
+    (etag, last_modified), as stored on the calendar source, are sent
+    instead; a 304 then returns None for the events: the caller's own copy
+    of them is still current.
+
+    `file://` URLs are read from disk instead (see fetch_local_feed).
+
+    Returns:
+        (events, info) where info is {'cache': 'hit' | 'revalidated' | 'miss' |
+        'not_modified', 'etag': ..., 'last_modified': ...}
+    """
+    if ics_url.startswith('file://'):
+        return fetch_local_feed(ics_url, days_ahead)
+
+    key = (ics_url, days_ahead)
+    now = datetime.now()
+    with _feed_cache_lock:
+        cached = _feed_cache.get(key)
+    if cached is not None and now - cached.parsed_at > PARSE_MARGIN:
+        cached = None
+
+    if cached is not None and time.monotonic() - cached.checked_at < ttl:
+        return _in_window(cached.events, now, days_ahead), _feed_info('hit', cached)
+
+    if cached is not None:
+        etag, last_modified = cached.etag, cached.last_modified
+    else:
+        etag, last_modified = validators or (None, None)
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    # Streamed: the body is parsed line by line, never held whole in memory
+    with requests.get(ics_url, timeout=timeout, headers=headers, stream=True) as response:
+        if cached is not None and response.status_code == 304:
+            cached.checked_at = time.monotonic()
+            return _in_window(cached.events, now, days_ahead), _feed_info('revalidated', cached)
+        if headers and response.status_code == 304:
+            return None, {'cache': 'not_modified', 'etag': etag, 'last_modified': last_modified}
+        response.raise_for_status()
+
+        # Day-aligned window, so recurrence expansions are reused all day
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        events = parse_ics_stream(
+            response.iter_lines(chunk_size=64 * 1024),
+            day_start,
+            day_start + timedelta(days=days_ahead + 1) + PARSE_MARGIN
+        )
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+
+    cached = _CachedFeed(events, now, time.monotonic(), etag, last_modified)
+    with _feed_cache_lock:
+        _feed_cache[key] = cached
+    return _in_window(events, now, days_ahead), _feed_info('miss', cached)
+
+
+def fetch_local_feed(file_url, days_ahead=30):
+    """
+    Read a `file://` source: one .ics file, or a directory of .ics files (as
+    written by vdirsyncer, one event per file).
+
+    Each file is memory-mapped and streamed through the parser, and re-parsed
+    only when its mtime or size changed; unchanged files are served from the
+    parsed-feed cache.
+
+    Returns:
+        (events, info) like fetch_feed; 'cache' is 'hit' when no file had to
+        be parsed, and there are no HTTP validators.
+    """
+    path = unquote(urlparse(file_url).path)
+    if os.path.isdir(path):
+        paths = sorted(
+            entry.path for entry in os.scandir(path)
+            if entry.is_file() and entry.name.lower().endswith('.ics')
+        )
+    else:
+        paths = [path]
+
     now = datetime.now()
+    events = []
+    cache = 'hit'
+    for file_path in paths:
+        file_events, hit = _read_local_file(file_path, days_ahead, now)
+        events.extend(file_events)
+        if not hit:
+            cache = 'miss'
+    return events, {'cache': cache, 'etag': None, 'last_modified': None}
+
+
+def _read_local_file(path, days_ahead, now):
+    """In-window events of one .ics file and whether the cached parse was used."""
+    stat = os.stat(path)  # FileNotFoundError reports the source as failed
+    signature = f'{stat.st_mtime_ns}-{stat.st_size}'
+    key = ('file', path, days_ahead)
+    with _feed_cache_lock:
+        cached = _feed_cache.get(key)
+    if cached is not None and cached.etag == signature and now - cached.parsed_at <= PARSE_MARGIN:
+        return _in_window(cached.events, now, days_ahead), True
+
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    window_end = day_start + timedelta(days=days_ahead + 1) + PARSE_MARGIN
+    events = []
+    if stat.st_size:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            events = parse_ics_stream(iter(mapped.readline, b''), day_start, window_end)
+
+    cached = _CachedFeed(events, now, time.monotonic(), signature, None)
+    with _feed_cache_lock:
+        _feed_cache[key] = cached
+    return _in_window(events, now, days_ahead), False
+
+
+def clear_feed_cache():
+    with _feed_cache_lock:
+        _feed_cache.clear()
+
+
+def _feed_info(cache, feed):
+    return {'cache': cache, 'etag': feed.etag, 'last_modified': feed.last_modified}
+
+
+def _in_window(events, now, days_ahead):
+    """Copies of the cached events overlapping [now, now + days_ahead)."""
     end_date = now + timedelta(days=days_ahead)
+    return [dict(event) for event in events if event['start'] < end_date and event['end'] > now]
+
+
+def parse_ics_events(content, window_start, window_end):
+    """
+    Parse the VEVENTs of an ICS document that overlap [window_start, window_end).
+
+    Returns:
+        List of event dicts with start, end, title, and description
+    """
+    return parse_ics_stream(content.splitlines(), window_start, window_end)
+
+
+def parse_ics_stream(lines, window_start, window_end):
+    """
+    Streaming counterpart of parse_ics_events over an iterable of raw lines
+    (bytes, e.g. `response.iter_lines()`).
 
-    for component in cal.walk():
-        if component.name == "VEVENT":
-            start = component.get('dtstart')
-            end = component.get('dtend')
-            summary = component.get('summary')
-            description = component.get('description')
-
-            if start and end:
-                # Convert to datetime if needed
-                start_dt = start.dt if hasattr(start, 'dt') else start
-                end_dt = end.dt if hasattr(end, 'dt') else end
-
-                # Handle date-only events (convert to datetime)
-                if not isinstance(start_dt, datetime):
-                    start_dt = datetime.combine(start_dt, datetime.min.time())
-                if not isinstance(end_dt, datetime):
-                    end_dt = datetime.combine(end_dt, datetime.min.time())
-
-                # Make timezone naive for easier comparison
-                if start_dt.tzinfo:
-                    start_dt = start_dt.replace(tzinfo=None)
-                if end_dt.tzinfo:
-                    end_dt = end_dt.replace(tzinfo=None)
-
-                # Only include events within our time range
-                if start_dt < end_date and end_dt > now:
-                    events.append({
-                        'start': start_dt,
-                        'end': end_dt,
-                        'title': str(summary) if summary else 'Untitled Event',
-                        'description': str(description) if description else '',
-                        'source': 'external'
-                    })
+    Only top-level VEVENT blocks are tokenized, and only DTSTART / DTEND are
+    decoded before the window check, so an out-of-window event costs a few
+    string operations and memory stays bounded by the largest single event
+    (plus the definitions of recurring events).
+    Date-times keep their wall-clock value (TZID and a trailing Z are
+    ignored), and date-only values start at midnight.
+
+    Recurring events (RRULE / RDATE, minus EXDATE) are expanded to the
+    occurrences overlapping the window; an instance overridden by a
+    RECURRENCE-ID event is replaced by that event. Occurrences and overrides
+    get the uid `<UID>@<occurrence start>`. Cancelled events are left out.
+    """
+    events = []
+    masters = []
+    overridden = {}
+    for props in iter_vevents(lines):
+        recurrence_id = _prop_datetime(props, 'RECURRENCE-ID')
+        if recurrence_id is None and ('RRULE' in props or 'RDATE' in props):
+            # Expanded once every override is known
+            masters.append(props)
+            continue
+
+        uid = _prop_text(props, 'UID')
+        if recurrence_id is not None:
+            overridden.setdefault(uid, set()).add(recurrence_id)
+            uid = f'{uid}@{recurrence_id.isoformat()}'
+
+        start_dt = _prop_datetime(props, 'DTSTART')
+        end_dt = _prop_datetime(props, 'DTEND')
+        if start_dt is None or end_dt is None or _is_cancelled(props):
+            continue
+
+        # Only include events within our time range
+        if start_dt < window_end and end_dt > window_start:
+            events.append(_event_dict(props, uid, start_dt, end_dt))
+
+    for props in masters:
+        start_dt = _prop_datetime(props, 'DTSTART')
+        end_dt = _prop_datetime(props, 'DTEND')
+        if start_dt is None or end_dt is None or _is_cancelled(props):
+            continue
+
+        uid = _prop_text(props, 'UID')
+        duration = end_dt - start_dt
+        occurrences = expand_occurrences(
+            start_dt,
+            duration,
+            tuple(value.decode('ascii', 'replace') for _, value in props.get('RRULE', ())),
+            tuple(sorted(_prop_datetimes(props, 'RDATE'))),
+            tuple(sorted(_prop_datetimes(props, 'EXDATE') | overridden.get(uid, set()))),
+            window_start,
+            window_end
+        )
+        if occurrences:
+            template = _event_dict(props, uid, start_dt, end_dt)
+            for occurrence in occurrences:
+                events.append(dict(
+                    template,
+                    uid=f'{uid}@{occurrence.isoformat()}' if uid else None,
+                    start=occurrence,
+                    end=occurrence + duration
+                ))
 
     return events
+
+
+def _event_dict(props, uid, start_dt, end_dt):
+    summary = _prop_text(props, 'SUMMARY')
+    description = _prop_text(props, 'DESCRIPTION')
+    return {
+        'uid': uid or None,
+        'start': start_dt,
+        'end': end_dt,
+        'title': summary if summary else 'Untitled Event',
+        'description': description or '',
+        'source': 'external'
+    }
+
+
+def _is_cancelled(props):
+    status = props.get('STATUS')
+    return bool(status) and status[0][1].strip().upper() == b'CANCELLED'
+
+
+# Upper bound on rule instances walked per expansion (FREQ=MINUTELY since 1990...)
+MAX_EXPANSION_STEPS = 100_000
+
+@lru_cache(maxsize=4096)
+def expand_occurrences(dtstart, duration, rrules, rdates, exdates, window_start, window_end):
+    """
+    Starts of the occurrences of one recurring event overlapping
+    [window_start, window_end), as a tuple.
+
+    The rule set is walked lazily in order and abandoned at window_end, so
+    only in-window instances are built. Results are memoized on the event's
+    definition and the window: re-parsing an unchanged feed for the same
+    (day-aligned) window does not expand again.
+    """
+    ruleset = rruleset()
+    ruleset.rdate(dtstart)  # DTSTART is always the first instance
+    for rule in rrules:
+        try:
+            # ignoretz: a UTC UNTIL is read as wall-clock time, like DTSTART
+            ruleset.rrule(rrulestr(rule, dtstart=dtstart, ignoretz=True))
+        except (ValueError, TypeError):
+            continue  # Malformed rule: keep the other instances
+    for rdate in rdates:
+        ruleset.rdate(rdate)
+    for exdate in exdates:
+        ruleset.exdate(exdate)
+
+    occurrences = []
+    for step, occurrence in enumerate(ruleset):
+        if occurrence >= window_end or step >= MAX_EXPANSION_STEPS:
+            break
+        if occurrence + duration > window_start:
+            occurrences.append(occurrence)
+    return tuple(occurrences)
+
+
+# VEVENT properties the parser keeps; everything else is skipped unparsed
+VEVENT_PROPERTIES = frozenset({
+    'UID', 'DTSTART', 'DTEND', 'SUMMARY', 'DESCRIPTION', 'STATUS',
+    'RRULE', 'RDATE', 'EXDATE', 'RECURRENCE-ID'
+})
+
+
+def iter_vevents(lines, properties=VEVENT_PROPERTIES):
+    """
+    Yield each top-level VEVENT of an ICS stream as {NAME: [(params, value), ...]}.
+
+    Lines are unfolded first. Properties of components nested in the event
+    (VALARM) and names outside `properties` are dropped; params and values
+    stay raw bytes.
+    """
+    event = None
+    depth = 0
+    for line in _unfold(lines):
+        if event is None:
+            if line[:12].upper() == b'BEGIN:VEVENT':
+                event = {}
+                depth = 0
+            continue
+
+        head = line[:6].upper()
+        if head == b'BEGIN:':
+            depth += 1
+        elif head[:4] == b'END:':
+            if depth:
+                depth -= 1
+            else:
+                yield event
+                event = None
+        elif not depth:
+            name, params, value = _split_property(line)
+            if name in properties:
+                event.setdefault(name, []).append((params, value))
+
+
+def _unfold(lines):
+    """Join RFC 5545 folded lines (continuations start with a space or tab)."""
+    current = None
+    for line in lines:
+        line = line.rstrip(b'\r\n')
+        if not line:
+            # Not valid ICS, but iter_lines yields one when a chunk splits a CRLF
+            continue
+        if line[:1] in (b' ', b'\t'):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _split_property(line):
+    """Split `NAME;PARAM=x:value` into (NAME, params bytes, value bytes)."""
+    colon = line.find(b':')
+    semi = line.find(b';', 0, colon if colon >= 0 else len(line))
+    if colon < 0:
+        return None, b'', b''
+    if semi < 0:
+        return line[:colon].decode('ascii', 'replace').upper(), b'', line[colon + 1:]
+
+    # Parameter values may be quoted and contain ':'
+    in_quotes = False
+    for i in range(semi, len(line)):
+        char = line[i:i + 1]
+        if char == b'"':
+            in_quotes = not in_quotes
+        elif char == b':' and not in_quotes:
+            return line[:semi].decode('ascii', 'replace').upper(), line[semi + 1:i], line[i + 1:]
+    return None, b'', b''
+
+
+def _prop_datetime(props, name):
+    values = props.get(name)
+    if not values:
+        return None
+    return parse_ics_datetime(values[0][1])
+
+
+def _prop_datetimes(props, name):
+    """Every date-time of a multi-valued property (RDATE, EXDATE), as a set."""
+    values = set()
+    for _, value in props.get(name, ()):
+        for item in value.split(b','):
+            # RDATE periods (start/end or start/duration): keep the start
+            parsed = parse_ics_datetime(item.split(b'/')[0])
+            if parsed is not None:
+                values.add(parsed)
+    return values
+
+
+def parse_ics_datetime(value):
+    """`YYYYMMDD` or `YYYYMMDDTHHMMSS[Z]` as a naive datetime (None if malformed)."""
+    value = value.strip()
+    try:
+        if len(value) == 8:
+            return datetime(int(value[:4]), int(value[4:6]), int(value[6:8]))
+        if len(value) >= 15 and value[8:9] in (b'T', b't'):
+            return datetime(
+                int(value[:4]), int(value[4:6]), int(value[6:8]),
+                int(value[9:11]), int(value[11:13]), int(value[13:15])
+            )
+    except ValueError:
+        pass
+    return None
+
+
+_TEXT_ESCAPES = re.compile(r'\\([\\;,nN])')
+
+
+def _prop_text(props, name):
+    values = props.get(name)
+    if not values:
+        return None
+    text = values[0][1].decode('utf-8', 'replace')
+    return _TEXT_ESCAPES.sub(lambda m: '\n' if m.group(1) in 'nN' else m.group(1), text)
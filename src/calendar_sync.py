@@ -0,0 +1,283 @@
+"""
+Background sync of external calendars into the `external_events` table.
+
+Request handlers no longer download ICS feeds: `/api/external-events` and
+`/api/schedule` read `ExternalEvent` rows with a range query. A
+`CalendarSyncWorker` thread wakes every `poll_interval` seconds. It fetches
+the enabled sources whose own `sync_interval` has elapsed, concurrently
+through `fetch_all_external_events`, and upserts each feed into the table.
+Only changed rows are written: new UIDs are inserted, changed ones updated,
+and UIDs that left the feed (or the sync window) are deleted.
+
+Readers never wait on a feed: they are served the stored events, however
+stale, while the worker refreshes them. A feed that keeps failing trips a
+per-source breaker (`record_failure`) and is skipped for a growing back-off
+period, with its last good events still served.
+"""
+
+import hashlib
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+
+from calendar_integration import fetch_all_external_events
+from models import db, CalendarSource, ExternalEvent
+from schedule_jobs import ScheduleLockBusy, schedule_lock
+
+# Same window the live fetch used
+DAYS_AHEAD = 30
+
+# Feeds are stored one day past DAYS_AHEAD, so a source's stored events stay
+# complete for VALIDATOR_MAX_AGE after they were written. Until then its
+# stored ETag / Last-Modified are sent even without an in-process parse
+# (after a restart, or from another process), and a 304 keeps its rows.
+STORED_DAYS = DAYS_AHEAD + 1
+VALIDATOR_MAX_AGE = timedelta(days=1)
+
+# A source failing this many syncs in a row is skipped for a back-off period
+# (its sync_interval, doubled per further failure, capped at MAX_BACKOFF); its
+# last good events stay in the table meanwhile.
+FAILURE_THRESHOLD = 3
+MAX_BACKOFF = timedelta(hours=6)
+
+# schedule_locks row held while syncing, so that with several server
+# processes only one of them fetches the feeds at a time
+SYNC_LOCK_NAME = 'calendar-sync'
+
+
+def sync_due_sources(deadline=15.0, max_workers=8, force=False):
+    """
+    Sync every enabled source that is due (or all of them with `force`) and commit.
+
+    Returns a dict mapping source id to its fetch status, extended with the
+    inserted / updated / deleted / unchanged counts for feeds that answered.
+    """
+    now = datetime.utcnow()
+    sources = [
+        source for source in CalendarSource.query.filter_by(enabled=True)
+        if force or _is_due(source, now)
+    ]
+    if not sources:
+        return {}
+
+    events, fetched = fetch_all_external_events(
+        [(source.id, source.ics_url) for source in sources],
+        deadline=deadline,
+        max_workers=max_workers,
+        days_ahead=STORED_DAYS,
+        validators={
+            source.id: (source.etag, source.last_modified)
+            for source in sources if _stored_events_current(source, now)
+        }
+    )
+    by_source = {}
+    for event in events:
+        by_source.setdefault(event['source_id'], []).append(event)
+
+    results = {}
+    for source in sources:
+        status = fetched[source.id]
+        if status['status'] == 'ok':
+            if status['cache'] == 'not_modified':
+                stored = ExternalEvent.query.filter_by(source_id=source.id).count()
+                status.update(inserted=0, updated=0, deleted=0, unchanged=stored)
+            else:
+                status.update(upsert_events(source.id, by_source.get(source.id, [])))
+                source.events_refreshed_at = now
+            source.last_fetched = now
+            source.etag = status.pop('etag')
+            source.last_modified = status.pop('last_modified')
+            source.consecutive_failures = 0
+            source.last_error = None
+            source.retry_after = None
+        else:
+            record_failure(source, status['error'], now)
+        results[source.id] = status
+
+    db.session.commit()
+    return results
+
+
+def upsert_events(source_id, events):
+    """Make the source's stored events match `events`, touching only changed
+    rows (not committed). Returns the inserted/updated/deleted/unchanged counts."""
+    incoming = {}
+    for key, event in zip(event_keys(events), events):
+        incoming[key] = event
+
+    existing = {row.uid: row for row in ExternalEvent.query.filter_by(source_id=source_id)}
+    counts = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+    for key, event in incoming.items():
+        values = {
+            'start': event['start'],
+            'end': event['end'],
+            'title': event.get('title'),
+            'description': event.get('description')
+        }
+        row = existing.pop(key, None)
+        if row is None:
+            db.session.add(ExternalEvent(source_id=source_id, uid=key, **values))
+            counts['inserted'] += 1
+        elif any(getattr(row, name) != value for name, value in values.items()):
+            for name, value in values.items():
+                setattr(row, name, value)
+            counts['updated'] += 1
+        else:
+            counts['unchanged'] += 1
+
+    for row in existing.values():
+        db.session.delete(row)
+        counts['deleted'] += 1
+
+    return counts
+
+
+def event_keys(events):
+    """
+    Stable per-source key of each event: its UID.
+
+    A UID that occurs more than once in the feed (overridden instances of a
+    recurring event) is suffixed with the occurrence start, and events without
+    a UID are keyed by a hash of their content.
+    """
+    uids = Counter(event.get('uid') for event in events)
+    keys = []
+    for event in events:
+        uid = event.get('uid')
+        if not uid:
+            content = f"{event['start'].isoformat()}|{event['end'].isoformat()}|{event.get('title')}"
+            uid = 'sha1:' + hashlib.sha1(content.encode()).hexdigest()
+        elif uids[uid] > 1:
+            uid = f"{uid}@{event['start'].isoformat()}"
+        keys.append(uid)
+    return keys
+
+
+def load_stored_events(start, end):
+    """Stored events of enabled sources overlapping [start, end), as the
+    scheduler's event dicts, with cross-source duplicates removed (see
+    dedupe_events)."""
+    rows = db.session.query(
+        ExternalEvent.id, ExternalEvent.source_id, ExternalEvent.uid, ExternalEvent.start,
+        ExternalEvent.end, ExternalEvent.title, ExternalEvent.description
+    ).join(CalendarSource, CalendarSource.id == ExternalEvent.source_id).filter(
+        CalendarSource.enabled.is_(True),
+        ExternalEvent.start < end,
+        ExternalEvent.end > start
+    ).order_by(ExternalEvent.start, ExternalEvent.source_id)
+    return dedupe_events([
+        {
+            'id': row.id,
+            'uid': row.uid,
+            'start': row.start,
+            'end': row.end,
+            'title': row.title or 'Untitled Event',
+            'description': row.description or '',
+            'source': 'external',
+            'source_id': row.source_id
+        }
+        for row in rows
+    ])
+
+
+def dedupe_events(events):
+    """
+    Drop events already seen in another feed: the same meeting subscribed
+    through several calendars shares its UID, or at least its start, end and
+    title. The first occurrence (earliest source) is kept, order is preserved.
+    """
+    seen_uids = set()
+    seen_slots = set()
+    unique = []
+    for event in events:
+        uid = event.get('uid')
+        if uid and uid.startswith('sha1:'):
+            uid = None  # content hash from event_keys, not a feed UID
+        slot = (event['start'], event['end'], event.get('title'))
+        if (uid and uid in seen_uids) or slot in seen_slots:
+            continue
+        if uid:
+            seen_uids.add(uid)
+        seen_slots.add(slot)
+        unique.append(event)
+    return unique
+
+
+def record_failure(source, error, now):
+    """Count a failed sync; from FAILURE_THRESHOLD on, back the source off."""
+    failures = (source.consecutive_failures or 0) + 1
+    source.consecutive_failures = failures
+    source.last_error = error
+    if failures >= FAILURE_THRESHOLD:
+        doublings = min(failures - FAILURE_THRESHOLD, 16)  # far past MAX_BACKOFF already
+        backoff = timedelta(minutes=source.sync_interval or 15) * 2 ** doublings
+        source.retry_after = now + min(backoff, MAX_BACKOFF)
+
+
+def _stored_events_current(source, now):
+    """Whether a 304 to the source's stored validators may keep its rows."""
+    return (
+        bool(source.etag or source.last_modified)
+        and source.events_refreshed_at is not None
+        and now - source.events_refreshed_at < VALIDATOR_MAX_AGE
+    )
+
+
+def _is_due(source, now):
+    if source.retry_after is not None and now < source.retry_after:
+        return False
+    if source.consecutive_failures:
+        return True  # retry failing feeds at the next poll until backed off
+    if source.last_fetched is None:
+        return True
+    return now - source.last_fetched >= timedelta(minutes=source.sync_interval or 15)
+
+
+class CalendarSyncWorker:
+    """Daemon thread running `sync_due_sources` every `poll_interval` seconds
+    (or as soon as `wake` is called).
+
+    Every serving process starts one; a poll is skipped while another process
+    holds the SYNC_LOCK_NAME lock.
+    """
+
+    def __init__(self, app, poll_interval=30):
+        self.app = app
+        self.poll_interval = poll_interval
+        self.owner = uuid.uuid4().hex
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='calendar-sync', daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def run_once(self):
+        """One poll; returns the sync results, or None if another process is syncing."""
+        with self.app.app_context():
+            try:
+                with schedule_lock(self.owner, name=SYNC_LOCK_NAME):
+                    return sync_due_sources(
+                        deadline=self.app.config['CALENDAR_FETCH_DEADLINE'],
+                        max_workers=self.app.config['CALENDAR_FETCH_WORKERS']
+                    )
+            except ScheduleLockBusy:
+                return None
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error syncing calendars: {e}")
+                return None
+
+    def _run(self):
+        while True:
+            self._wake.clear()
+            self.run_once()
+            self._wake.wait(self.poll_interval)
@@ -46,5 +46,35 @@ class Config:
     AI_MODEL = os.getenv('AI_MODEL', 'gpt-3.5-turbo')
     APP_PASSWORD = os.getenv('APP_PASSWORD', 'admin')
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
+    # Scheduling engine for /api/schedule: 'greedy' (scheduler.schedule_tasks)
+    # or 'bitmap' (bitmap_scheduler.schedule_tasks_bitmap, needs numpy)
+    SCHEDULER_ENGINE = os.getenv('SCHEDULER_ENGINE', 'greedy')
+    # Optimizing mode of /api/schedule: worker processes (0 = one per CPU) and
+    # the largest time budget (seconds) a caller may ask for
+    OPTIMIZER_WORKERS = int(os.getenv('OPTIMIZER_WORKERS', '0'))
+    OPTIMIZER_MAX_BUDGET = float(os.getenv('OPTIMIZER_MAX_BUDGET', '30'))
+    # /api/schedule runs as a background job (false = run inline in the request)
+    # and waits up to SCHEDULE_LOCK_WAIT seconds for another writer to finish
+    SCHEDULE_JOBS_ASYNC = os.getenv('SCHEDULE_JOBS_ASYNC', 'true').lower() == 'true'
+    SCHEDULE_LOCK_WAIT = float(os.getenv('SCHEDULE_LOCK_WAIT', '10'))
+    # The sync worker fetches ICS feeds concurrently: at most
+    # CALENDAR_FETCH_WORKERS at once, all within CALENDAR_FETCH_DEADLINE seconds
+    # (slower feeds are retried on the next poll)
+    CALENDAR_FETCH_WORKERS = int(os.getenv('CALENDAR_FETCH_WORKERS', '8'))
+    CALENDAR_FETCH_DEADLINE = float(os.getenv('CALENDAR_FETCH_DEADLINE', '15'))
+    # Seconds between checks for calendar sources due for a background sync
+    # (each source syncs every CalendarSource.sync_interval minutes)
+    CALENDAR_SYNC_POLL = float(os.getenv('CALENDAR_SYNC_POLL', '30'))
+    # Run the background calendar sync in serving processes (false = never
+    # start it; tests, one-off scripts)
+    CALENDAR_SYNC_ENABLED = os.getenv('CALENDAR_SYNC_ENABLED', 'true').lower() == 'true'
+    # AI responses (task parsing, Cleanify) are cached in the database for
+    # LLM_CACHE_TTL seconds, keeping the LLM_CACHE_MAX_ENTRIES most recently
+    # used (either set to 0 disables the cache)
+    LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600)))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1000'))
+    # POST /api/tasks/parse/batch: concurrent AI calls and inputs per request
+    AI_BATCH_WORKERS = int(os.getenv('AI_BATCH_WORKERS', '4'))
+    AI_BATCH_MAX_INPUTS = int(os.getenv('AI_BATCH_MAX_INPUTS', '100'))
     SYSTEM_PROMPT = load_system_prompt()
     NOTES_CLEANIFY_PROMPT = load_notes_cleanify_prompt()
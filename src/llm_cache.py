@@ -0,0 +1,118 @@
+"""
+Persistent cache of AI responses for task parsing and note Cleanify.
+
+Users re-submit the same text and promote-to-task re-parses selections, so
+`parse_task_with_ai` / `cleanify_note_with_ai` look requests up here first.
+The key hashes the kind of call, the normalized input, the system prompt, the
+model and (for parsing) the current hour, since relative deadlines ("in two
+hours", "tomorrow") are resolved against "now". Entries live in the
+`llm_cache` table, expire after `ttl` seconds and are evicted least recently
+used beyond `max_entries`. Cache statements run on their own connection, so
+they never commit a route's pending session changes.
+"""
+
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from models import db, LLMCacheEntry
+
+
+def normalize_input(kind, text):
+    """Parse input ignores whitespace layout; Cleanify keeps markdown intact
+    apart from line endings and surrounding blank space."""
+    if kind == 'parse':
+        return ' '.join(text.split())
+    return text.replace('\r\n', '\n').strip()
+
+
+def cache_key(kind, text, system_prompt, model, now=None):
+    bucket = (now or datetime.now()).strftime('%Y-%m-%dT%H') if kind == 'parse' else None
+    payload = json.dumps([kind, normalize_input(kind, text), system_prompt, model, bucket])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMCache:
+    """LRU + TTL cache of AI responses in the `llm_cache` table, with
+    process-wide hit / miss / eviction counters."""
+
+    def __init__(self, ttl=7 * 24 * 3600, max_entries=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_entries > 0
+
+    def key(self, kind, text, system_prompt, model):
+        return cache_key(kind, text, system_prompt, model)
+
+    def get(self, key):
+        """Cached response for `key` (decoded JSON), or None."""
+        now = datetime.utcnow()
+        with db.engine.begin() as conn:
+            row = conn.execute(
+                select(LLMCacheEntry.response, LLMCacheEntry.created_at)
+                .where(LLMCacheEntry.key == key)
+            ).first()
+            if row is not None and now - row.created_at > timedelta(seconds=self.ttl):
+                conn.execute(delete(LLMCacheEntry).where(LLMCacheEntry.key == key))
+                row = None
+            if row is not None:
+                conn.execute(
+                    update(LLMCacheEntry).where(LLMCacheEntry.key == key)
+                    .values(last_used_at=now, hits=LLMCacheEntry.hits + 1)
+                )
+        self._count('hits' if row is not None else 'misses')
+        return json.loads(row.response) if row is not None else None
+
+    def put(self, key, kind, response):
+        now = datetime.utcnow()
+        values = {'response': json.dumps(response), 'created_at': now, 'last_used_at': now, 'hits': 0}
+        with db.engine.begin() as conn:
+            conn.execute(
+                insert(LLMCacheEntry).values(key=key, kind=kind, **values)
+                .on_conflict_do_update(index_elements=['key'], set_=values)
+            )
+            count = conn.execute(select(func.count()).select_from(LLMCacheEntry)).scalar()
+            if count > self.max_entries:
+                # Least recently used first
+                stale = select(LLMCacheEntry.key).order_by(LLMCacheEntry.last_used_at).limit(
+                    count - self.max_entries
+                )
+                evicted = conn.execute(delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(stale))).rowcount
+                self._count('evictions', evicted)
+
+    def stats(self):
+        with db.engine.connect() as conn:
+            entries = conn.execute(select(func.count()).select_from(LLMCacheEntry)).scalar()
+        with self._lock:
+            hits, misses, evictions = self.hits, self.misses, self.evictions
+        lookups = hits + misses
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': hits,
+            'misses': misses,
+            'evictions': evictions,
+            'hit_rate': hits / lookups if lookups else None
+        }
+
+    def clear(self):
+        with db.engine.begin() as conn:
+            conn.execute(delete(LLMCacheEntry))
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
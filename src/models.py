@@ -15,7 +15,7 @@ class Task(db.Model):
     priority = db.Column(db.Integer, default=0)  # Higher number = higher priority
     deadline = db.Column(db.DateTime)
     estimated_duration = db.Column(db.Integer)  # in minutes
-    scheduled_start = db.Column(db.DateTime)
+    scheduled_start = db.Column(db.DateTime, index=True)  # Range queries of /api/calendar
     scheduled_end = db.Column(db.DateTime)
     completed = db.Column(db.Boolean, default=False)
     frozen = db.Column(db.Boolean, default=False)  # Prevents rescheduling when True
@@ -133,6 +133,16 @@ class CalendarSource(db.Model):
     enabled = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_fetched = db.Column(db.DateTime)
+    # HTTP validators of the last download, for conditional GETs, and when
+    # the stored external_events were last rewritten from a full parse
+    etag = db.Column(db.String(255))
+    last_modified = db.Column(db.String(100))
+    events_refreshed_at = db.Column(db.DateTime)
+    sync_interval = db.Column(db.Integer, default=15)  # minutes between background syncs
+    # Health: failed syncs in a row, and when a failing feed may be tried again
+    consecutive_failures = db.Column(db.Integer, default=0)
+    last_error = db.Column(db.Text)
+    retry_after = db.Column(db.DateTime)
 
     def to_dict(self):
         return {
@@ -141,5 +151,53 @@ class CalendarSource(db.Model):
             'ics_url': self.ics_url,
             'enabled': self.enabled,
             'created_at': self.created_at.isoformat(),
-            'last_fetched': self.last_fetched.isoformat() if self.last_fetched else None
+            'last_fetched': self.last_fetched.isoformat() if self.last_fetched else None,
+            'sync_interval': self.sync_interval,
+            'consecutive_failures': self.consecutive_failures or 0,
+            'last_error': self.last_error,
+            'retry_after': self.retry_after.isoformat() if self.retry_after else None
         }
+
+
+class ExternalEvent(db.Model):
+    """An event of a CalendarSource, kept in sync by calendar_sync."""
+    __tablename__ = 'external_events'
+    __table_args__ = (db.UniqueConstraint('source_id', 'uid'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    source_id = db.Column(db.Integer, db.ForeignKey('calendar_sources.id'), nullable=False)
+    uid = db.Column(db.String(255), nullable=False)  # ICS UID, unique per source
+    start = db.Column(db.DateTime, nullable=False, index=True)
+    end = db.Column(db.DateTime, nullable=False, index=True)
+    title = db.Column(db.String(500))
+    description = db.Column(db.Text)
+
+    def to_dict(self):
+        return {
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'title': self.title,
+            'description': self.description or '',
+            'source': 'external'
+        }
+
+
+class ScheduleLock(db.Model):
+    """DB-level mutex for schedule writes (see schedule_jobs.schedule_lock)."""
+    __tablename__ = 'schedule_locks'
+
+    name = db.Column(db.String(50), primary_key=True)
+    owner = db.Column(db.String(64))  # Job id of the holder, NULL when free
+    acquired_at = db.Column(db.DateTime)
+
+
+class LLMCacheEntry(db.Model):
+    """A cached AI response (see llm_cache)."""
+    __tablename__ = 'llm_cache'
+
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of the request
+    kind = db.Column(db.String(20), nullable=False)  # 'parse' | 'cleanify'
+    response = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, nullable=False)
+    last_used_at = db.Column(db.DateTime, nullable=False, index=True)  # LRU order
+    hits = db.Column(db.Integer, default=0)
@@ -0,0 +1,200 @@
+"""
+Background scheduling jobs.
+
+`POST /api/schedule` no longer fetches calendars and runs the scheduler on
+the request thread. It submits a job to a `ScheduleJobManager` and returns the
+job id at once, and clients poll `GET /api/schedule/jobs/<id>`. Jobs run one
+at a time on a single worker thread. A request that arrives while an
+identical job is still queued or running coalesces onto that job (single
+flight), so a double click or a second tab does not schedule twice.
+
+Across processes (several server workers on one SQLite file) a row in
+`schedule_locks` acts as a DB-level mutex: only the holder may write a
+schedule. A crashed holder's lock is taken over once it is `LOCK_STALE_AFTER`
+old. Other rows, by name, guard other cross-process work (the calendar sync).
+"""
+
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, ScheduleLock
+
+SCHEDULE_LOCK_NAME = 'schedule'
+LOCK_STALE_AFTER = timedelta(minutes=15)
+LOCK_POLL_INTERVAL = 0.25
+JOB_HISTORY = 50
+
+
+class ScheduleLockBusy(Exception):
+    """Another writer holds the schedule lock."""
+
+
+class ScheduleJob:
+    """One scheduling run and its outcome."""
+
+    def __init__(self, options):
+        self.id = uuid.uuid4().hex
+        self.options = options
+        self.status = 'queued'  # queued -> running -> done | failed
+        self.result = None
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self.finished = threading.Event()
+
+    @property
+    def active(self):
+        return self.status in ('queued', 'running')
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class ScheduleJobManager:
+    """
+    Queue of scheduling jobs served by one background thread.
+
+    `run(options, owner)` is called inside an app context and returns the
+    job's JSON-serializable result. With `SCHEDULE_JOBS_ASYNC` off, jobs run
+    inline in the submitting thread (tests, single-shot scripts).
+    """
+
+    def __init__(self, app, run):
+        self.app = app
+        self.run = run
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._queue = queue.Queue()
+        self._worker = None
+
+    def submit(self, options=None):
+        """Queue a job, or return the active one with the same options.
+
+        Returns (job, coalesced).
+        """
+        options = options or {}
+        run_async = self.run_async
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job.active and job.options == options:
+                    return job, True
+
+            job = ScheduleJob(options)
+            self._jobs[job.id] = job
+            while len(self._jobs) > JOB_HISTORY:
+                oldest = next(iter(self._jobs.values()))
+                if oldest.active:
+                    break
+                self._jobs.popitem(last=False)
+
+            if run_async:
+                self._queue.put(job)
+                self._ensure_worker()
+
+        if not run_async:
+            self._execute(job)
+        return job, False
+
+    @property
+    def run_async(self):
+        return self.app.config.get('SCHEDULE_JOBS_ASYNC', True)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._work, name='schedule-jobs', daemon=True
+            )
+            self._worker.start()
+
+    def _work(self):
+        while True:
+            self._execute(self._queue.get())
+
+    def _execute(self, job):
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        try:
+            with self.app.app_context():
+                job.result = self.run(job.options, owner=job.id)
+            job.status = 'done'
+        except Exception as e:
+            job.error = str(e) or e.__class__.__name__
+            job.status = 'failed'
+        finally:
+            job.finished_at = datetime.utcnow()
+            job.finished.set()
+
+
+@contextmanager
+def schedule_lock(owner, wait=0.0, name=SCHEDULE_LOCK_NAME):
+    """Hold the DB-level schedule lock (or the lock `name`) for the block;
+    raise ScheduleLockBusy if it cannot be taken within `wait` seconds."""
+    if not acquire_schedule_lock(owner, wait, name):
+        raise ScheduleLockBusy('Another schedule is being written; try again shortly')
+    try:
+        yield
+    finally:
+        db.session.rollback()
+        release_schedule_lock(owner, name)
+
+
+def acquire_schedule_lock(owner, wait=0.0, name=SCHEDULE_LOCK_NAME):
+    deadline = time.monotonic() + wait
+    while True:
+        if _try_acquire(owner, name):
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(LOCK_POLL_INTERVAL)
+
+
+def release_schedule_lock(owner, name=SCHEDULE_LOCK_NAME):
+    db.session.execute(
+        update(ScheduleLock)
+        .where(ScheduleLock.name == name, ScheduleLock.owner == owner)
+        .values(owner=None, acquired_at=None)
+    )
+    db.session.commit()
+
+
+def _try_acquire(owner, name):
+    if db.session.get(ScheduleLock, name) is None:
+        try:
+            db.session.add(ScheduleLock(name=name))
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+
+    # Single conditional UPDATE: atomic even with concurrent writers.
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(ScheduleLock)
+        .where(
+            ScheduleLock.name == name,
+            or_(ScheduleLock.owner.is_(None), ScheduleLock.acquired_at < now - LOCK_STALE_AFTER)
+        )
+        .values(owner=owner, acquired_at=now)
+    )
+    db.session.commit()
+    return result.rowcount == 1
@@ -0,0 +1,236 @@
+"""
+Optimizing scheduler: local search over placement orders under a time budget.
+
+The greedy pass in `scheduler.schedule_tasks` places tasks strictly by
+priority, then deadline, then age. A task it cannot fit is dropped, even when
+a different order would have fit everything. This module starts from the
+greedy order and runs simulated annealing over orderings. Every candidate
+order is turned into a schedule by the same first-fit placement
+(`scheduler.place_tasks`), so any result obeys the same busy, space-window and
+deadline rules as the greedy one.
+
+Independent annealing chains run in a process pool, one per worker, until a
+wall-clock deadline or until every task that can fit at all is placed (tasks
+the capacity index proves unplaceable, e.g. overdue ones, are left out of the
+search). The best schedule any chain found is returned, and it is never worse
+than the greedy one.
+"""
+
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from scheduler import (
+    BusyIntervals,
+    CapacityIndex,
+    TaskSnapshot,
+    compile_space_constraints,
+    place_tasks,
+    round_to_next_30min,
+    task_sort_key,
+)
+
+# Cost weights: a missed deadline outweighs any number of plain unscheduled
+# tasks, which outweigh any amount of priority-weighted delay.
+MISSED_DEADLINE_COST = 1_000_000
+UNSCHEDULED_COST = 10_000
+
+
+def optimize_schedule(tasks, external_events, space_constraints, time_budget=2.0,
+                      workers=None, seed=None):
+    """
+    Schedule tasks, then search for a better placement order within `time_budget`.
+
+    Args:
+        tasks: List of Task objects to schedule (as for schedule_tasks)
+        external_events: List of external calendar events (dicts with start, end)
+        space_constraints: Same as for schedule_tasks
+        time_budget: Wall-clock seconds the search may use
+        workers: Worker processes (defaults to the CPU count); 1 searches in-process
+        seed: Seed for reproducible runs
+
+    Returns:
+        List of dicts with task id, scheduled_start, and scheduled_end
+    """
+    deadline = time.time() + max(0.0, time_budget)
+    frozen_tasks = [t for t in tasks if t.frozen and t.scheduled_start and t.scheduled_end]
+    # Snapshots are picklable, so they can be shipped to worker processes.
+    plan_tasks = [
+        t if isinstance(t, TaskSnapshot) else TaskSnapshot.from_task(t)
+        for t in tasks if not t.frozen
+    ]
+    plan_tasks.sort(key=task_sort_key)
+
+    problem = _Problem(
+        plan_tasks,
+        [(event['start'], event['end']) for event in external_events] +
+        [(t.scheduled_start, t.scheduled_end) for t in frozen_tasks],
+        compile_space_constraints(space_constraints),
+        round_to_next_30min(datetime.now()),
+    )
+
+    greedy_order = list(range(len(plan_tasks)))
+    if len(plan_tasks) < 2 or not problem.unplaced(greedy_order):
+        # Greedy already fits everything that can fit: keep its priority-first placement.
+        return problem.schedule(greedy_order)
+    best_cost, best_order = problem.cost(greedy_order), greedy_order
+
+    workers = workers or os.cpu_count() or 1
+    base_seed = seed if seed is not None else random.randrange(2 ** 32)
+
+    for cost, order in _run_chains(problem, greedy_order, deadline, workers, base_seed):
+        if cost < best_cost:
+            best_cost, best_order = cost, order
+
+    return problem.schedule(best_order)
+
+
+def _run_chains(problem, start_order, deadline, workers, base_seed):
+    """Run one annealing chain per worker; yield each chain's (cost, order)."""
+    if workers <= 1:
+        yield _anneal(problem, start_order, deadline, base_seed)
+        return
+
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context())
+    except (OSError, NotImplementedError, ValueError):
+        # No multiprocessing here (sandbox, missing semaphores): search in-process.
+        yield _anneal(problem, start_order, deadline, base_seed)
+        return
+
+    try:
+        futures = [
+            pool.submit(_anneal, problem, start_order, deadline, base_seed + i)
+            for i in range(workers)
+        ]
+        # Chains stop themselves at the deadline; the grace covers result pickling.
+        done, _ = wait(futures, timeout=max(0.0, deadline - time.time()) + 1.0)
+        for future in done:
+            if future.exception() is None:
+                yield future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _pool_context():
+    """Start workers from a clean process: the server calling us runs other
+    threads (job worker, calendar sync), which a plain fork would copy mid-state."""
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    # Workers fork from a server that has already imported the scheduler
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def _anneal(problem, order, deadline, seed):
+    """Simulated annealing over placement orders until `deadline` (epoch
+    seconds), or until every placeable task is placed (cost below
+    UNSCHEDULED_COST: no better placement count exists)."""
+    rng = random.Random(seed)
+    current = list(order)
+    current_cost = problem.cost(current)
+    best, best_cost = list(current), current_cost
+    temperature = max(1.0, current_cost * 0.05)
+    n = len(current)
+
+    while time.time() < deadline and best_cost >= UNSCHEDULED_COST:
+        candidate = list(current)
+        unplaced = problem.unplaced(candidate)
+        if not unplaced:
+            break
+        if unplaced and rng.random() < 0.7:
+            # Pull a task that did not fit towards the front.
+            i = candidate.index(rng.choice(unplaced))
+            j = rng.randrange(i + 1) if i else 0
+            candidate.insert(j, candidate.pop(i))
+        else:
+            i, j = rng.randrange(n), rng.randrange(n)
+            candidate[i], candidate[j] = candidate[j], candidate[i]
+
+        cost = problem.cost(candidate)
+        if cost <= current_cost or rng.random() < math.exp((current_cost - cost) / temperature):
+            current, current_cost = candidate, cost
+            if cost < best_cost:
+                best, best_cost = list(candidate), cost
+        temperature = max(1e-3, temperature * 0.995)
+
+    return best_cost, best
+
+
+class _Problem:
+    """
+    Everything needed to turn a task order into a schedule and score it.
+
+    Tasks that fail `CapacityIndex.can_fit` (no free stretch long enough
+    before their deadline) can never be placed by any order; they are left
+    out of `unplaced` and `cost`, so the search does not chase them.
+    """
+
+    def __init__(self, tasks, busy, space_windows, current_time):
+        self.tasks = tasks
+        self.busy = busy
+        self.space_windows = space_windows
+        self.current_time = current_time
+        self._busy_slots = BusyIntervals(busy)
+        self._capacity = CapacityIndex(self._busy_slots, space_windows, current_time, tasks)
+        self.impossible = frozenset(
+            i for i, task in enumerate(tasks)
+            if not self._capacity.can_fit(task, timedelta(minutes=task.estimated_duration or 60))
+        )
+        self._last = (None, None)
+
+    def _place(self, order):
+        key = tuple(order)
+        if self._last[0] != key:
+            placed = place_tasks(
+                [self.tasks[i] for i in order],
+                self._busy_slots.copy(),
+                self.space_windows,
+                self.current_time,
+                self._capacity
+            )
+            self._last = (key, {p['id']: p for p in placed})
+        return self._last[1]
+
+    def schedule(self, order):
+        placed = self._place(order)
+        return [placed[self.tasks[i].id] for i in order if self.tasks[i].id in placed]
+
+    def unplaced(self, order):
+        placed = self._place(order)
+        return [i for i in order if i not in self.impossible and self.tasks[i].id not in placed]
+
+    def cost(self, order):
+        placed = self._place(order)
+        cost = 0.0
+        weighted_delay = 0.0
+        total_weight = 0.0
+        for i, task in enumerate(self.tasks):
+            if i in self.impossible:
+                continue
+            weight = task.priority + 1
+            total_weight += weight
+            slot = placed.get(task.id)
+            if slot is None:
+                cost += MISSED_DEADLINE_COST if task.deadline else UNSCHEDULED_COST
+            else:
+                delay = slot['scheduled_start'] - self.current_time
+                weighted_delay += weight * (delay / timedelta(hours=1))
+        return cost + (weighted_delay / total_weight if total_weight else 0.0)
+
+    def __getstate__(self):
+        # Ship only the plain inputs to worker processes.
+        return {
+            'tasks': self.tasks,
+            'busy': self.busy,
+            'space_windows': self.space_windows,
+            'current_time': self.current_time,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
@@ -1,3 +1,8 @@
+import hashlib
+import json
+import math
+import random
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 
 
@@ -10,6 +15,275 @@ def round_to_next_30min(dt):
     return dt + timedelta(minutes=30 - remainder)
 
 
+class BusyIntervals:
+    """
+    Sorted, disjoint set of busy [start, end) intervals.
+
+    Kept as two parallel lists (starts and ends) so lookups are a bisect
+    instead of a walk over every busy slot. Overlapping or touching intervals
+    are merged on insert, which keeps the lists minimal and lets `add` splice
+    in place rather than re-sorting the whole pool.
+
+    `first_free` searches a gap index (`_gaps`, a treap keyed by interval
+    start holding the free time after each interval, see _GapNode) built on
+    first use and kept up to date by `add`.
+    """
+
+    __slots__ = ('_starts', '_ends', '_gaps')
+
+    def __init__(self, intervals=()):
+        self._starts = []
+        self._ends = []
+        self._gaps = None
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if self._ends and start <= self._ends[-1]:
+                if end > self._ends[-1]:
+                    self._ends[-1] = end
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    @classmethod
+    def from_slots(cls, slots):
+        """Build from the legacy list-of-dicts format ({'start', 'end'})."""
+        return cls((slot['start'], slot['end']) for slot in slots)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __iter__(self):
+        return iter(zip(self._starts, self._ends))
+
+    def copy(self):
+        clone = BusyIntervals()
+        clone._starts = list(self._starts)
+        clone._ends = list(self._ends)
+        return clone
+
+    def add(self, start, end):
+        """Insert [start, end), merging with any overlapping or adjacent interval."""
+        if end <= start:
+            return
+        # First interval whose end reaches `start`, last one whose start is <= `end`.
+        lo = bisect_left(self._ends, start)
+        hi = bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        if self._gaps is not None:
+            self._update_gaps(lo, hi, start, end)
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def overlapping(self, start, end):
+        """Yield the busy intervals overlapping [start, end), in order."""
+        i = bisect_right(self._ends, start)
+        while i < len(self._starts) and self._starts[i] < end:
+            yield self._starts[i], self._ends[i]
+            i += 1
+
+    def conflict(self, start, end):
+        """Return the (start, end) busy interval overlapping [start, end), or None."""
+        i = bisect_right(self._ends, start)
+        if i < len(self._starts) and self._starts[i] < end:
+            return self._starts[i], self._ends[i]
+        return None
+
+    def first_free(self, start, duration):
+        """
+        Earliest time >= start where a slot of `duration` fits between busy
+        intervals. After a conflict the search resumes on the 30-minute grid,
+        like the scheduler always has: from the first busy interval in the
+        way, the answer is the grid-rounded end of the first interval whose
+        following gap is at least `duration`, found in O(log n).
+        """
+        i = bisect_right(self._ends, start)
+        if i == len(self._starts) or self._starts[i] >= start + duration:
+            return start
+        if self._gaps is None:
+            self._gaps = self._build_gaps()
+        return _first_gap(self._gaps, self._starts[i], duration).free_from
+
+    def _build_gaps(self):
+        """Gap treap of the current intervals, in O(n) (Cartesian tree build)."""
+        stack = []
+        for i, (start, end) in enumerate(zip(self._starts, self._ends)):
+            next_start = self._starts[i + 1] if i + 1 < len(self._starts) else None
+            node = _GapNode(start, round_to_next_30min(end), next_start)
+            last = None
+            while stack and stack[-1].priority < node.priority:
+                last = _gap_update(stack.pop())
+            node.left = last
+            if stack:
+                stack[-1].right = node
+            stack.append(node)
+        for node in reversed(stack):
+            _gap_update(node)
+        return stack[0] if stack else None
+
+    def _update_gaps(self, lo, hi, start, end):
+        """Replace intervals lo..hi-1 by [start, end) in the gap treap (before
+        the lists are spliced), and refresh the gap of the interval before."""
+        size = len(self._starts)
+        left, rest = _gap_split(self._gaps, self._starts[lo]) if lo < size else (self._gaps, None)
+        right = None
+        next_start = None
+        if hi < size:
+            _, right = _gap_split(rest, self._starts[hi])
+            next_start = self._starts[hi]
+        if lo > 0:
+            left, previous = _gap_split(left, self._starts[lo - 1])
+            previous.set_next(start)
+            left = _gap_merge(left, _gap_update(previous))
+        node = _GapNode(start, round_to_next_30min(end), next_start)
+        self._gaps = _gap_merge(_gap_merge(left, node), right)
+
+
+class _GapNode:
+    """
+    Treap node of the BusyIntervals gap index: one busy interval, keyed by its
+    start, with the free time from its end rounded up to the 30-minute grid
+    (`free_from`) to the next interval's start (unbounded after the last one).
+    `best` is the largest gap in the node's subtree.
+    """
+
+    __slots__ = ('key', 'free_from', 'gap', 'best', 'priority', 'left', 'right')
+
+    def __init__(self, key, free_from, next_start):
+        self.key = key
+        self.free_from = free_from
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.set_next(next_start)
+
+    def set_next(self, next_start):
+        self.gap = timedelta.max if next_start is None else next_start - self.free_from
+        self.best = self.gap
+
+
+def _gap_update(node):
+    best = node.gap
+    if node.left is not None and node.left.best > best:
+        best = node.left.best
+    if node.right is not None and node.right.best > best:
+        best = node.right.best
+    node.best = best
+    return node
+
+
+def _gap_split(node, key):
+    """Split a gap treap into (keys < key, keys >= key)."""
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _gap_split(node.right, key)
+        return _gap_update(node), right
+    left, node.left = _gap_split(node.left, key)
+    return left, _gap_update(node)
+
+
+def _gap_merge(left, right):
+    """Join two gap treaps, every key of `left` below every key of `right`."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _gap_merge(left.right, right)
+        return _gap_update(left)
+    right.left = _gap_merge(left, right.left)
+    return _gap_update(right)
+
+
+def _first_gap(node, key, duration):
+    """Leftmost node with key >= `key` whose gap is at least `duration`."""
+    if node is None or node.best < duration:
+        return None
+    if node.key < key:
+        return _first_gap(node.right, key, duration)
+    found = _first_gap(node.left, key, duration)
+    if found is not None:
+        return found
+    if node.gap >= duration:
+        return node
+    return _first_gap(node.right, key, duration)
+
+
+class TaskSnapshot:
+    """
+    Detached, read-only view of a Task row holding only what the scheduler
+    reads. Routes load these from a column query instead of handing live
+    SQLAlchemy instances (and their attribute instrumentation) to the scheduler.
+    """
+
+    __slots__ = ('id', 'priority', 'deadline', 'created_at', 'estimated_duration',
+                 'space', 'space_id', 'frozen', 'scheduled_start', 'scheduled_end')
+
+    def __init__(self, id, priority, deadline, created_at, estimated_duration,
+                 space, space_id, frozen, scheduled_start, scheduled_end):
+        self.id = id
+        self.priority = priority or 0
+        self.deadline = deadline
+        self.created_at = created_at
+        self.estimated_duration = estimated_duration
+        self.space = space
+        self.space_id = space_id
+        self.frozen = bool(frozen)
+        self.scheduled_start = scheduled_start
+        self.scheduled_end = scheduled_end
+
+    @classmethod
+    def from_task(cls, task):
+        return cls(*(getattr(task, name, None) for name in cls.__slots__))
+
+
+def changed_placements(placements, snapshot):
+    """Keep only the placements that differ from the snapshot's current slots."""
+    current = {task.id: (task.scheduled_start, task.scheduled_end) for task in snapshot}
+    return [
+        p for p in placements
+        if current.get(p['id']) != (p['scheduled_start'], p['scheduled_end'])
+    ]
+
+
+def schedule_fingerprint(task_versions, external_events, space_constraints, current_time,
+                         extra=None):
+    """
+    Hex digest identifying one scheduling problem.
+
+    Covers the (id, updated_at) pairs of the tasks to schedule, the busy
+    intervals of the external events, the space constraints and the 30-minute
+    bucket the scheduler anchors on, plus any `extra` JSON-serializable
+    settings (engine, options). Equal fingerprints mean a rerun would produce
+    the same placements.
+    """
+    events = hashlib.sha256()
+    for start, end in sorted((event['start'], event['end']) for event in external_events):
+        events.update(f'{start.isoformat()}/{end.isoformat()};'.encode())
+
+    payload = [
+        sorted((task_id, str(updated_at)) for task_id, updated_at in task_versions),
+        events.hexdigest(),
+        sorted(([str(key), value] for key, value in space_constraints.items()),
+               key=lambda item: item[0]),
+        round_to_next_30min(current_time).isoformat(),
+        extra,
+    ]
+    return hashlib.sha256(json.dumps(payload, default=str).encode()).hexdigest()
+
+
+def task_sort_key(task):
+    """Placement order: highest priority first, then nearest deadline, then FIFO."""
+    return (
+        -task.priority,
+        task.deadline if task.deadline else datetime.max,
+        task.created_at
+    )
+
+
 def schedule_tasks(tasks, external_events, space_constraints):
     """
     Schedule tasks based on priority, deadlines, and space constraints.
@@ -17,45 +291,55 @@ def schedule_tasks(tasks, external_events, space_constraints):
     Args:
         tasks: List of Task objects to schedule
         external_events: List of external calendar events (dicts with start, end)
-        space_constraints: Dict of space names to their time constraints
+        space_constraints: Dict of space ids and/or (deprecated) space names to
+            their time constraints; compiled once into SpaceWindows per run
 
     Returns:
         List of dicts with task id, scheduled_start, and scheduled_end
     """
-    scheduled_tasks = []
-
     frozen_tasks = [t for t in tasks if t.frozen and t.scheduled_start and t.scheduled_end]
     non_frozen_tasks = [t for t in tasks if not t.frozen]
 
-    sorted_tasks = sorted(
-        non_frozen_tasks,
-        key=lambda t: (
-            -t.priority,
-            t.deadline if t.deadline else datetime.max,
-            t.created_at
-        )
-    )
+    sorted_tasks = sorted(non_frozen_tasks, key=task_sort_key)
 
     current_time = round_to_next_30min(datetime.now())
+    space_windows = compile_space_constraints(space_constraints)
+
+    busy_slots = BusyIntervals(
+        [(event['start'], event['end']) for event in external_events] +
+        [(t.scheduled_start, t.scheduled_end) for t in frozen_tasks]
+    )
+
+    capacity = CapacityIndex(busy_slots, space_windows, current_time, sorted_tasks)
 
-    busy_slots = [{'start': event['start'], 'end': event['end']} for event in external_events]
+    return place_tasks(sorted_tasks, busy_slots, space_windows, current_time, capacity)
 
-    for frozen_task in frozen_tasks:
-        busy_slots.append({
-            'start': frozen_task.scheduled_start,
-            'end': frozen_task.scheduled_end
-        })
 
-    for task in sorted_tasks:
+def place_tasks(ordered_tasks, busy_slots, space_windows, current_time, capacity=None):
+    """
+    First-fit each task, in the given order, into `busy_slots` (mutated).
+
+    With a CapacityIndex, tasks that provably cannot fit (no free stretch long
+    enough before their deadline) are skipped without searching.
+
+    Returns:
+        List of dicts with task id, scheduled_start, and scheduled_end
+    """
+    scheduled_tasks = []
+
+    for task in ordered_tasks:
         duration = timedelta(minutes=task.estimated_duration or 60)
         deadline = task.deadline
 
+        if capacity is not None and not capacity.can_fit(task, duration):
+            continue
+
         slot_start = find_next_available_slot(
             current_time,
             duration,
             busy_slots,
-            task.space,
-            space_constraints,
+            task_space_key(task, space_windows),
+            space_windows,
             deadline
         )
 
@@ -68,20 +352,132 @@ def schedule_tasks(tasks, external_events, space_constraints):
                 'scheduled_end': slot_end
             })
 
-            busy_slots.append({
-                'start': slot_start,
-                'end': slot_end
-            })
-
-            busy_slots.sort(key=lambda x: x['start'])
+            busy_slots.add(slot_start, slot_end)
 
     return scheduled_tasks
 
 
+def reschedule_incremental(tasks, external_events, space_constraints, pivot=None,
+                           changed_id=None, freed_slot=None, pinned=False):
+    """
+    Re-place only the tasks whose placement can change after one task mutation.
+
+    Tasks ranked before `pivot` (a `task_sort_key` value; None means no task
+    is skipped) keep their slots untouched: the greedy pass placed them before
+    the mutated task, so it cannot affect them. From the pivot on, a task
+    keeps its current slot unless the slot is now invalid (busy, outside its
+    space windows, wrong length, past its deadline) or time was freed before
+    its end, in which case it might move earlier and is re-placed with the
+    usual first-fit search.
+
+    Args:
+        tasks: Incomplete tasks in their post-mutation state
+        external_events: List of external calendar events (dicts with start, end)
+        space_constraints: Same as for schedule_tasks
+        pivot: Sort key of the mutated task (lowest rank of before/after)
+        changed_id: The mutated task; re-placed unless `pinned`
+        freed_slot: (start, end) released by the mutation (delete, completion,
+            drag), or None
+        pinned: True when the mutated task's slot was set by the user (drag);
+            otherwise its current slot counts as freed, since any change to
+            its rank lets lower-ranked tasks take it
+
+    Returns:
+        List of dicts with task id, scheduled_start, and scheduled_end for the
+        tasks whose placement actually changed
+    """
+    current_time = round_to_next_30min(datetime.now())
+    space_windows = compile_space_constraints(space_constraints)
+
+    frozen_tasks = [t for t in tasks if t.frozen and t.scheduled_start and t.scheduled_end]
+    busy_slots = BusyIntervals(
+        [(event['start'], event['end']) for event in external_events] +
+        [(t.scheduled_start, t.scheduled_end) for t in frozen_tasks]
+    )
+
+    # Earliest point where time was released; tasks ending before it cannot
+    # move earlier, so they are left alone.
+    dirty_from = datetime.max
+    if freed_slot:
+        dirty_from = max(freed_slot[0], current_time)
+    if not pinned:
+        for task in tasks:
+            if task.id == changed_id and not task.frozen and task.scheduled_start and task.scheduled_end:
+                dirty_from = min(dirty_from, max(task.scheduled_start, current_time))
+
+    moved = []
+    for task in sorted((t for t in tasks if not t.frozen), key=task_sort_key):
+        slot = None
+        if task.scheduled_start and task.scheduled_end:
+            slot = (task.scheduled_start, task.scheduled_end)
+
+        if pivot is not None and task_sort_key(task) < pivot:
+            if slot:
+                busy_slots.add(*slot)
+            continue
+
+        duration = timedelta(minutes=task.estimated_duration or 60)
+        space = task_space_key(task, space_windows)
+
+        if slot and task.id == changed_id and pinned:
+            busy_slots.add(*slot)
+            continue
+
+        if (slot and task.id != changed_id and slot[1] <= dirty_from
+                and _slot_still_valid(slot, duration, busy_slots, space, space_windows, task.deadline)):
+            busy_slots.add(*slot)
+            continue
+
+        slot_start = find_next_available_slot(
+            current_time,
+            duration,
+            busy_slots,
+            space,
+            space_windows,
+            task.deadline
+        )
+        new_slot = (slot_start, slot_start + duration) if slot_start else None
+
+        if new_slot != slot and slot:
+            dirty_from = min(dirty_from, max(slot[0], current_time))
+
+        if new_slot:
+            busy_slots.add(*new_slot)
+            if new_slot != slot:
+                moved.append({
+                    'id': task.id,
+                    'scheduled_start': new_slot[0],
+                    'scheduled_end': new_slot[1]
+                })
+
+    return moved
+
+
+def _slot_still_valid(slot, duration, busy_slots, space, space_windows, deadline):
+    start, end = slot
+    if end - start != duration:
+        return False
+    if deadline and start >= deadline - duration:
+        return False
+    if busy_slots.conflict(start, end):
+        return False
+    return is_within_space_constraints(start, end, space, space_windows)
+
+
 def find_next_available_slot(start_time, duration, busy_slots, space, space_constraints, deadline=None):
     """
     Find the next available time slot that satisfies all constraints.
+
+    `busy_slots` is a BusyIntervals; a plain list of {'start', 'end'} dicts is
+    still accepted and converted once.
     """
+    if not isinstance(busy_slots, BusyIntervals):
+        busy_slots = BusyIntervals.from_slots(busy_slots)
+    windows = _windows_for(space, space_constraints)
+    if windows is not None and duration.total_seconds() > windows.max_length:
+        # Longer than every window of the space: it can never fit.
+        return None
+
     current = start_time
     max_search_days = 90
 
@@ -93,21 +489,16 @@ def find_next_available_slot(start_time, duration, busy_slots, space, space_cons
     while current < max_search_time:
         slot_end = current + duration
 
-        if not is_within_space_constraints(current, slot_end, space, space_constraints):
-            current = get_next_valid_time_for_space(current, space, space_constraints)
+        if windows is not None and not windows.contains(current, slot_end):
+            current = windows.next_start(current, inclusive=False)
             if current is None:
                 return None
             continue
 
-        is_available = True
-        for busy in busy_slots:
-            if slots_overlap(current, slot_end, busy['start'], busy['end']):
-                is_available = False
-                current = round_to_next_30min(busy['end'])
-                break
-
-        if is_available:
+        free_start = busy_slots.first_free(current, duration)
+        if free_start == current:
             return current
+        current = free_start
 
     return None
 
@@ -130,50 +521,314 @@ def is_within_space_constraints(start, end, space, space_constraints):
     }
 
     day: 0=Monday, 1=Tuesday, ..., 6=Sunday
+
+    Values may also be pre-compiled SpaceWindows (see compile_space_constraints).
     """
-    if not space or space not in space_constraints:
+    windows = _windows_for(space, space_constraints)
+    if windows is None:
         return True
+    return windows.contains(start, end)
 
-    constraints = space_constraints[space]
 
-    if not constraints:
-        return True
+def get_next_valid_time_for_space(current, space, space_constraints):
+    """
+    Get the next valid time for a space based on its constraints.
+    """
+    windows = _windows_for(space, space_constraints)
+    if windows is None:
+        return current
+    return windows.next_start(current)
+
+
+SECONDS_PER_DAY = 24 * 60 * 60
+SECONDS_PER_WEEK = 7 * SECONDS_PER_DAY
+
+
+def _second_of_week(dt):
+    return dt.weekday() * SECONDS_PER_DAY + dt.hour * 3600 + dt.minute * 60 + dt.second
+
+
+def _week_start(dt):
+    """Monday 00:00 of the week containing `dt`."""
+    return dt.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=dt.weekday())
+
+
+class SpaceWindows:
+    """
+    A space's time constraints compiled into a weekly periodic window table.
+
+    Each constraint becomes a [start, end) offset in seconds from Monday 00:00;
+    overlapping or adjacent windows are merged and kept sorted, so "is this
+    slot inside a window" and "when does the next window open" are a bisect
+    instead of re-parsing 'HH:MM' strings on every probe.
+    """
+
+    __slots__ = ('_starts', '_ends', 'max_length')
 
-    for constraint in constraints:
-        if start.weekday() == constraint['day']:
+    def __init__(self, constraints):
+        windows = []
+        for constraint in constraints:
             start_hour, start_minute = map(int, constraint['start'].split(':'))
             end_hour, end_minute = map(int, constraint['end'].split(':'))
+            day_offset = constraint['day'] * SECONDS_PER_DAY
+            start = day_offset + start_hour * 3600 + start_minute * 60
+            end = day_offset + end_hour * 3600 + end_minute * 60
+            if end > start:
+                windows.append((start, end))
+
+        self._starts = []
+        self._ends = []
+        for start, end in sorted(windows):
+            if self._ends and start <= self._ends[-1]:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+        self.max_length = max((e - s for s, e in zip(self._starts, self._ends)), default=0)
+
+    def __iter__(self):
+        """Yield the merged (start, end) offsets in seconds from Monday 00:00."""
+        return iter(zip(self._starts, self._ends))
+
+    def contains(self, start, end):
+        """True if [start, end) lies inside a single window."""
+        offset = _second_of_week(start)
+        i = bisect_right(self._starts, offset) - 1
+        return i >= 0 and offset + (end - start).total_seconds() <= self._ends[i]
+
+    def next_start(self, current, inclusive=True):
+        """
+        Start of the first window opening at (or, if not `inclusive`, strictly
+        after) `current`. None if the table has no windows at all.
+        """
+        if not self._starts:
+            return None
+        offset = _second_of_week(current)
+        if current.microsecond and inclusive:
+            # Sub-second remainder: a window opening at `offset` is already past.
+            inclusive = False
+        i = bisect_left(self._starts, offset) if inclusive else bisect_right(self._starts, offset)
+        week = _week_start(current)
+        if i < len(self._starts):
+            return week + timedelta(seconds=self._starts[i])
+        return week + timedelta(seconds=SECONDS_PER_WEEK + self._starts[0])
+
+
+def compile_space_constraints(space_constraints):
+    """
+    Compile a {space key: constraint list} dict into {space key: SpaceWindows}.
+
+    Keys may be space ids and/or deprecated space names; both can point at the
+    same list, which is compiled only once. Spaces without constraints map to
+    None (unconstrained). Already-compiled values pass through unchanged.
+    """
+    compiled = {}
+    by_list = {}
+    for key, constraints in space_constraints.items():
+        if constraints is None or isinstance(constraints, SpaceWindows):
+            compiled[key] = constraints
+        elif not constraints:
+            compiled[key] = None
+        else:
+            if id(constraints) not in by_list:
+                by_list[id(constraints)] = SpaceWindows(constraints)
+            compiled[key] = by_list[id(constraints)]
+    return compiled
+
+
+def _windows_for(space, space_constraints):
+    """Resolve the SpaceWindows for `space`, compiling a raw list on the fly."""
+    if space is None or space == '' or space not in space_constraints:
+        return None
+    constraints = space_constraints[space]
+    if constraints is None or isinstance(constraints, SpaceWindows):
+        return constraints
+    if not constraints:
+        return None
+    return SpaceWindows(constraints)
 
-            constraint_start = start.replace(hour=start_hour, minute=start_minute, second=0, microsecond=0)
-            constraint_end = start.replace(hour=end_hour, minute=end_minute, second=0, microsecond=0)
 
-            if start >= constraint_start and end <= constraint_end:
-                return True
+def task_space_key(task, space_constraints):
+    """Key of `task`'s constraints: its space_id if known, else the deprecated name."""
+    space_id = getattr(task, 'space_id', None)
+    if space_id is not None and space_id in space_constraints:
+        return space_id
+    return task.space
 
-    return False
 
+MAX_SEARCH_DAYS = 90
 
-def get_next_valid_time_for_space(current, space, space_constraints):
+
+def _search_limit(task, duration, current_time):
+    """Latest end time the slot search can produce for `task`."""
+    if task.deadline:
+        return task.deadline
+    return current_time + timedelta(days=MAX_SEARCH_DAYS) + duration
+
+
+class FreeCapacity:
     """
-    Get the next valid time for a space based on its constraints.
+    Free time of one space from `start` on: its windows minus static busy time
+    (external events, frozen tasks), as sorted disjoint segments with prefix
+    sums. Answers "how much free time before D" and "longest free stretch
+    before D" with one bisect each.
+
+    Placed tasks only ever shrink free time, so both answers are upper bounds
+    for the rest of a scheduling run: a task that fails them cannot fit.
     """
-    if not space or space not in space_constraints:
-        return current
 
-    constraints = space_constraints[space]
+    __slots__ = ('_starts', '_ends', '_cumulative', '_longest')
+
+    def __init__(self, busy_slots, windows, start, horizon):
+        if windows is None:
+            allowed = [(start, horizon)]
+        else:
+            allowed = []
+            week = _week_start(start)
+            while week < horizon:
+                for offset_start, offset_end in windows:
+                    window_start = week + timedelta(seconds=offset_start)
+                    window_end = week + timedelta(seconds=offset_end)
+                    if window_end > start and window_start < horizon:
+                        allowed.append((max(window_start, start), min(window_end, horizon)))
+                week += timedelta(days=7)
+
+        self._starts = []
+        self._ends = []
+        self._cumulative = []
+        self._longest = []
+        total = 0.0
+        longest = 0.0
+        for window_start, window_end in allowed:
+            cursor = window_start
+            for busy_start, busy_end in busy_slots.overlapping(window_start, window_end):
+                if busy_start > cursor:
+                    total, longest = self._append(cursor, busy_start, total, longest)
+                cursor = max(cursor, busy_end)
+            if cursor < window_end:
+                total, longest = self._append(cursor, window_end, total, longest)
+
+    def _append(self, start, end, total, longest):
+        length = (end - start).total_seconds()
+        total += length
+        longest = max(longest, length)
+        self._starts.append(start)
+        self._ends.append(end)
+        self._cumulative.append(total)
+        self._longest.append(longest)
+        return total, longest
+
+    def _split(self, until):
+        """Index of the segment containing `until` and its free seconds before `until`."""
+        i = bisect_left(self._ends, until)
+        partial = 0.0
+        if i < len(self._starts) and self._starts[i] < until:
+            partial = (until - self._starts[i]).total_seconds()
+        return i, partial
+
+    def free_before(self, until):
+        """Free seconds between the start and `until`."""
+        i, partial = self._split(until)
+        return (self._cumulative[i - 1] if i else 0.0) + partial
+
+    def longest_before(self, until):
+        """Longest free stretch, in seconds, ending no later than `until`."""
+        i, partial = self._split(until)
+        return max(self._longest[i - 1] if i else 0.0, partial)
+
+
+class CapacityIndex:
+    """Lazily built FreeCapacity per space for one scheduling run."""
+
+    def __init__(self, busy_slots, space_windows, current_time, tasks=()):
+        self.busy_slots = busy_slots.copy()
+        self.space_windows = space_windows
+        self.current_time = current_time
+        self.horizon = max(
+            [current_time + timedelta(days=MAX_SEARCH_DAYS)] +
+            [_search_limit(t, timedelta(minutes=t.estimated_duration or 60), current_time)
+             for t in tasks]
+        )
+        self._by_windows = {}
 
-    if not constraints:
-        return current
+    def for_task(self, task):
+        windows = _windows_for(task_space_key(task, self.space_windows), self.space_windows)
+        key = id(windows)
+        if key not in self._by_windows:
+            self._by_windows[key] = (
+                windows,
+                FreeCapacity(self.busy_slots, windows, self.current_time, self.horizon)
+            )
+        return self._by_windows[key][1]
 
-    for days_ahead in range(90):
-        check_time = current + timedelta(days=days_ahead)
+    def can_fit(self, task, duration):
+        """False when no free stretch of `duration` exists before the task's limit."""
+        limit = min(_search_limit(task, duration, self.current_time), self.horizon)
+        return self.for_task(task).longest_before(limit) >= duration.total_seconds()
 
-        for constraint in constraints:
-            if check_time.weekday() == constraint['day']:
-                start_hour, start_minute = map(int, constraint['start'].split(':'))
-                constraint_start = check_time.replace(hour=start_hour, minute=start_minute, second=0, microsecond=0)
 
-                if constraint_start >= current:
-                    return constraint_start
+def analyze_feasibility(tasks, external_events, space_constraints):
+    """
+    Report tasks that cannot all meet their deadlines, before any placement.
+
+    Two checks against free capacity (windows minus external events and
+    frozen tasks):
+      - 'no_slot': the task alone has no free stretch long enough before its
+        deadline.
+      - 'overcommitted': EDF check — per space, and across all spaces, the
+        total duration of tasks due by a deadline exceeds the free time before
+        that deadline.
+
+    Returns:
+        List of dicts with task id, space key, deadline, reason, and
+        over_by_minutes (how much work does not fit), ordered by deadline
+    """
+    current_time = round_to_next_30min(datetime.now())
+    space_windows = compile_space_constraints(space_constraints)
+    frozen_tasks = [t for t in tasks if t.frozen and t.scheduled_start and t.scheduled_end]
+    busy_slots = BusyIntervals(
+        [(event['start'], event['end']) for event in external_events] +
+        [(t.scheduled_start, t.scheduled_end) for t in frozen_tasks]
+    )
+    due = sorted(
+        (t for t in tasks if not t.frozen and t.deadline),
+        key=lambda t: (t.deadline, task_sort_key(t))
+    )
+    capacity = CapacityIndex(busy_slots, space_windows, current_time, due)
+    anywhere = FreeCapacity(capacity.busy_slots, None, current_time, capacity.horizon)
+
+    report = {}
+
+    def flag(task, reason, over_seconds):
+        minutes = math.ceil(over_seconds / 60)
+        if minutes > report.get(task.id, {}).get('over_by_minutes', 0):
+            report[task.id] = {
+                'id': task.id,
+                'space': task_space_key(task, space_windows),
+                'deadline': task.deadline,
+                'reason': reason,
+                'over_by_minutes': minutes
+            }
+
+    demand_by_space = {}
+    demand_total = 0.0
+    for task in due:
+        duration = timedelta(minutes=task.estimated_duration or 60).total_seconds()
+        free = capacity.for_task(task)
+
+        shortfall = duration - free.longest_before(task.deadline)
+        if shortfall > 0:
+            flag(task, 'no_slot', shortfall)
+
+        key = id(_windows_for(task_space_key(task, space_windows), space_windows))
+        demand_by_space[key] = demand_by_space.get(key, 0.0) + duration
+        demand_total += duration
+        over = max(
+            demand_by_space[key] - free.free_before(task.deadline),
+            demand_total - anywhere.free_before(task.deadline)
+        )
+        if over > 0:
+            flag(task, 'overcommitted', over)
 
-    return None
\ No newline at end of file
+    return sorted(report.values(), key=lambda r: r['deadline'])
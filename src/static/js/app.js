@@ -298,10 +298,41 @@ async function autoSchedule() {
     });
 
     if (response.ok) {
-        const result = await response.json();
-        await loadTasks();
-        calendar.refetchEvents();
-        showAlert(`Successfully scheduled ${result.scheduled_tasks} tasks!`, 'success');
+        // Scheduling runs as a background job: poll until it finishes
+        const job = await waitForScheduleJob(await response.json());
+        if (job.status === 'done') {
+            const result = job.result;
+            await loadTasks();
+            calendar.refetchEvents();
+            showAlert(`Successfully scheduled ${result.scheduled_tasks} tasks!`, 'success');
+
+            // Warn about deadlines that cannot all be met
+            if (result.overcommitted && result.overcommitted.length > 0) {
+                const details = result.overcommitted
+                    .map(entry => `${escapeHtml(entry.title || '')} (${entry.over_by_minutes} min short)`)
+                    .join(', ');
+                showAlert(`Deadlines at risk: ${details}`, 'warning');
+            }
+
+            // Calendars not synced yet (or never reachable) were left out of this schedule
+            const sources = result.calendar_sources || [];
+            const failedSources = sources.filter(source => source.status === 'pending' || source.status === 'error');
+            if (failedSources.length > 0) {
+                const names = failedSources
+                    .map(source => `${escapeHtml(source.name)} (${source.status})`)
+                    .join(', ');
+                showAlert(`Scheduled without these calendars: ${names}`, 'warning');
+            }
+
+            // Failing feeds: their last synced events were used
+            const staleSources = sources.filter(source => source.status === 'stale');
+            if (staleSources.length > 0) {
+                const names = staleSources.map(source => escapeHtml(source.name)).join(', ');
+                showAlert(`Could not refresh these calendars, used their last synced events: ${names}`, 'warning');
+            }
+        } else {
+            showAlert(job.error || 'Error scheduling tasks', 'danger');
+        }
     } else {
         const error = await response.json();
         showAlert(error.error || 'Error scheduling tasks', 'danger');
@@ -311,60 +342,40 @@ async function autoSchedule() {
     btn.disabled = false;
 }
 
+// Poll a schedule job until it is done or failed
+async function waitForScheduleJob(job) {
+    while (job.status === 'queued' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, 500));
+        const response = await fetch(`/api/schedule/jobs/${job.job_id}`);
+        if (!response.ok) {
+            return { status: 'failed', error: 'Lost track of the scheduling job' };
+        }
+        job = await response.json();
+    }
+    return job;
+}
+
 // Load calendar events
 async function loadCalendarEvents(fetchInfo, successCallback, failureCallback) {
-    // Load tasks and external events in parallel for better performance
-    const url = showCompletedTasks ? '/api/tasks?include_completed=true' : '/api/tasks';
-    const [taskResponse, externalResponse] = await Promise.all([
-        fetch(url),
-        fetch('/api/external-events')
-    ]);
-    const [tasks, externalEvents] = await Promise.all([
-        taskResponse.json(),
-        externalResponse.json()
-    ]);
-
-    // Format task events
-    const taskEvents = tasks
-        .filter(task => task.scheduled_start && task.scheduled_end)
-        .map(task => {
-            let className = 'task-event';
-            if (task.completed) {
-                className += ' completed-task';
-            } else if (task.frozen) {
-                className += ' frozen-task';
-            }
-
-            return {
-                id: `task-${task.id}`,
-                title: task.frozen ? `❄️ ${task.title}` : task.title,
-                start: task.scheduled_start,
-                end: task.scheduled_end,
-                className: className,
-                editable: !task.completed, // Prevent editing completed tasks
-                extendedProps: {
-                    type: 'task',
-                    taskId: task.id,
-                    task: task
-                }
-            };
-        });
+    // Only the visible range; the server shapes tasks and external events for FullCalendar
+    const params = new URLSearchParams({
+        start: formatDateTimeLocal(fetchInfo.start),
+        end: formatDateTimeLocal(fetchInfo.end)
+    });
+    if (showCompletedTasks) {
+        params.set('include_completed', 'true');
+    }
 
-    // Format external events
-    const formattedExternalEvents = externalEvents.map((event, index) => ({
-        id: `external-${index}`,
-        title: event.title,
-        start: event.start,
-        end: event.end,
-        className: 'external-event',
-        editable: false,
-        extendedProps: {
-            type: 'external',
-            description: event.description
+    try {
+        const response = await fetch(`/api/calendar?${params}`);
+        if (!response.ok) {
+            throw new Error(`Failed to load calendar (${response.status})`);
         }
-    }));
-
-    successCallback([...taskEvents, ...formattedExternalEvents]);
+        successCallback(await response.json());
+    } catch (error) {
+        console.error('Error loading calendar events:', error);
+        failureCallback(error);
+    }
 }
 
 // Handle event click
@@ -15,6 +15,7 @@ const state = {
     editorDirty: false,
     saveTimer: null,
     lastCleaned: null,        // for single-step Undo (populated by Cleanify handler)
+    cleanifyStreaming: false, // editor shows a Cleanify stream: no autosave until it ends
 };
 
 let easyMDE = null;
@@ -219,44 +220,89 @@ function setActiveButtonsDisabledState() {
 async function cleanifyCurrentNote() {
     console.group('[cleanify] cleanifyCurrentNote start');
     console.log('[cleanify] state.currentNote:', state.currentNote ? {id: state.currentNote.id, content_len: state.currentNote.content_markdown?.length} : null);
-    console.log('[cleanify] editor value BEFORE (len):', easyMDE ? easyMDE.value().length : '(no easyMDE)');
-    console.log('[cleanify] editor value BEFORE:', JSON.stringify(easyMDE ? easyMDE.value() : ''));
-    if (!state.currentNote) {
-        console.warn('[cleanify] BAIL: state.currentNote is null (silent no-op)');
+    if (!state.currentNote || state.cleanifyStreaming) {
+        console.warn('[cleanify] BAIL: no current note or a Cleanify is already streaming (silent no-op)');
         console.groupEnd();
         return;
     }
     const btn = document.getElementById('cleanifyBtn');
     btn.disabled = true;
     setSaveIndicator('cleanifying…');
+
+    // Flush pending edits first: the server cleanifies the stored note.
+    if (state.saveTimer) {
+        cancelPendingSave();
+        await flushSave();
+    }
+    const original = easyMDE ? easyMDE.value() : '';
+    const cm = easyMDE.codemirror;
+    let content = null;
+    let started = false;
+    state.cleanifyStreaming = true;
+    cm.setOption('readOnly', true);
     try {
-        const resp = await api(`/api/notes/${state.currentNote.id}/cleanify`, { method: 'POST' });
-        console.log('[cleanify] POST resp:', resp);
-        console.log('[cleanify] resp.content type:', typeof (resp && resp.content), 'len:', resp && resp.content ? resp.content.length : 0);
-        console.log('[cleanify] resp.content:', JSON.stringify(resp && resp.content));
-        if (!resp || typeof resp.content !== 'string') {
-            setSaveIndicator('cleanify failed');
-            console.error('[cleanify] BAIL: invalid resp.content', resp);
-            console.groupEnd();
-            return;
-        }
-        // Store the current editor content for single-step Undo BEFORE replacing.
-        state.lastCleaned = easyMDE ? easyMDE.value() : '';
-        console.log('[cleanify] state.lastCleaned set (len):', state.lastCleaned ? state.lastCleaned.length : 0);
-        easyMDE.value(resp.content);
-        // easyMDE.value() fires the CM5 `change` event → scheduleSave() debounced PUT.
-        const afterSet = easyMDE ? easyMDE.value() : '';
-        console.log('[cleanify] editor value AFTER (len):', afterSet.length);
-        console.log('[cleanify] editor value AFTER:', JSON.stringify(afterSet));
-        console.log('[cleanify] editor matches resp.content?', afterSet === resp.content);
-        setSaveIndicator('cleanified');
+        // Server-Sent Events over a POST response (EventSource only does GET)
+        const resp = await fetch(`/api/notes/${state.currentNote.id}/cleanify/stream`, { method: 'POST' });
+        if (!resp.ok || !resp.body) throw new Error(`HTTP ${resp.status}`);
+        await readServerSentEvents(resp, (event, data) => {
+            if (event === 'delta') {
+                if (!started) {
+                    started = true;
+                    easyMDE.value('');  // first token: replace the note with the stream
+                }
+                cm.replaceRange(data.text, cm.posFromIndex(cm.getValue().length));
+            } else if (event === 'done') {
+                content = data.content;
+            } else if (event === 'error') {
+                console.error('[cleanify] stream error:', data.error);
+            }
+        });
     } catch (e) {
         console.error('[cleanify] exception:', e);
-        setSaveIndicator('cleanify failed');
     } finally {
-        setActiveButtonsDisabledState();
-        console.log('[cleanify] cleanifyCurrentNote end — save timer pending:', !!state.saveTimer);
-        console.groupEnd();
+        if (content === null) {
+            // Graceful degradation: the original text stays
+            easyMDE.value(original);
+        }
+        state.cleanifyStreaming = false;
+        cm.setOption('readOnly', false);
+    }
+
+    if (content === null) {
+        setSaveIndicator('cleanify failed');
+    } else {
+        // Store the pre-Cleanify content for single-step Undo BEFORE replacing.
+        state.lastCleaned = original;
+        easyMDE.value(content);
+        // easyMDE.value() fires the CM5 `change` event → scheduleSave() debounced PUT.
+        console.log('[cleanify] editor value AFTER (len):', content.length);
+        setSaveIndicator('cleanified');
+    }
+    setActiveButtonsDisabledState();
+    console.groupEnd();
+}
+
+// Feed each `event:` / `data:` block of an SSE response to onEvent(event, data)
+async function readServerSentEvents(resp, onEvent) {
+    const reader = resp.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            let event = 'message';
+            let data = '';
+            for (const line of block.split('\n')) {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            }
+            if (data) onEvent(event, JSON.parse(data));
+        }
     }
 }
 
@@ -452,6 +498,7 @@ function initEditor() {
     });
     easyMDE.codemirror.on('change', (cm, changes) => {
         console.log('[editor] change event origin=', changes && changes.origin, 'len=', cm.getValue().length);
+        if (state.cleanifyStreaming) return;  // partial Cleanify output: never saved
         state.editorDirty = true;
         scheduleSave();
         // Toggle Add-as-task enabled state from selection.
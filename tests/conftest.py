@@ -23,6 +23,7 @@ did.
 
 import sys
 import os
+from datetime import datetime, timedelta
 
 # Make `src/` importable so `from app import app`, `from ai_parser import ...`
 # resolve the same way they do at runtime under `PYTHONPATH=/app` (Dockerfile).
@@ -39,6 +40,11 @@ from sqlalchemy.pool import StaticPool
 config.Config.SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
 # Keep one in-memory connection alive for the whole session.
 config.Config.SQLALCHEMY_ENGINE_OPTIONS = {"poolclass": StaticPool}
+# Run POST /api/schedule jobs inline: a worker thread would share the single
+# in-memory connection with the test thread.
+config.Config.SCHEDULE_JOBS_ASYNC = False
+# No background calendar sync thread either, for the same reason.
+config.Config.CALENDAR_SYNC_ENABLED = False
 # Tests should not need real AI credentials.
 os.environ.setdefault("AI_API_KEY", "stub-key-not-used-in-tests")
 os.environ.setdefault("APP_PASSWORD", "test-password")
@@ -48,10 +54,11 @@ os.environ.setdefault("SECRET_KEY", "test-secret")
 # below is named `app` (the pytest-flask convention); if we imported `app` here
 # the fixture definition would shadow the Flask app object and the fixture body
 # would call `app.app_context()` on the fixture-definition object → AttributeError.
-from app import app as flask_app, db  # noqa: E402  (import after config redirect)
+from app import app as flask_app, db, last_schedule, busy_cache  # noqa: E402  (import after config redirect)
 from ai_parser import AIProvider, parse_task_with_ai, get_ai_provider  # noqa: E402
 import ai_parser  # noqa: E402  (module handle for monkeypatching)
 from models import Space, Note  # noqa: E402
+from scheduler import TaskSnapshot  # noqa: E402
 
 DEFAULT_SPACES = [
     {
@@ -122,6 +129,21 @@ class StubAIProvider(AIProvider):
 import pytest  # noqa: E402
 
 
+def make_task(id, priority=5, duration=60, deadline=None, space_id=None, frozen=False,
+              scheduled_start=None, scheduled_end=None):
+    """
+    Scheduler input for the pure scheduler tests: a `TaskSnapshot`, the record
+    `/api/schedule` hands the scheduler. `created_at` is 2020-01-01 plus `id`
+    seconds, so otherwise equal tasks rank by id.
+    """
+    return TaskSnapshot(
+        id=id, priority=priority, deadline=deadline,
+        created_at=datetime(2020, 1, 1) + timedelta(seconds=id),
+        estimated_duration=duration, space=None, space_id=space_id, frozen=frozen,
+        scheduled_start=scheduled_start, scheduled_end=scheduled_end
+    )
+
+
 @pytest.fixture
 def app():
     """Flask app with a freshly reset in-memory DB per test.
@@ -136,6 +158,9 @@ def app():
         db.drop_all()
         db.create_all()
         _seed_default_spaces()
+        # The cached schedule and busy intervals belong to the previous test's database
+        last_schedule.update(fingerprint=None, result=None)
+        busy_cache.invalidate()
         yield flask_app
 
 
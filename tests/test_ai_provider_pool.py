@@ -0,0 +1,62 @@
+"""get_ai_provider returns one long-lived provider per AI_* settings, and
+OpenAI-compatible calls go through its pooled keep-alive session."""
+
+import pytest
+
+import ai_parser
+from ai_parser import AnthropicProvider, OpenAIProvider, get_ai_provider
+
+
+@pytest.fixture
+def fresh_provider(monkeypatch):
+    monkeypatch.setattr(ai_parser, '_provider', None)
+    monkeypatch.setattr(ai_parser, '_provider_settings', None)
+    monkeypatch.setenv('AI_API_KEY', 'key-1')
+    monkeypatch.setenv('AI_API_BASE_URL', 'https://api.example.test/v1')
+    monkeypatch.setenv('AI_MODEL', 'small')
+    yield monkeypatch
+    if ai_parser._provider is not None:
+        ai_parser._provider.close()
+
+
+class _Response:
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'choices': [{'message': {'content': self.content}}]}
+
+
+def test_provider_is_reused_until_settings_change(fresh_provider):
+    provider = get_ai_provider()
+    assert isinstance(provider, OpenAIProvider)
+    assert get_ai_provider() is provider
+
+    closed = []
+    fresh_provider.setattr(provider, 'close', lambda: closed.append(True))
+    fresh_provider.setenv('AI_MODEL', 'large')
+    rebuilt = get_ai_provider()
+    assert rebuilt is not provider and rebuilt.model == 'large'
+    assert closed == [True]
+
+    fresh_provider.setenv('AI_API_BASE_URL', 'https://api.anthropic.com')
+    assert isinstance(get_ai_provider(), AnthropicProvider)
+
+
+def test_requests_share_the_provider_session(fresh_provider):
+    provider = get_ai_provider()
+    calls = []
+
+    def post(url, headers, json, timeout):
+        calls.append(url)
+        return _Response('tidy' if 'note' in json['messages'][1]['content'] else '[{"title": "t"}]')
+
+    fresh_provider.setattr(provider.session, 'post', post)
+    assert ai_parser.cleanify_note_with_ai('note', 'prompt') == 'tidy'
+    assert ai_parser.parse_task_with_ai('task', 'prompt') == [{'title': 't'}]
+    assert calls == ['https://api.example.test/v1/chat/completions'] * 2
+    adapter = provider.session.get_adapter('https://api.example.test')
+    assert adapter._pool_maxsize == ai_parser.AI_POOL_SIZE
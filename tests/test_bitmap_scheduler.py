@@ -0,0 +1,64 @@
+"""Slot-bitmap engine: same contract and, on grid-aligned input, the same
+placements as the greedy `scheduler.schedule_tasks`."""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from conftest import make_task  # noqa: E402
+from bitmap_scheduler import schedule_tasks_bitmap  # noqa: E402
+from scheduler import round_to_next_30min, schedule_tasks  # noqa: E402
+
+CONSTRAINTS = {
+    1: [{'day': d, 'start': '09:00', 'end': '17:00'} for d in range(5)],
+    2: [{'day': 2, 'start': '18:00', 'end': '22:00'}],
+}
+
+
+def _workload(n, seed=7):
+    rng = random.Random(seed)
+    now = round_to_next_30min(datetime.now())
+    tasks = []
+    for i in range(n):
+        deadline = None
+        if rng.random() < 0.3:
+            deadline = now + timedelta(hours=rng.randint(4, 24 * 20))
+        tasks.append(make_task(
+            i, priority=rng.randint(0, 10), deadline=deadline,
+            duration=rng.choice([30, 60, 90, 120]), space_id=rng.choice([None, 1, 2])
+        ))
+    events = []
+    for _ in range(n // 2):
+        start = now + timedelta(minutes=30 * rng.randint(0, 48 * 30))
+        events.append({'start': start, 'end': start + timedelta(minutes=30 * rng.randint(1, 4))})
+    return tasks, events
+
+
+def test_bitmap_matches_greedy_on_aligned_workload():
+    tasks, events = _workload(150)
+    greedy = schedule_tasks(tasks, events, CONSTRAINTS)
+    bitmap = schedule_tasks_bitmap(tasks, events, CONSTRAINTS)
+    assert bitmap == greedy
+
+
+def test_bitmap_rounds_partial_slots_and_respects_frozen():
+    now = round_to_next_30min(datetime.now())
+    frozen = make_task(1, priority=0, frozen=True,
+                       scheduled_start=now, scheduled_end=now + timedelta(minutes=60))
+    first = make_task(2, priority=9, duration=45)
+    second = make_task(3, priority=8, duration=30)
+    result = schedule_tasks_bitmap([frozen, first, second], [], {})
+    assert result == [
+        {'id': 2, 'scheduled_start': now + timedelta(minutes=60),
+         'scheduled_end': now + timedelta(minutes=105)},
+        {'id': 3, 'scheduled_start': now + timedelta(minutes=120),
+         'scheduled_end': now + timedelta(minutes=150)},
+    ]
+
+
+def test_bitmap_skips_tasks_whose_deadline_has_passed():
+    task = make_task(1, deadline=datetime.now() - timedelta(days=1))
+    assert schedule_tasks_bitmap([task], [], {}) == []
@@ -0,0 +1,103 @@
+"""Process-wide busy cache: merged epoch-minute intervals per source, range
+lookups, rebuild on sync and invalidation on source changes."""
+
+from datetime import datetime, timedelta
+
+from app import busy_cache, db
+from busy_cache import SourceIntervals, from_epoch_minute, to_epoch_minute
+from conftest import login
+from models import CalendarSource, ExternalEvent
+
+DAY = datetime(2030, 1, 7)
+
+
+def _source(name, **kwargs):
+    source = CalendarSource(name=name, ics_url=f'http://{name}', **kwargs)
+    db.session.add(source)
+    db.session.commit()
+    return source
+
+
+def _event(source, uid, start_hour, end_hour):
+    db.session.add(ExternalEvent(
+        source_id=source.id, uid=uid, title=uid,
+        start=DAY + timedelta(hours=start_hour), end=DAY + timedelta(hours=end_hour)
+    ))
+    db.session.commit()
+
+
+def _hours(events):
+    return [((e['start'] - DAY) / timedelta(hours=1), (e['end'] - DAY) / timedelta(hours=1))
+            for e in events]
+
+
+def test_epoch_minutes_round_outward():
+    start = DAY + timedelta(seconds=30)
+    assert from_epoch_minute(to_epoch_minute(start)) == DAY
+    assert from_epoch_minute(to_epoch_minute(start, round_up=True)) == DAY + timedelta(minutes=1)
+    assert to_epoch_minute(DAY, round_up=True) == to_epoch_minute(DAY)
+
+
+def test_source_intervals_merge_and_bisect():
+    entry = SourceIntervals(None, [(10, 20), (15, 30), (30, 40), (50, 60), (70, 70)])
+    assert list(entry.starts) == [10, 50] and list(entry.ends) == [40, 60]
+    assert list(entry.overlapping(40, 50)) == []
+    assert list(entry.overlapping(39, 51)) == [(10, 40), (50, 60)]
+    assert entry.nbytes == 4 * entry.starts.itemsize
+
+
+def test_busy_events_merge_across_sources_within_range(app):
+    team, personal = _source('team'), _source('personal')
+    off = _source('off', enabled=False)
+    _event(team, 'a', 9, 10)
+    _event(personal, 'b', 9.5, 11)
+    _event(team, 'c', 14, 15)
+    _event(off, 'd', 12, 13)
+
+    assert _hours(busy_cache.busy_events(DAY, DAY + timedelta(days=1))) == [(9, 11), (14, 15)]
+    assert _hours(busy_cache.busy_events(DAY + timedelta(hours=12), DAY + timedelta(days=1))) == [(14, 15)]
+
+
+def test_entries_are_reused_until_the_source_is_synced_again(app):
+    team = _source('team', last_fetched=DAY)
+    _event(team, 'a', 9, 10)
+    busy_cache.busy_events(DAY, DAY + timedelta(days=1))
+    _event(team, 'b', 12, 13)  # same version: not seen yet
+    hits = busy_cache.hits
+
+    assert _hours(busy_cache.busy_events(DAY, DAY + timedelta(days=1))) == [(9, 10)]
+    assert busy_cache.hits == hits + 1
+
+    team.last_fetched = DAY + timedelta(minutes=15)
+    db.session.commit()
+    assert _hours(busy_cache.busy_events(DAY, DAY + timedelta(days=1))) == [(9, 10), (12, 13)]
+
+
+def test_source_routes_invalidate_and_stats_report_memory(client):
+    login(client)
+    team = _source('team', last_fetched=DAY)
+    _event(team, 'a', 9, 10)
+    busy_cache.busy_events(DAY, DAY + timedelta(days=1))
+    stats = client.get('/api/calendar-sources/busy-cache').get_json()
+    assert (stats['sources'], stats['intervals']) == (1, 1)
+    assert stats['bytes'] > 0
+
+    client.delete(f'/api/calendar-sources/{team.id}')
+    assert client.get('/api/calendar-sources/busy-cache').get_json()['sources'] == 0
+    assert busy_cache.busy_events(DAY, DAY + timedelta(days=1)) == []
+
+
+def test_events_endpoint_serves_busy_intervals(client):
+    login(client)
+    team = _source('team', last_fetched=datetime.now())
+    start = (datetime.now() + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+    for uid, offset in (('a', 0), ('b', 30)):
+        db.session.add(ExternalEvent(source_id=team.id, uid=uid, title=uid,
+                                     start=start + timedelta(minutes=offset),
+                                     end=start + timedelta(minutes=offset + 60)))
+    db.session.commit()
+
+    body = client.get('/api/external-events?busy=true&include_status=true').get_json()
+    assert body['events'] == [{'start': start.isoformat(),
+                               'end': (start + timedelta(minutes=90)).isoformat()}]
+    assert body['sources'][0]['events'] == 2
@@ -0,0 +1,144 @@
+"""ICS feeds: parsed-event cache with a TTL and conditional GETs."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import calendar_integration
+from app import db
+from calendar_integration import clear_feed_cache, fetch_feed
+from calendar_sync import sync_due_sources
+from models import CalendarSource, ExternalEvent
+
+TOMORROW = (datetime.now() + timedelta(days=1)).strftime('%Y%m%d')
+ICS = (
+    "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//test//EN\r\n"
+    "BEGIN:VEVENT\r\nUID:1\r\nSUMMARY:Standup\r\n"
+    f"DTSTART:{TOMORROW}T090000\r\nDTEND:{TOMORROW}T093000\r\n"
+    "END:VEVENT\r\nEND:VCALENDAR\r\n"
+).encode()
+
+
+class _Response:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_lines(self, chunk_size=512):
+        return iter(self.content.splitlines())
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f'HTTP {self.status_code}')
+
+
+class _Server:
+    """requests.get stand-in serving ICS with an ETag and honouring If-None-Match."""
+
+    def __init__(self, etag='"v1"'):
+        self.etag = etag
+        self.requests = []
+
+    def __call__(self, url, timeout=None, headers=None, stream=False):
+        headers = headers or {}
+        self.requests.append(headers)
+        if headers.get('If-None-Match') == self.etag:
+            return _Response(304)
+        return _Response(200, ICS, {'ETag': self.etag, 'Last-Modified': 'Mon, 06 Jan 2030 08:00:00 GMT'})
+
+
+@pytest.fixture
+def server(monkeypatch):
+    clear_feed_cache()
+    server = _Server()
+    monkeypatch.setattr(calendar_integration.requests, 'get', server)
+    yield server
+    clear_feed_cache()
+
+
+def test_fresh_cache_skips_the_request(server):
+    events, info = fetch_feed('http://feed', ttl=60)
+    assert info['cache'] == 'miss' and [e['title'] for e in events] == ['Standup']
+
+    events, info = fetch_feed('http://feed', ttl=60)
+    assert info['cache'] == 'hit' and [e['title'] for e in events] == ['Standup']
+    assert len(server.requests) == 1
+
+
+def test_expired_cache_revalidates_without_reparsing(server, monkeypatch):
+    fetch_feed('http://feed', ttl=0)
+
+    def no_parse(*args):
+        raise AssertionError('a 304 must not re-parse the feed')
+    monkeypatch.setattr(calendar_integration, 'parse_ics_stream', no_parse)
+
+    events, info = fetch_feed('http://feed', ttl=0)
+    assert info['cache'] == 'revalidated' and len(events) == 1
+    assert server.requests[1] == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Mon, 06 Jan 2030 08:00:00 GMT'
+    }
+
+
+def test_changed_feed_is_downloaded_again(server):
+    fetch_feed('http://feed', ttl=0)
+    server.etag = '"v2"'
+    _, info = fetch_feed('http://feed', ttl=0)
+    assert (info['cache'], info['etag']) == ('miss', '"v2"')
+
+
+def test_callers_get_copies_of_cached_events(server):
+    events, _ = fetch_feed('http://feed', ttl=60)
+    events[0]['start'] = events[0]['start'].isoformat()
+
+    events, _ = fetch_feed('http://feed', ttl=60)
+    assert isinstance(events[0]['start'], datetime)
+
+
+def test_validators_are_stored_on_the_source(app, server):
+    db.session.add(CalendarSource(name='team', ics_url='http://feed'))
+    db.session.commit()
+
+    sync_due_sources()
+    source = CalendarSource.query.one()
+    assert (source.etag, source.last_modified) == ('"v1"', 'Mon, 06 Jan 2030 08:00:00 GMT')
+
+
+def test_stored_validators_survive_a_restart(app, server):
+    db.session.add(CalendarSource(name='team', ics_url='http://feed'))
+    db.session.commit()
+    sync_due_sources()
+    rows = [(e.id, e.uid, e.start) for e in ExternalEvent.query]
+
+    clear_feed_cache()  # a new process: no parse in memory
+    result = sync_due_sources(force=True)
+    status = list(result.values())[0]
+    assert (status['cache'], status['inserted'], status['deleted'], status['unchanged']) == (
+        'not_modified', 0, 0, 1
+    )
+    assert server.requests[-1] == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Mon, 06 Jan 2030 08:00:00 GMT'
+    }
+    assert [(e.id, e.uid, e.start) for e in ExternalEvent.query] == rows
+
+
+def test_old_stored_events_are_downloaded_again(app, server):
+    db.session.add(CalendarSource(name='team', ics_url='http://feed'))
+    db.session.commit()
+    sync_due_sources()
+    source = CalendarSource.query.one()
+    source.events_refreshed_at -= timedelta(days=2)
+    db.session.commit()
+
+    clear_feed_cache()
+    status = list(sync_due_sources(force=True).values())[0]
+    assert status['cache'] == 'miss'
+    assert server.requests[-1] == {}
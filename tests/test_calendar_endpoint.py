@@ -0,0 +1,95 @@
+"""GET /api/calendar: tasks and stored external events overlapping the visible
+range, shaped for FullCalendar."""
+
+import importlib.util
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app import db
+from conftest import login
+from models import CalendarSource, ExternalEvent, Task
+
+MONDAY = datetime(2030, 1, 7)
+
+
+def _task(title, start, hours=1, **kwargs):
+    task = Task(title=title, scheduled_start=start, scheduled_end=start + timedelta(hours=hours), **kwargs)
+    db.session.add(task)
+    db.session.commit()
+    return task
+
+
+def _week(client, start=MONDAY, **params):
+    params = {'start': start.isoformat(), 'end': (start + timedelta(days=7)).isoformat(), **params}
+    return client.get('/api/calendar', query_string=params)
+
+
+def test_returns_only_tasks_overlapping_the_range(client):
+    login(client)
+    _task('before', MONDAY - timedelta(days=2))
+    _task('spans start', MONDAY - timedelta(hours=1), hours=2)
+    _task('inside', MONDAY + timedelta(days=3))
+    _task('after', MONDAY + timedelta(days=8))
+    db.session.add(Task(title='unscheduled'))
+    db.session.commit()
+
+    titles = [e['title'] for e in _week(client).get_json()]
+    assert titles == ['spans start', 'inside']
+
+
+def test_events_are_shaped_for_fullcalendar(client):
+    login(client)
+    frozen = _task('frozen', MONDAY + timedelta(hours=9), frozen=True)
+    done = _task('done', MONDAY + timedelta(hours=11), completed=True)
+    source = CalendarSource(name='team', ics_url='http://team')
+    db.session.add(source)
+    db.session.commit()
+    event = ExternalEvent(source_id=source.id, uid='a', title='Standup', description='daily',
+                          start=MONDAY + timedelta(hours=10), end=MONDAY + timedelta(hours=10, minutes=15))
+    db.session.add(event)
+    db.session.commit()
+
+    events = {e['id']: e for e in _week(client).get_json()}
+    assert set(events) == {f'task-{frozen.id}', f'external-{event.id}'}
+    assert events[f'task-{frozen.id}'] == {
+        'id': f'task-{frozen.id}', 'title': '❄️ frozen',
+        'start': '2030-01-07T09:00:00', 'end': '2030-01-07T10:00:00',
+        'className': 'task-event frozen-task', 'editable': True,
+        'extendedProps': {'type': 'task', 'taskId': frozen.id}
+    }
+    assert events[f'external-{event.id}']['editable'] is False
+    assert events[f'external-{event.id}']['extendedProps'] == {'type': 'external', 'description': 'daily'}
+
+    with_done = {e['id']: e for e in _week(client, include_completed='true').get_json()}
+    assert with_done[f'task-{done.id}']['className'] == 'task-event completed-task'
+    assert with_done[f'task-{done.id}']['editable'] is False
+
+
+def test_missing_or_invalid_range_is_rejected(client):
+    login(client)
+    assert client.get('/api/calendar').status_code == 400
+    assert client.get('/api/calendar', query_string={'start': 'soon', 'end': 'later'}).status_code == 400
+    assert client.get('/api/calendar', query_string={
+        'start': MONDAY.isoformat(), 'end': MONDAY.isoformat()
+    }).status_code == 400
+
+
+def test_migration_adds_missing_indexes():
+    path = os.path.join(os.path.dirname(__file__), '..', 'migrate_db.py')
+    spec = importlib.util.spec_from_file_location('migrate_db', path)
+    migrate_db = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migrate_db)
+
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text('DROP INDEX ix_tasks_scheduled_start'))
+
+    _, _, missing = migrate_db.diff(engine)
+    assert [index.name for index in missing] == ['ix_tasks_scheduled_start']
+
+    migrate_db.apply_diff(engine, [], [], missing, dry_run=False)
+    assert migrate_db.diff(engine) == ([], [], [])
@@ -0,0 +1,58 @@
+"""Concurrent ICS fetching: one shared deadline and per-source status."""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import calendar_integration
+from calendar_integration import fetch_all_external_events
+
+START = datetime(2030, 1, 7, 9, 0)
+
+
+def _fake_fetch(delays, release=None):
+    """fetch_feed stand-in: 'fail' raises, a number sleeps that long."""
+    def fetch(ics_url, days_ahead=30, timeout=10, ttl=0.0, validators=None):
+        delay = delays[ics_url]
+        if delay == 'fail':
+            raise ValueError('bad feed')
+        if delay == 'hang':
+            release.wait(5)
+        else:
+            time.sleep(delay)
+        events = [{'start': START, 'end': START + timedelta(hours=1), 'title': ics_url}]
+        return events, {'cache': 'miss', 'etag': None, 'last_modified': None}
+    return fetch
+
+
+def test_sources_are_fetched_concurrently(monkeypatch):
+    delays = {f'http://feed/{i}': 0.2 for i in range(5)}
+    monkeypatch.setattr(calendar_integration, 'fetch_feed', _fake_fetch(delays))
+
+    started = time.monotonic()
+    events, statuses = fetch_all_external_events(list(enumerate(delays)), deadline=5)
+
+    assert time.monotonic() - started < 0.8
+    assert len(events) == 5
+    assert {s['status'] for s in statuses.values()} == {'ok'}
+
+
+def test_slow_and_failing_feeds_are_reported_not_raised(monkeypatch):
+    release = threading.Event()
+    delays = {'http://ok': 0, 'http://slow': 'hang', 'http://broken': 'fail'}
+    monkeypatch.setattr(calendar_integration, 'fetch_feed', _fake_fetch(delays, release))
+
+    try:
+        started = time.monotonic()
+        events, statuses = fetch_all_external_events(
+            [('ok', 'http://ok'), ('slow', 'http://slow'), ('broken', 'http://broken')],
+            deadline=0.3
+        )
+        assert time.monotonic() - started < 1.0
+    finally:
+        release.set()
+
+    assert [e['title'] for e in events] == ['http://ok']
+    assert statuses['ok']['status'] == 'ok' and statuses['ok']['events'] == 1
+    assert statuses['slow']['status'] == 'timeout'
+    assert (statuses['broken']['status'], statuses['broken']['error']) == ('error', 'bad feed')
@@ -0,0 +1,104 @@
+"""Per-source health: failing feeds back off and keep serving their last
+good events."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import calendar_integration
+from app import db
+from calendar_sync import FAILURE_THRESHOLD, MAX_BACKOFF, sync_due_sources
+from conftest import login
+from models import CalendarSource
+
+TOMORROW = (datetime.now() + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+
+
+@pytest.fixture
+def feeds(monkeypatch):
+    """ICS URL -> list of event dicts (or an exception to raise); counts fetches."""
+    feeds = {}
+    feeds['fetches'] = []
+
+    def fetch_feed(ics_url, days_ahead=30, timeout=10, ttl=0.0, validators=None):
+        feeds['fetches'].append(ics_url)
+        feed = feeds[ics_url]
+        if isinstance(feed, Exception):
+            raise feed
+        return [dict(e) for e in feed], {'cache': 'miss', 'etag': None, 'last_modified': None}
+
+    monkeypatch.setattr(calendar_integration, 'fetch_feed', fetch_feed)
+    return feeds
+
+
+def _fail_until_backed_off(source):
+    for _ in range(FAILURE_THRESHOLD):
+        source.last_fetched = None  # due regardless of the interval
+        db.session.commit()
+        sync_due_sources()
+
+
+def test_repeated_failures_back_the_source_off(app, feeds):
+    source = CalendarSource(name='dead', ics_url='http://dead', sync_interval=10)
+    db.session.add(source)
+    db.session.commit()
+    feeds['http://dead'] = RuntimeError('HTTP 503')
+
+    sync_due_sources()
+    assert source.consecutive_failures == 1 and source.retry_after is None
+    sync_due_sources()  # retried at the next poll before the breaker opens
+    assert len(feeds['fetches']) == 2
+
+    sync_due_sources()
+    assert source.consecutive_failures == FAILURE_THRESHOLD
+    assert source.last_error == 'HTTP 503'
+    assert source.retry_after - datetime.utcnow() == pytest.approx(timedelta(minutes=10), abs=timedelta(seconds=5))
+
+    assert sync_due_sources() == {}  # skipped while backed off
+    assert len(feeds['fetches']) == 3
+
+    source.retry_after = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    sync_due_sources()
+    assert source.retry_after - datetime.utcnow() > timedelta(minutes=19)  # doubled
+
+    source.consecutive_failures = 50
+    source.retry_after = None
+    db.session.commit()
+    sync_due_sources()
+    assert source.retry_after - datetime.utcnow() <= MAX_BACKOFF
+
+
+def test_recovery_resets_health(app, feeds):
+    source = CalendarSource(name='flaky', ics_url='http://flaky')
+    db.session.add(source)
+    db.session.commit()
+    feeds['http://flaky'] = RuntimeError('timed out')
+    _fail_until_backed_off(source)
+    assert source.retry_after is not None
+
+    feeds['http://flaky'] = []
+    source.retry_after = None
+    db.session.commit()
+    assert sync_due_sources()[source.id]['status'] == 'ok'
+    assert (source.consecutive_failures, source.last_error, source.retry_after) == (0, None, None)
+
+
+def test_failing_source_serves_its_last_good_events(client, feeds):
+    login(client)
+    source = CalendarSource(name='team', ics_url='http://team')
+    db.session.add(source)
+    db.session.commit()
+    start = TOMORROW
+    feeds['http://team'] = [{'uid': 'a', 'start': start, 'end': start + timedelta(hours=1),
+                             'title': 'Standup', 'description': ''}]
+    sync_due_sources()
+
+    feeds['http://team'] = RuntimeError('HTTP 500')
+    sync_due_sources(force=True)
+
+    body = client.get('/api/external-events?include_status=true').get_json()
+    assert [e['title'] for e in body['events']] == ['Standup']
+    [status] = body['sources']
+    assert (status['status'], status['error']) == ('stale', 'HTTP 500')
+    assert client.get('/api/calendar-sources').get_json()[0]['consecutive_failures'] == 1
@@ -0,0 +1,134 @@
+"""Background calendar sync: feeds are upserted into external_events and the
+API reads them back with range queries."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import calendar_integration
+from app import db
+import app as app_module
+from calendar_sync import SYNC_LOCK_NAME, CalendarSyncWorker, event_keys, sync_due_sources
+from conftest import login
+from models import CalendarSource, ExternalEvent
+from schedule_jobs import acquire_schedule_lock, release_schedule_lock
+
+TOMORROW = (datetime.now() + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+
+
+def _event(uid, hours=0, title='Meeting'):
+    start = TOMORROW + timedelta(hours=hours)
+    return {'uid': uid, 'start': start, 'end': start + timedelta(hours=1),
+            'title': title, 'description': ''}
+
+
+@pytest.fixture
+def feeds(monkeypatch):
+    """ICS URL -> list of event dicts (or an exception to raise)."""
+    feeds = {}
+
+    def fetch_feed(ics_url, days_ahead=30, timeout=10, ttl=0.0, validators=None):
+        feed = feeds[ics_url]
+        if isinstance(feed, Exception):
+            raise feed
+        return [dict(e) for e in feed], {'cache': 'miss', 'etag': None, 'last_modified': None}
+
+    monkeypatch.setattr(calendar_integration, 'fetch_feed', fetch_feed)
+    return feeds
+
+
+def _source(name, url, **kwargs):
+    source = CalendarSource(name=name, ics_url=url, **kwargs)
+    db.session.add(source)
+    db.session.commit()
+    return source
+
+
+def test_sync_upserts_only_changed_events(app, feeds):
+    source = _source('team', 'http://team')
+    feeds['http://team'] = [_event('a'), _event('b', 2), _event('c', 4)]
+    assert sync_due_sources()[source.id]['inserted'] == 3
+
+    feeds['http://team'] = [_event('a'), _event('b', 3), _event('d', 6)]
+    result = sync_due_sources(force=True)[source.id]
+    assert {k: result[k] for k in ('inserted', 'updated', 'deleted', 'unchanged')} == {
+        'inserted': 1, 'updated': 1, 'deleted': 1, 'unchanged': 1
+    }
+    stored = {e.uid: e.start for e in ExternalEvent.query.filter_by(source_id=source.id)}
+    assert stored == {'a': TOMORROW, 'b': TOMORROW + timedelta(hours=3), 'd': TOMORROW + timedelta(hours=6)}
+
+
+def test_sources_sync_on_their_own_interval(app, feeds):
+    fresh = _source('fresh', 'http://fresh', sync_interval=60)
+    stale = _source('stale', 'http://stale', sync_interval=5)
+    fresh.last_fetched = stale.last_fetched = datetime.utcnow() - timedelta(minutes=10)
+    db.session.commit()
+    feeds['http://stale'] = [_event('x')]
+
+    assert list(sync_due_sources()) == [stale.id]
+
+
+def test_failed_feed_keeps_its_events_and_is_retried(app, feeds):
+    source = _source('team', 'http://team')
+    feeds['http://team'] = [_event('a')]
+    sync_due_sources()
+    synced_at = source.last_fetched
+
+    feeds['http://team'] = ConnectionError('down')
+    assert sync_due_sources(force=True)[source.id]['status'] == 'error'
+    assert ExternalEvent.query.count() == 1
+    assert source.last_fetched == synced_at
+
+
+def test_duplicate_and_missing_uids_get_distinct_keys():
+    events = [_event('r'), _event('r', 24), _event(None), _event(None, 1)]
+    keys = event_keys(events)
+    assert len(set(keys)) == 4
+    assert keys[0] == f"r@{TOMORROW.isoformat()}"
+    assert event_keys(events) == keys
+
+
+def test_endpoints_read_the_store_without_fetching(client, feeds):
+    login(client)
+    _source('team', 'http://team')
+    feeds['http://team'] = [_event('a', title='Standup')]
+    sync_due_sources()
+    _source('new', 'http://new')  # not synced yet
+    _source('off', 'http://off', enabled=False)
+    feeds.clear()  # any live fetch would now raise KeyError
+
+    body = client.get('/api/external-events?include_status=true').get_json()
+    assert [e['title'] for e in body['events']] == ['Standup']
+    assert [(s['name'], s['status'], s['events']) for s in body['sources']] == [
+        ('team', 'ok', 1), ('new', 'pending', 0)
+    ]
+
+    client.post('/api/tasks', json={'title': 'focus', 'space': 'study'})
+    job = client.post('/api/schedule').get_json()
+    assert job['status'] == 'done'
+    assert [s['status'] for s in job['result']['calendar_sources']] == ['ok', 'pending']
+
+
+def test_first_request_starts_the_sync_worker(client, monkeypatch):
+    started = []
+    monkeypatch.setattr(app_module.calendar_sync, 'start', lambda: started.append(True))
+    client.get('/login')
+    assert started == []  # disabled in tests
+
+    monkeypatch.setitem(app_module.app.config, 'CALENDAR_SYNC_ENABLED', True)
+    client.get('/login')
+    assert started == [True]
+
+
+def test_worker_skips_the_poll_while_another_process_syncs(app, feeds):
+    _source('team', 'http://team')
+    feeds['http://team'] = [_event('a')]
+    worker = CalendarSyncWorker(app)
+
+    assert acquire_schedule_lock('other-process', name=SYNC_LOCK_NAME)
+    assert worker.run_once() is None
+    assert ExternalEvent.query.count() == 0
+
+    release_schedule_lock('other-process', name=SYNC_LOCK_NAME)
+    assert list(worker.run_once().values())[0]['inserted'] == 1
+    assert ExternalEvent.query.count() == 1
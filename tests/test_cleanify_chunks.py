@@ -0,0 +1,109 @@
+"""Chunked Cleanify: long notes are split at headings and paragraphs,
+tidied concurrently, reassembled in order, and unchanged chunks are skipped
+on a re-run."""
+
+import threading
+import time
+
+import pytest
+
+import ai_parser
+from ai_parser import AIProvider, cleanify_note_with_ai, split_markdown, stream_cleanify_note_with_ai
+from llm_cache import LLMCache
+
+NOTE = (
+    "# Groceries\nmilk\n\neggs\n\n"
+    "# Work\nfinish the report\n\n```\ncode\n\nstill code\n```\n\n"
+    "# Home\nfix the sink"
+)
+
+
+class UppercaseProvider(AIProvider):
+    def __init__(self):
+        super().__init__(api_key='stub', model='small')
+        self.lock = threading.Lock()
+        self.sent = []
+        self.running = 0
+        self.max_running = 0
+        self.fail_on = None
+
+    def cleanify(self, note_text, system_prompt):
+        with self.lock:
+            self.sent.append(note_text)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(0.02)
+            if self.fail_on and self.fail_on in note_text:
+                raise RuntimeError('timeout')
+            return note_text.upper()
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = UppercaseProvider()
+    monkeypatch.setattr(ai_parser, 'get_ai_provider', lambda: provider)
+    monkeypatch.setattr(ai_parser, 'CLEANIFY_CHUNK_CHARS', 30)
+    return provider
+
+
+def test_split_at_headings_and_paragraphs_keeping_code_fences():
+    assert split_markdown('short note', max_chars=100) == ['short note']
+    assert split_markdown(NOTE, max_chars=30) == [
+        "# Groceries\nmilk\n\neggs",
+        "# Work\nfinish the report",
+        "```\ncode\n\nstill code\n```",
+        "# Home\nfix the sink",
+    ]
+    # A long section is cut between paragraphs; short ones are packed together
+    assert split_markdown('aaaa\n\nbbbb\n\ncccc\n\ndddd', max_chars=12) == ['aaaa\n\nbbbb', 'cccc\n\ndddd']
+
+
+def test_small_sections_are_packed_and_cut_before_headings():
+    note = '\n\n'.join(f'## Section {i}\n' + 'x' * 64 for i in range(60))
+    chunks = split_markdown(note, max_chars=4000)
+    assert len(chunks) == 2
+    assert all(chunk.startswith('## Section') for chunk in chunks)
+    assert all(len(chunk) <= 4000 for chunk in chunks)
+    assert '\n\n'.join(chunks) == note
+
+
+def test_chunks_are_cleaned_concurrently_and_reassembled_in_order(provider):
+    result = cleanify_note_with_ai(NOTE, 'prompt')
+    assert result == '\n\n'.join(chunk.upper() for chunk in split_markdown(NOTE, max_chars=30))
+    assert len(provider.sent) == 4
+    assert provider.max_running > 1
+
+
+def test_failed_chunk_keeps_its_original_text(provider):
+    provider.fail_on = 'Work'
+    result = cleanify_note_with_ai(NOTE, 'prompt')
+    assert '# Work\nfinish the report' in result and '# HOME' in result
+
+    provider.fail_on = '#'
+    provider.cleanify = lambda text, prompt: None
+    assert cleanify_note_with_ai(NOTE, 'prompt') == NOTE
+
+
+def test_rerun_after_an_edit_only_sends_changed_chunks(app, provider):
+    cache = LLMCache(ttl=3600, max_entries=100)
+    cleaned = cleanify_note_with_ai(NOTE, 'prompt', cache=cache)
+    provider.sent.clear()
+
+    # The cleaned note is already clean: nothing is sent again
+    assert cleanify_note_with_ai(cleaned, 'prompt', cache=cache) == cleaned
+    assert provider.sent == []
+
+    edited = cleaned.replace('FIX THE SINK', 'fix the sink and the door')
+    assert cleanify_note_with_ai(edited, 'prompt', cache=cache).endswith('FIX THE SINK AND THE DOOR')
+    assert provider.sent == ['# HOME\nfix the sink and the door']
+
+
+def test_stream_sends_chunks_in_order(provider):
+    events = list(stream_cleanify_note_with_ai(NOTE, 'prompt'))
+    deltas = ''.join(data['text'] for event, data in events if event == 'delta')
+    assert [event for event, _ in events] == ['delta'] * 4 + ['done']
+    assert events[-1][1]['content'] == deltas == cleanify_note_with_ai(NOTE, 'prompt')
@@ -0,0 +1,118 @@
+"""Streaming Cleanify: POST /api/notes/<id>/cleanify/stream forwards model
+chunks as Server-Sent Events and keeps the original text on failure."""
+
+import json
+
+import pytest
+
+import ai_parser
+from ai_parser import AIProvider, OpenAIProvider
+from conftest import login
+from models import LLMCacheEntry
+
+
+class StreamingProvider(AIProvider):
+    def __init__(self, chunks, fail_after=None):
+        super().__init__(api_key='stub', model='small')
+        self.chunks = chunks
+        self.fail_after = fail_after
+
+    def cleanify_stream(self, note_text, system_prompt):
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise RuntimeError('connection reset')
+            yield chunk
+
+
+@pytest.fixture
+def use_provider(monkeypatch):
+    def use(provider):
+        monkeypatch.setattr(ai_parser, 'get_ai_provider', lambda: provider)
+    return use
+
+
+def _events(resp):
+    events = []
+    for block in resp.get_data(as_text=True).strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_chunks_are_forwarded_then_the_whole_result(client, sample_note, use_provider):
+    login(client)
+    use_provider(StreamingProvider(['# Clean', 'ed\n', '- item']))
+    resp = client.post(f'/api/notes/{sample_note.id}/cleanify/stream')
+    assert resp.status_code == 200
+    assert resp.mimetype == 'text/event-stream'
+    assert _events(resp) == [
+        ('delta', {'text': '# Clean'}),
+        ('delta', {'text': 'ed\n'}),
+        ('delta', {'text': '- item'}),
+        ('done', {'content': '# Cleaned\n- item'}),
+    ]
+
+    # The completed result is cached: a repeat is a single `done`
+    assert _events(client.post(f'/api/notes/{sample_note.id}/cleanify/stream')) == [
+        ('done', {'content': '# Cleaned\n- item'})
+    ]
+
+
+def test_failed_stream_returns_the_original_text(client, sample_note, use_provider):
+    login(client)
+    use_provider(StreamingProvider(['partial ', 'text'], fail_after=1))
+    events = _events(client.post(f'/api/notes/{sample_note.id}/cleanify/stream'))
+    assert events[0] == ('delta', {'text': 'partial '})
+    assert events[-1] == ('error', {'content': sample_note.content_markdown, 'error': 'connection reset'})
+    assert LLMCacheEntry.query.count() == 0
+
+    use_provider(StreamingProvider([]))
+    assert _events(client.post(f'/api/notes/{sample_note.id}/cleanify/stream'))[-1][0] == 'error'
+
+
+def test_providers_without_streaming_yield_one_chunk(client, sample_note, stub_ai_provider):
+    login(client)
+    assert _events(client.post(f'/api/notes/{sample_note.id}/cleanify/stream')) == [
+        ('delta', {'text': 'cleaned'}), ('done', {'content': 'cleaned'})
+    ]
+
+
+def test_missing_note_is_404(client):
+    login(client)
+    assert client.post('/api/notes/9999/cleanify/stream').status_code == 404
+
+
+def test_openai_provider_parses_the_sse_stream(monkeypatch):
+    provider = OpenAIProvider(api_key='key', base_url='https://api.example.test/v1', model='small')
+    lines = [
+        b'data: {"choices": [{"delta": {"role": "assistant"}}]}', b'',
+        b'data: {"choices": [{"delta": {"content": "Hel"}}]}', b'',
+        b': keep-alive', b'',
+        b'data: {"choices": [{"delta": {"content": "lo"}}]}', b'',
+        b'data: {"choices": []}', b'',
+        b'data: [DONE]', b'',
+    ]
+    sent = {}
+
+    class _Response:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def raise_for_status(self):
+            pass
+
+        def iter_lines(self):
+            return iter(lines)
+
+    def post(url, headers, json, timeout, stream):
+        sent.update(url=url, body=json, stream=stream)
+        return _Response()
+
+    monkeypatch.setattr(provider.session, 'post', post)
+    assert list(provider.cleanify_stream('hello', 'prompt')) == ['Hel', 'lo']
+    assert sent['url'] == 'https://api.example.test/v1/chat/completions'
+    assert sent['body']['stream'] is True and sent['stream'] is True
+    provider.close()
@@ -0,0 +1,52 @@
+"""The same meeting subscribed through several feeds is shown (and counted
+as busy) once."""
+
+from datetime import datetime, timedelta
+
+from app import busy_cache, db
+from calendar_sync import dedupe_events, load_stored_events
+from conftest import login
+from models import CalendarSource, ExternalEvent
+
+DAY = datetime(2030, 1, 7)
+
+
+def _event(uid, start_hour, title='Sync', hours=1):
+    start = DAY + timedelta(hours=start_hour)
+    return {'uid': uid, 'start': start, 'end': start + timedelta(hours=hours), 'title': title}
+
+
+def test_dedupe_by_uid_or_slot_keeps_first():
+    events = [
+        _event('a', 9),
+        _event('a', 9, title='Sync (copy)'),  # same UID
+        _event('b', 9),  # same start, end and title
+        _event('sha1:x', 11, title='Lunch'),
+        _event('sha1:y', 11, title='Lunch'),  # content keys are not UIDs
+        _event('sha1:z', 11, title='Walk'),
+    ]
+    assert [e['uid'] for e in dedupe_events(events)] == ['a', 'sha1:x', 'sha1:z']
+
+
+def test_duplicates_across_sources_are_served_once(client):
+    login(client)
+    sources = [CalendarSource(name=name, ics_url=f'http://{name}') for name in ('work', 'team')]
+    db.session.add_all(sources)
+    db.session.commit()
+    for source in sources:
+        for uid, hour, title in (('standup', 9, 'Standup'), (f'{source.name}-only', 14, 'Review')):
+            start = DAY + timedelta(hours=hour)
+            db.session.add(ExternalEvent(source_id=source.id, uid=uid, title=title,
+                                         start=start, end=start + timedelta(hours=1)))
+    db.session.commit()
+
+    events = load_stored_events(DAY, DAY + timedelta(days=1))
+    assert [(e['title'], e['source_id']) for e in events] == [
+        ('Standup', sources[0].id), ('Review', sources[0].id)
+    ]
+
+    body = client.get('/api/calendar', query_string={
+        'start': DAY.isoformat(), 'end': (DAY + timedelta(days=1)).isoformat()
+    }).get_json()
+    assert [e['title'] for e in body] == ['Standup', 'Review']
+    assert len(busy_cache.busy_events(DAY, DAY + timedelta(days=1))) == 2
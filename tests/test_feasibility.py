@@ -0,0 +1,64 @@
+"""Deadline feasibility pass: capacity index, instant rejection and the
+over-commitment report surfaced by POST /api/schedule."""
+
+from datetime import datetime, timedelta
+
+from conftest import login, make_task
+from scheduler import (
+    BusyIntervals,
+    CapacityIndex,
+    FreeCapacity,
+    analyze_feasibility,
+    compile_space_constraints,
+    place_tasks,
+    round_to_next_30min,
+)
+
+
+def test_free_capacity_subtracts_busy_time():
+    start = datetime(2030, 1, 7, 8)  # Monday
+    windows = compile_space_constraints({1: [{'day': 0, 'start': '09:00', 'end': '12:00'}]})[1]
+    busy = BusyIntervals([(datetime(2030, 1, 7, 10), datetime(2030, 1, 7, 10, 30))])
+    free = FreeCapacity(busy, windows, start, start + timedelta(days=1))
+    assert free.free_before(datetime(2030, 1, 7, 12)) == 2.5 * 3600
+    assert free.longest_before(datetime(2030, 1, 7, 12)) == 1.5 * 3600
+    assert free.longest_before(datetime(2030, 1, 7, 9, 30)) == 0.5 * 3600
+
+
+def test_task_without_long_enough_gap_is_rejected_without_search():
+    now = round_to_next_30min(datetime.now())
+    busy = BusyIntervals([(now + timedelta(minutes=30), now + timedelta(days=2))])
+    task = make_task(1, duration=60, deadline=now + timedelta(days=1))
+    capacity = CapacityIndex(busy, {}, now, [task])
+    assert not capacity.can_fit(task, timedelta(minutes=60))
+    assert place_tasks([task], busy, {}, now, capacity) == []
+
+
+def test_report_flags_overcommitted_deadlines_by_minutes():
+    now = round_to_next_30min(datetime.now())
+    events = [{'start': now + timedelta(hours=3), 'end': now + timedelta(days=10)}]
+    due = now + timedelta(hours=3)
+    tasks = [make_task(1, duration=120, deadline=due), make_task(2, duration=120, deadline=due),
+             make_task(3, duration=30)]
+
+    report = analyze_feasibility(tasks, events, {})
+    assert [(r['id'], r['reason'], r['over_by_minutes']) for r in report] == \
+        [(2, 'overcommitted', 60)]
+
+
+def test_report_flags_single_task_that_cannot_fit():
+    now = round_to_next_30min(datetime.now())
+    report = analyze_feasibility([make_task(1, deadline=now - timedelta(hours=1))], [], {})
+    assert report[0]['reason'] == 'no_slot'
+    assert report[0]['over_by_minutes'] == 60
+
+
+def test_schedule_response_lists_overcommitted_tasks(client):
+    login(client)
+    past = (datetime.now() - timedelta(days=1)).replace(microsecond=0).isoformat()
+    client.post('/api/tasks', json={'title': 'too late', 'deadline': past})
+    body = client.post('/api/schedule').get_json()['result']
+    assert body['scheduled_tasks'] == 0
+    [entry] = body['overcommitted']
+    assert entry['title'] == 'too late'
+    assert entry['over_by_minutes'] == 60
@@ -0,0 +1,66 @@
+"""Streaming ICS parser: unfolding, VEVENT-only tokenizing, window skipping."""
+
+from datetime import datetime
+
+from calendar_integration import parse_ics_events, parse_ics_stream
+
+WINDOW = (datetime(2030, 1, 1), datetime(2030, 2, 1))
+
+
+def _feed(*events):
+    body = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for event in events:
+        body += ["BEGIN:VEVENT", *event, "END:VEVENT"]
+    body.append("END:VCALENDAR")
+    return ("\r\n".join(body) + "\r\n").encode()
+
+
+def test_value_forms_keep_wall_clock_time():
+    content = _feed(
+        ["UID:a", "DTSTART;TZID=Europe/Zurich:20300107T090000", "DTEND;TZID=Europe/Zurich:20300107T100000"],
+        ["UID:b", "DTSTART:20300108T090000Z", "DTEND:20300108T093000Z"],
+        ["UID:c", "DTSTART;VALUE=DATE:20300109", "DTEND;VALUE=DATE:20300110"],
+    )
+    events = parse_ics_events(content, *WINDOW)
+    assert [(e['uid'], e['start'], e['end']) for e in events] == [
+        ('a', datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 10)),
+        ('b', datetime(2030, 1, 8, 9), datetime(2030, 1, 8, 9, 30)),
+        ('c', datetime(2030, 1, 9), datetime(2030, 1, 10)),
+    ]
+
+
+def test_folded_lines_and_escapes_are_decoded():
+    title = "Réunion d'équipe, salle 4".encode()
+    content = (
+        b"BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nDTSTART:20300107T090000\r\nDTEND:20300107T100000\r\n"
+        # Fold in the middle of a multibyte character
+        b"SUMMARY:" + title[:2] + b"\r\n " + title[2:].replace(b",", b"\\,") + b"\r\n"
+        b"DESCRIPTION;ALTREP=\"http://x/y:z\":one\\ntwo\\; three\r\n"
+        b"BEGIN:VALARM\r\nDESCRIPTION:reminder\r\nEND:VALARM\r\n"
+        b"END:VEVENT\r\nEND:VCALENDAR\r\n"
+    )
+    [event] = parse_ics_events(content, *WINDOW)
+    assert event['title'] == "Réunion d'équipe, salle 4"
+    assert event['description'] == "one\ntwo; three"
+    assert event['uid'] is None
+
+
+def test_out_of_window_and_malformed_events_are_skipped():
+    content = _feed(
+        ["UID:past", "DTSTART:20200107T090000", "DTEND:20200107T100000"],
+        ["UID:later", "DTSTART:20300307T090000", "DTEND:20300307T100000"],
+        ["UID:spanning", "DTSTART:20291231T230000", "DTEND:20300101T010000"],
+        ["UID:broken", "DTSTART:tomorrow", "DTEND:20300107T100000"],
+        ["UID:no-end", "DTSTART:20300107T090000"],
+    )
+    assert [e['uid'] for e in parse_ics_events(content, *WINDOW)] == ['spanning']
+
+
+def test_stream_accepts_chunked_lines_with_split_crlf():
+    content = _feed(["UID:a", "DTSTART:20300107T090000", "DTEND:20300107T100000", "SUMMARY:Stand", " up"])
+    # iter_lines() yields an empty line when a chunk boundary splits a CRLF
+    lines = []
+    for line in content.split(b"\r\n"):
+        lines += [line, b""]
+    [event] = parse_ics_stream(lines, *WINDOW)
+    assert event['title'] == 'Standup'
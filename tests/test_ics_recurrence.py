@@ -0,0 +1,73 @@
+"""Recurring ICS events: RRULE / RDATE / EXDATE expansion bounded to the
+window, RECURRENCE-ID overrides, and the expansion cache."""
+
+from datetime import datetime, timedelta
+
+from calendar_integration import expand_occurrences, parse_ics_events
+
+WINDOW = (datetime(2030, 1, 1), datetime(2030, 2, 1))
+# Mondays 09:00 since 2029
+STANDUP = ["UID:standup", "SUMMARY:Standup", "DTSTART:20290101T090000", "DTEND:20290101T091500",
+           "RRULE:FREQ=WEEKLY;BYDAY=MO"]
+
+
+def _feed(*events):
+    body = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for event in events:
+        body += ["BEGIN:VEVENT", *event, "END:VEVENT"]
+    body.append("END:VCALENDAR")
+    return ("\r\n".join(body) + "\r\n").encode()
+
+
+def _starts(events, uid_prefix='standup'):
+    return sorted(e['start'] for e in events if (e['uid'] or '').startswith(uid_prefix))
+
+
+def test_weekly_rule_blocks_every_occurrence_in_the_window():
+    events = parse_ics_events(_feed(STANDUP), *WINDOW)
+    assert _starts(events) == [datetime(2030, 1, d, 9) for d in (7, 14, 21, 28)]
+    assert events[0]['end'] - events[0]['start'] == timedelta(minutes=15)
+    assert events[0]['uid'] == 'standup@2030-01-07T09:00:00'
+    assert events[0]['title'] == 'Standup'
+
+
+def test_exdate_rdate_and_until_in_utc():
+    content = _feed(STANDUP[:4] + [
+        "RRULE:FREQ=WEEKLY;BYDAY=MO;UNTIL=20300121T090000Z",
+        "EXDATE:20300114T090000,20300107T090000",
+        "RDATE;VALUE=DATE-TIME:20300130T090000",
+    ])
+    assert _starts(parse_ics_events(content, *WINDOW)) == [
+        datetime(2030, 1, 21, 9), datetime(2030, 1, 30, 9)
+    ]
+
+
+def test_overrides_replace_or_cancel_their_instance():
+    content = _feed(
+        # Overrides may come before the master
+        ["UID:standup", "RECURRENCE-ID:20300114T090000", "DTSTART:20300115T100000",
+         "DTEND:20300115T101500", "SUMMARY:Standup (moved)"],
+        ["UID:standup", "RECURRENCE-ID:20300121T090000", "DTSTART:20300121T090000",
+         "DTEND:20300121T091500", "STATUS:CANCELLED"],
+        STANDUP,
+    )
+    events = parse_ics_events(content, *WINDOW)
+    assert _starts(events) == [datetime(2030, 1, 7, 9), datetime(2030, 1, 15, 10), datetime(2030, 1, 28, 9)]
+    moved = next(e for e in events if e['start'] == datetime(2030, 1, 15, 10))
+    assert (moved['uid'], moved['title']) == ('standup@2030-01-14T09:00:00', 'Standup (moved)')
+
+
+def test_occurrence_overlapping_the_window_start_is_kept():
+    content = _feed(["UID:night", "DTSTART:20291230T220000", "DTEND:20291231T020000", "RRULE:FREQ=DAILY;COUNT=2"])
+    assert _starts(parse_ics_events(content, *WINDOW), 'night') == [datetime(2029, 12, 31, 22)]
+
+
+def test_expansion_is_cached_per_definition_and_window():
+    content = _feed(STANDUP)
+    parse_ics_events(content, *WINDOW)
+    hits = expand_occurrences.cache_info().hits
+    parse_ics_events(content, *WINDOW)
+    assert expand_occurrences.cache_info().hits == hits + 1
+
+    parse_ics_events(content, WINDOW[0], WINDOW[1] + timedelta(days=7))
+    assert expand_occurrences.cache_info().hits == hits + 1
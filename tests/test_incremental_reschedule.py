@@ -0,0 +1,93 @@
+"""`?reschedule=incremental` on PUT/DELETE /api/tasks/<id>: only tasks whose
+placement can change are re-placed; everything else keeps its slot."""
+
+from datetime import datetime, timedelta
+
+from conftest import login, make_task
+from models import Task
+from scheduler import reschedule_incremental, round_to_next_30min, task_sort_key
+
+
+def _create(client, title, priority):
+    resp = client.post('/api/tasks', json={
+        'title': title, 'priority': priority, 'estimated_duration': 60,
+    })
+    return resp.get_json()['id']
+
+
+def _slots(*ids):
+    return [(Task.query.get(i).scheduled_start, Task.query.get(i).scheduled_end) for i in ids]
+
+
+def _scheduled(client):
+    login(client)
+    a = _create(client, 'a', 9)
+    b = _create(client, 'b', 5)
+    c = _create(client, 'c', 1)
+    assert client.post('/api/schedule').get_json()['status'] == 'done'
+    return a, b, c
+
+
+def test_delete_lets_lower_ranked_tasks_move_up(client):
+    a, b, c = _scheduled(client)
+    (a_slot, b_slot, _) = _slots(a, b, c)
+
+    resp = client.delete(f'/api/tasks/{a}?reschedule=incremental')
+    assert resp.get_json() == {'success': True, 'rescheduled': 2}
+    assert _slots(b, c) == [a_slot, b_slot]
+
+
+def test_non_scheduling_edit_touches_nothing(client):
+    a, b, c = _scheduled(client)
+    before = _slots(a, b, c)
+
+    resp = client.put(f'/api/tasks/{b}?reschedule=incremental', json={'title': 'renamed'})
+    assert resp.get_json()['rescheduled'] == 0
+    assert _slots(a, b, c) == before
+
+
+def test_dragged_task_is_pinned_and_frees_its_slot(client):
+    a, b, c = _scheduled(client)
+    a_slot, b_slot, _ = _slots(a, b, c)
+    later = b_slot[0] + timedelta(days=1)
+
+    resp = client.put(f'/api/tasks/{b}?reschedule=incremental', json={
+        'scheduled_start': later.isoformat(),
+        'scheduled_end': (later + timedelta(hours=1)).isoformat(),
+    })
+    assert resp.get_json()['rescheduled'] == 1
+    assert _slots(a, b, c) == [a_slot, (later, later + timedelta(hours=1)), b_slot]
+
+
+def test_completion_without_flag_keeps_legacy_response(client):
+    a, b, c = _scheduled(client)
+    before = _slots(b, c)
+    resp = client.put(f'/api/tasks/{a}', json={'completed': True})
+    assert 'rescheduled' not in resp.get_json()
+    assert _slots(b, c) == before
+
+
+def test_tasks_ranked_before_pivot_are_left_alone():
+    now = round_to_next_30min(datetime.now())
+    hour = timedelta(hours=1)
+
+    def task(i, priority, start):
+        return make_task(i, priority=priority, scheduled_start=start, scheduled_end=start + hour)
+
+    # Task 1 sits late although an earlier slot is free; task 2 is the mutated one.
+    high = task(1, 9, now + 5 * hour)
+    low = task(2, 1, now + 6 * hour)
+    moved = reschedule_incremental([high, low], [], {}, pivot=task_sort_key(low), changed_id=2)
+    assert moved == [{'id': 2, 'scheduled_start': now, 'scheduled_end': now + hour}]
+
+
+def test_lowered_priority_matches_full_reschedule(client):
+    a, b, c = _scheduled(client)
+    a_slot, b_slot, c_slot = _slots(a, b, c)
+
+    resp = client.put(f'/api/tasks/{a}?reschedule=incremental', json={'priority': 3})
+    assert resp.get_json()['rescheduled'] == 2
+    assert _slots(a, b, c) == [b_slot, a_slot, c_slot]
+
+    assert client.post('/api/schedule').get_json()['status'] == 'done'
+    assert _slots(a, b, c) == [b_slot, a_slot, c_slot]
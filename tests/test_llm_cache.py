@@ -0,0 +1,123 @@
+"""Persistent AI response cache in front of parse_task_with_ai and
+cleanify_note_with_ai: keys, TTL, LRU eviction and counters."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import ai_parser
+from ai_parser import AIProvider, cleanify_note_with_ai, parse_task_with_ai
+from app import db
+from conftest import login
+from llm_cache import LLMCache, cache_key
+from models import LLMCacheEntry
+
+TASKS = [{'title': 'call the bank', 'priority': 7, 'space_id': 1, 'deadline': None,
+          'estimated_duration': 15, 'description': ''}]
+
+
+class CountingProvider(AIProvider):
+    def __init__(self):
+        super().__init__(api_key='stub', model='small')
+        self.calls = []
+        self.fail = False
+
+    def parse_task(self, text, system_prompt):
+        self.calls.append(text)
+        return ai_parser.fallback_tasks(text) if self.fail else [dict(t) for t in TASKS]
+
+    def cleanify(self, note_text, system_prompt):
+        self.calls.append(note_text)
+        if self.fail:
+            raise RuntimeError('unreachable')
+        return note_text.upper()
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = CountingProvider()
+    monkeypatch.setattr(ai_parser, 'get_ai_provider', lambda: provider)
+    return provider
+
+
+@pytest.fixture
+def cache(app):
+    return LLMCache(ttl=3600, max_entries=100)
+
+
+def test_repeated_parse_is_served_from_the_cache(cache, provider):
+    assert parse_task_with_ai('call the bank', 'prompt', cache=cache) == TASKS
+    assert parse_task_with_ai('  call   the\nbank ', 'prompt', cache=cache) == TASKS
+    assert provider.calls == ['call the bank']
+
+    parse_task_with_ai('call the bank', 'other prompt', cache=cache)
+    assert len(provider.calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_parse_key_depends_on_model_and_hour():
+    now = datetime(2030, 1, 7, 9, 15)
+    key = cache_key('parse', 'call the bank', 'prompt', 'small', now)
+    assert cache_key('parse', 'call the bank', 'prompt', 'small', now + timedelta(minutes=30)) == key
+    assert cache_key('parse', 'call the bank', 'prompt', 'small', now + timedelta(hours=1)) != key
+    assert cache_key('parse', 'call the bank', 'prompt', 'large', now) != key
+    # Cleanify does not depend on the time, but keeps the markdown layout
+    assert cache_key('cleanify', '# a\n- b', 'p', 'small', now) == \
+        cache_key('cleanify', '# a\r\n- b\n', 'p', 'small', now + timedelta(days=1))
+    assert cache_key('cleanify', '# a\n- b', 'p', 'small') != cache_key('cleanify', '# a - b', 'p', 'small')
+
+
+def test_fallback_and_failed_results_are_not_cached(cache, provider):
+    provider.fail = True
+    parse_task_with_ai('call the bank', 'prompt', cache=cache)
+    assert cleanify_note_with_ai('messy', 'prompt', cache=cache) == 'messy'
+    assert LLMCacheEntry.query.count() == 0
+
+    provider.fail = False
+    assert cleanify_note_with_ai('messy', 'prompt', cache=cache) == 'MESSY'
+    assert cleanify_note_with_ai('messy', 'prompt', cache=cache) == 'MESSY'
+    assert provider.calls == ['call the bank', 'messy', 'messy']
+
+
+def test_entries_expire_after_the_ttl(cache, provider):
+    parse_task_with_ai('call the bank', 'prompt', cache=cache)
+    entry = LLMCacheEntry.query.one()
+    entry.created_at -= timedelta(seconds=cache.ttl + 1)
+    db.session.commit()
+
+    parse_task_with_ai('call the bank', 'prompt', cache=cache)
+    assert len(provider.calls) == 2
+
+
+def test_least_recently_used_entries_are_evicted(app, provider):
+    cache = LLMCache(ttl=3600, max_entries=2)
+    for text in ('a', 'b'):
+        parse_task_with_ai(text, 'prompt', cache=cache)
+    parse_task_with_ai('a', 'prompt', cache=cache)  # 'a' is now the most recent
+    parse_task_with_ai('c', 'prompt', cache=cache)
+
+    assert cache.evictions == 1
+    assert {e.key for e in LLMCacheEntry.query} == {
+        cache.key('parse', text, 'prompt', 'small') for text in ('a', 'c')
+    }
+
+
+def test_disabled_cache_is_bypassed(app, provider):
+    cache = LLMCache(ttl=0)
+    for _ in range(2):
+        parse_task_with_ai('call the bank', 'prompt', cache=cache)
+    assert len(provider.calls) == 2 and LLMCacheEntry.query.count() == 0
+
+
+def test_promote_to_task_reuses_the_parse_and_reports_stats(client, provider, sample_note):
+    login(client)
+    before = client.get('/api/llm-cache/stats').get_json()
+    for _ in range(2):
+        resp = client.post(f'/api/notes/{sample_note.id}/promote-to-task',
+                           json={'selected_text': 'call the bank'})
+        assert resp.get_json()[0]['title'] == 'call the bank'
+    assert provider.calls == ['call the bank']
+
+    stats = client.get('/api/llm-cache/stats').get_json()
+    assert stats['entries'] == 1
+    assert (stats['hits'] - before['hits'], stats['misses'] - before['misses']) == (1, 1)
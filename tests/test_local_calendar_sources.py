@@ -0,0 +1,96 @@
+"""file:// calendar sources: a single .ics file or a vdirsyncer-style
+directory, re-parsed only when a file's mtime or size changes."""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import calendar_integration
+from app import db
+from calendar_integration import clear_feed_cache, fetch_feed
+from calendar_sync import sync_due_sources
+from models import CalendarSource, ExternalEvent
+
+TOMORROW = (datetime.now() + timedelta(days=1)).strftime('%Y%m%d')
+
+
+def _ics(uid, summary, hour=9):
+    return (
+        "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//test//EN\r\n"
+        f"BEGIN:VEVENT\r\nUID:{uid}\r\nSUMMARY:{summary}\r\n"
+        f"DTSTART:{TOMORROW}T{hour:02d}0000\r\nDTEND:{TOMORROW}T{hour:02d}3000\r\n"
+        "END:VEVENT\r\nEND:VCALENDAR\r\n"
+    )
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Counts calls to the ICS parser."""
+    clear_feed_cache()
+    calls = []
+    parse = calendar_integration.parse_ics_stream
+
+    def counting_parse(lines, window_start, window_end):
+        calls.append(window_start)
+        return parse(lines, window_start, window_end)
+
+    monkeypatch.setattr(calendar_integration, 'parse_ics_stream', counting_parse)
+    yield calls
+    clear_feed_cache()
+
+
+def _touch(path, delta_ns):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + delta_ns))
+
+
+def test_single_file_is_reparsed_only_when_it_changes(tmp_path, parses):
+    path = tmp_path / 'work.ics'
+    path.write_text(_ics('a', 'Standup'))
+    url = f'file://{path}'
+
+    events, info = fetch_feed(url)
+    assert [e['title'] for e in events] == ['Standup'] and info['cache'] == 'miss'
+    assert fetch_feed(url)[1]['cache'] == 'hit'
+    assert len(parses) == 1
+
+    _touch(path, 1_000_000)
+    assert fetch_feed(url)[1]['cache'] == 'miss'
+
+    path.write_text(_ics('a', 'Standup moved', hour=10))
+    _touch(path, 1_000_000)
+    assert [e['title'] for e in fetch_feed(url)[0]] == ['Standup moved']
+    assert len(parses) == 3
+
+
+def test_directory_parses_only_changed_files(tmp_path, parses):
+    for uid, summary in (('a', 'Standup'), ('b', 'Review')):
+        (tmp_path / f'{uid}.ics').write_text(_ics(uid, summary))
+    (tmp_path / 'notes.txt').write_text('not a calendar')
+    (tmp_path / 'empty.ics').write_text('')
+
+    events, info = fetch_feed(f'file://{tmp_path}')
+    assert sorted(e['uid'] for e in events) == ['a', 'b'] and info['cache'] == 'miss'
+
+    (tmp_path / 'c.ics').write_text(_ics('c', 'Lunch', hour=12))
+    parses.clear()
+    events, info = fetch_feed(f'file://{tmp_path}')
+    assert sorted(e['uid'] for e in events) == ['a', 'b', 'c'] and info['cache'] == 'miss'
+    assert len(parses) == 1  # only the new file
+
+    parses.clear()
+    assert fetch_feed(f'file://{tmp_path}')[1]['cache'] == 'hit' and parses == []
+
+
+def test_local_sources_sync_offline(app, tmp_path, parses):
+    (tmp_path / 'a.ics').write_text(_ics('a', 'Standup'))
+    present = CalendarSource(name='vdir', ics_url=f'file://{tmp_path}')
+    missing = CalendarSource(name='gone', ics_url=f'file://{tmp_path}/missing.ics')
+    db.session.add_all([present, missing])
+    db.session.commit()
+
+    statuses = sync_due_sources()
+    assert statuses[present.id]['status'] == 'ok'
+    assert statuses[missing.id]['status'] == 'error'
+    assert [e.title for e in ExternalEvent.query.filter_by(source_id=present.id)] == ['Standup']
@@ -0,0 +1,88 @@
+"""POST /api/tasks/parse/batch: bounded concurrent parsing, NDJSON results
+per input, and one transaction for all created tasks."""
+
+import json
+import threading
+import time
+
+import pytest
+
+import ai_parser
+from ai_parser import AIProvider
+from app import llm_cache
+from conftest import login
+from models import ChangeLog, Task
+
+
+class SlowProvider(AIProvider):
+    """Returns one task per input (two for inputs containing ' and '),
+    recording how many calls run at once."""
+
+    def __init__(self):
+        super().__init__(api_key='stub')
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def parse_task(self, text, system_prompt):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            if text == 'explode':
+                raise RuntimeError('model overloaded')
+            time.sleep(0.02)
+            return [{'title': part, 'priority': 3, 'space_id': None, 'deadline': None,
+                     'estimated_duration': 30, 'description': ''}
+                    for part in text.split(' and ')]
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def provider(app, monkeypatch):
+    provider = SlowProvider()
+    monkeypatch.setattr(ai_parser, 'get_ai_provider', lambda: provider)
+    # The test DB is one shared in-memory connection: keep worker threads off it
+    monkeypatch.setattr(llm_cache, 'ttl', 0)
+    monkeypatch.setitem(app.config, 'AI_BATCH_WORKERS', 3)
+    return provider
+
+
+def _lines(resp):
+    return [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+
+
+def test_batch_streams_each_input_then_commits_all_tasks(client, provider):
+    login(client)
+    inputs = [f'task {i}' for i in range(8)] + ['call bank and pay rent']
+    resp = client.post('/api/tasks/parse/batch', json={'inputs': inputs})
+    assert resp.status_code == 200
+    assert resp.mimetype == 'application/x-ndjson'
+
+    lines = _lines(resp)
+    per_input, final = lines[:-1], lines[-1]
+    assert sorted(line['index'] for line in per_input) == list(range(9))
+    assert final['done'] is True
+    assert [task['title'] for task in final['tasks']] == inputs[:-1] + ['call bank', 'pay rent']
+
+    assert 1 < provider.max_running <= 3
+    assert Task.query.count() == 10
+    assert ChangeLog.query.filter_by(entity_type='task', action='create').count() == 10
+
+
+def test_failed_input_is_reported_and_others_still_created(client, provider):
+    login(client)
+    lines = _lines(client.post('/api/tasks/parse/batch', json={'inputs': ['write report', 'explode']}))
+    errors = [line for line in lines if 'error' in line]
+    assert errors == [{'index': 1, 'error': 'model overloaded'}]
+    assert [task['title'] for task in lines[-1]['tasks']] == ['write report']
+
+
+@pytest.mark.parametrize('body', [{}, {'inputs': []}, {'inputs': 'one'}, {'inputs': ['ok', '  ']},
+                                  {'inputs': ['x'] * 101}])
+def test_invalid_batches_are_rejected(client, provider, body):
+    login(client)
+    assert client.post('/api/tasks/parse/batch', json=body).status_code == 400
+    assert Task.query.count() == 0
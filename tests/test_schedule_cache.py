@@ -0,0 +1,69 @@
+"""POST /api/schedule reuses the last result when the scheduler inputs are
+unchanged (same fingerprint) and writes nothing."""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import db
+from conftest import login
+from scheduler import schedule_fingerprint
+
+
+def _schedule(client):
+    return client.post('/api/schedule').get_json()['result']
+
+
+def _count_writes(statements):
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('UPDATE TASKS', 'UPDATE CALENDAR_SOURCES')):
+            statements.append(statement)
+    return listener
+
+
+def test_unchanged_inputs_short_circuit_without_writes(client):
+    login(client)
+    client.post('/api/tasks', json={'title': 'a', 'priority': 2})
+    client.post('/api/tasks', json={'title': 'b', 'priority': 1})
+
+    first = _schedule(client)
+    assert first['cached'] is False and first['updated_tasks'] == 2
+
+    writes = []
+    listener = _count_writes(writes)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        second = _schedule(client)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert second['cached'] is True
+    assert second['scheduled_tasks'] == 2 and second['updated_tasks'] == 0
+    assert writes == []
+
+
+def test_task_change_invalidates_the_cache(client):
+    login(client)
+    task_id = client.post('/api/tasks', json={'title': 'a'}).get_json()['id']
+    _schedule(client)
+
+    client.put(f'/api/tasks/{task_id}', json={'estimated_duration': 120})
+    assert _schedule(client)['cached'] is False
+
+
+def test_fingerprint_covers_events_constraints_and_time_bucket():
+    now = datetime(2030, 1, 7, 9, 5)
+    tasks = [(1, datetime(2030, 1, 1))]
+    events = [{'start': now, 'end': now + timedelta(hours=1), 'title': 'standup'}]
+    constraints = {1: [{'day': 0, 'start': '09:00', 'end': '17:00'}]}
+    base = schedule_fingerprint(tasks, events, constraints, now)
+
+    # Same 30-minute bucket, event titles and order do not matter
+    renamed = [dict(events[0], title='other')]
+    assert schedule_fingerprint(tasks, renamed, constraints, now + timedelta(minutes=20)) == base
+
+    moved = [dict(events[0], end=now + timedelta(hours=2))]
+    assert schedule_fingerprint(tasks, moved, constraints, now) != base
+    assert schedule_fingerprint(tasks, events, {1: []}, now) != base
+    assert schedule_fingerprint(tasks, events, constraints, now + timedelta(minutes=30)) != base
+    assert schedule_fingerprint([(1, datetime(2030, 1, 2))], events, constraints, now) != base
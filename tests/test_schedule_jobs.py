@@ -0,0 +1,104 @@
+"""POST /api/schedule as a background job: job status polling, single-flight
+coalescing and the DB-level schedule lock."""
+
+import threading
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from app import db
+from conftest import login
+from models import ScheduleLock
+from schedule_jobs import (
+    LOCK_STALE_AFTER,
+    SCHEDULE_LOCK_NAME,
+    ScheduleJobManager,
+    acquire_schedule_lock,
+    release_schedule_lock,
+)
+
+
+def test_schedule_returns_job_and_status_endpoint_reports_result(client):
+    login(client)
+    client.post('/api/tasks', json={'title': 'write report', 'priority': 3})
+
+    resp = client.post('/api/schedule')
+    assert resp.status_code == 202
+    job = resp.get_json()
+    assert job['coalesced'] is False
+
+    status = client.get(f"/api/schedule/jobs/{job['job_id']}").get_json()
+    assert status['status'] == 'done'
+    assert status['result']['scheduled_tasks'] == 1
+
+
+def test_unknown_job_is_404(client):
+    login(client)
+    assert client.get('/api/schedule/jobs/nope').status_code == 404
+
+
+def test_concurrent_submissions_coalesce_onto_in_flight_job():
+    app = Flask(__name__)
+    app.config['SCHEDULE_JOBS_ASYNC'] = True
+    started, release = threading.Event(), threading.Event()
+    runs = []
+
+    def run(options, owner):
+        runs.append(options)
+        started.set()
+        release.wait(5)
+        return {'options': options}
+
+    manager = ScheduleJobManager(app, run)
+    first, coalesced_first = manager.submit({})
+    assert started.wait(5)
+    second, coalesced_second = manager.submit({})
+    other, coalesced_other = manager.submit({'time_budget': 1.0})
+    release.set()
+
+    assert (coalesced_first, coalesced_second, coalesced_other) == (False, True, False)
+    assert second is first and other is not first
+    assert other.finished.wait(5) and first.finished.wait(5)
+    assert runs == [{}, {'time_budget': 1.0}]
+    assert manager.get(first.id).status == 'done'
+
+
+def test_failed_run_is_reported_on_the_job():
+    app = Flask(__name__)
+    app.config['SCHEDULE_JOBS_ASYNC'] = False
+
+    def run(options, owner):
+        raise RuntimeError('calendar unreachable')
+
+    job, _ = ScheduleJobManager(app, run).submit()
+    assert job.status == 'failed'
+    assert job.error == 'calendar unreachable'
+
+
+def test_lock_admits_one_writer_and_expires_when_stale(app):
+    assert acquire_schedule_lock('a')
+    assert not acquire_schedule_lock('b')
+
+    release_schedule_lock('b')  # not the holder: no effect
+    assert not acquire_schedule_lock('b')
+
+    release_schedule_lock('a')
+    assert acquire_schedule_lock('b')
+
+    lock = db.session.get(ScheduleLock, SCHEDULE_LOCK_NAME)
+    lock.acquired_at = datetime.utcnow() - LOCK_STALE_AFTER - timedelta(minutes=1)
+    db.session.commit()
+    assert acquire_schedule_lock('c')
+
+
+def test_schedule_job_fails_while_another_writer_holds_the_lock(client, app, monkeypatch):
+    login(client)
+    monkeypatch.setitem(app.config, 'SCHEDULE_LOCK_WAIT', 0)
+    assert acquire_schedule_lock('other-process')
+
+    job = client.post('/api/schedule').get_json()
+    assert job['status'] == 'failed'
+    assert 'try again' in job['error']
+
+    release_schedule_lock('other-process')
+    assert client.post('/api/schedule').get_json()['status'] == 'done'
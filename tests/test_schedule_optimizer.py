@@ -0,0 +1,65 @@
+"""Optimizing scheduler: local search over placement orders under a budget."""
+
+from datetime import datetime, timedelta
+
+from conftest import login, make_task
+from schedule_optimizer import optimize_schedule
+from scheduler import round_to_next_30min, schedule_tasks
+
+
+def _crowded_workload():
+    """Greedy places the high-priority, deadline-free task first, taking the
+    only window in which the two deadline tasks fit; it still fits after the
+    blocked month itself."""
+    now = round_to_next_30min(datetime.now())
+    blocked = [{'start': now + timedelta(hours=2), 'end': now + timedelta(days=30)}]
+    tasks = [
+        make_task(1, priority=9, duration=120),
+        make_task(2, priority=1, deadline=now + timedelta(hours=2, minutes=1)),
+        make_task(3, priority=1, deadline=now + timedelta(hours=2, minutes=1)),
+    ]
+    return tasks, blocked
+
+
+def test_optimizer_beats_greedy_within_budget():
+    tasks, events = _crowded_workload()
+    greedy = schedule_tasks(tasks, events, {})
+    assert {p['id'] for p in greedy} == {1}
+
+    optimized = optimize_schedule(tasks, events, {}, time_budget=1.0, workers=1, seed=0)
+    assert {p['id'] for p in optimized} == {1, 2, 3}
+
+
+def test_optimizer_keeps_greedy_result_when_everything_fits():
+    tasks = [make_task(i, priority=i % 5) for i in range(1, 6)]
+    assert optimize_schedule(tasks, [], {}, time_budget=5.0, workers=1) == \
+        schedule_tasks(tasks, [], {})
+
+
+def test_optimizer_in_process_pool_returns_by_deadline():
+    tasks, events = _crowded_workload()
+    started = datetime.now()
+    optimized = optimize_schedule(tasks, events, {}, time_budget=0.5, workers=2, seed=1)
+    assert datetime.now() - started < timedelta(seconds=5)
+    assert len(optimized) >= 1
+
+
+def test_schedule_route_rejects_bad_budget(client):
+    login(client)
+    resp = client.post('/api/schedule', json={'optimize': True, 'time_budget': 'soon'})
+    assert resp.status_code == 400
+
+
+def test_unplaceable_task_does_not_hold_the_search_to_its_budget():
+    tasks, events = _crowded_workload()
+    now = round_to_next_30min(datetime.now())
+    tasks.append(make_task(4, deadline=now - timedelta(days=1)))  # overdue
+
+    started = datetime.now()
+    optimized = optimize_schedule(tasks, events, {}, time_budget=10.0, workers=1, seed=0)
+    assert datetime.now() - started < timedelta(seconds=3)
+    assert {p['id'] for p in optimized} == {1, 2, 3}
+
+    started = datetime.now()
+    optimize_schedule([make_task(1), tasks[-1]], [], {}, time_budget=10.0, workers=2)
+    assert datetime.now() - started < timedelta(seconds=3)
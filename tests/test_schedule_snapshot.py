@@ -0,0 +1,51 @@
+"""POST /api/schedule runs on a detached TaskSnapshot and persists placements
+with a single bulk UPDATE covering only the rows that moved."""
+
+from sqlalchemy import event
+
+from app import db, load_task_snapshot
+from conftest import login
+from scheduler import TaskSnapshot
+
+
+def _create(client, title, priority):
+    return client.post('/api/tasks', json={'title': title, 'priority': priority}).get_json()['id']
+
+
+class _UpdateCounter:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('UPDATE TASKS'):
+            self.statements.append((executemany, parameters))
+
+
+def test_snapshot_is_detached_and_skips_completed(client):
+    login(client)
+    kept = _create(client, 'open', 1)
+    done = _create(client, 'done', 1)
+    client.put(f'/api/tasks/{done}', json={'completed': True})
+
+    snapshot = load_task_snapshot()
+    assert [t.id for t in snapshot] == [kept]
+    assert type(snapshot[0]) is TaskSnapshot
+
+
+def test_schedule_writes_changed_rows_in_one_executemany(client):
+    login(client)
+    for i in range(5):
+        _create(client, f't{i}', i)
+
+    counter = _UpdateCounter()
+    event.listen(db.engine, 'before_cursor_execute', counter)
+    try:
+        first = client.post('/api/schedule').get_json()['result']
+        second = client.post('/api/schedule').get_json()['result']
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', counter)
+
+    assert first['scheduled_tasks'] == 5 and first['updated_tasks'] == 5
+    assert [(many, len(params)) for many, params in counter.statements] == [(True, 5)]
+    # Nothing moved on the rerun: no UPDATE at all
+    assert second['scheduled_tasks'] == 5 and second['updated_tasks'] == 0
@@ -0,0 +1,90 @@
+"""Busy-interval index used by `scheduler.find_next_available_slot`.
+
+Unit tests on the scheduler's pure helpers: no Flask app, no DB. Tasks are
+built with conftest's `make_task`.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from conftest import make_task
+from scheduler import BusyIntervals, find_next_available_slot, round_to_next_30min, schedule_tasks
+
+
+def _dt(hour, minute=0, day=1):
+    return datetime(2030, 1, day, hour, minute)
+
+
+def test_busy_intervals_merge_overlapping_and_adjacent():
+    busy = BusyIntervals([
+        (_dt(9), _dt(10)),
+        (_dt(10), _dt(11)),       # adjacent -> merged
+        (_dt(10, 30), _dt(12)),   # overlapping -> merged
+        (_dt(14), _dt(15)),
+    ])
+    assert list(busy) == [(_dt(9), _dt(12)), (_dt(14), _dt(15))]
+
+    busy.add(_dt(12), _dt(14))
+    assert list(busy) == [(_dt(9), _dt(15))]
+
+
+def test_busy_intervals_insert_keeps_order_without_merge():
+    busy = BusyIntervals([(_dt(14), _dt(15))])
+    busy.add(_dt(9), _dt(10))
+    busy.add(_dt(11), _dt(12))
+    assert list(busy) == [(_dt(9), _dt(10)), (_dt(11), _dt(12)), (_dt(14), _dt(15))]
+
+
+def test_first_free_skips_gaps_that_are_too_short():
+    busy = BusyIntervals([
+        (_dt(9), _dt(10)),
+        (_dt(10, 30), _dt(11)),   # 30-min gap before this one
+        (_dt(12), _dt(13)),
+    ])
+    assert busy.first_free(_dt(9), timedelta(minutes=30)) == _dt(10)
+    assert busy.first_free(_dt(9), timedelta(minutes=60)) == _dt(11)
+    assert busy.first_free(_dt(9), timedelta(minutes=90)) == _dt(13)
+    assert busy.conflict(_dt(11), _dt(12)) is None
+    assert busy.conflict(_dt(11), _dt(12, 30)) == (_dt(12), _dt(13))
+
+
+def _first_free_by_walk(busy, start, duration):
+    """Reference: walk the intervals one by one, resuming on the 30-minute grid."""
+    current = start
+    for busy_start, busy_end in busy:
+        if busy_end <= current:
+            continue
+        if busy_start >= current + duration:
+            break
+        current = round_to_next_30min(busy_end)
+    return current
+
+
+def test_first_free_matches_a_linear_walk_while_intervals_are_added():
+    rng = random.Random(7)
+    busy = BusyIntervals()
+    for step in range(600):
+        start = _dt(0) + timedelta(minutes=5 * rng.randrange(3000))
+        busy.add(start, start + timedelta(minutes=5 * rng.randint(1, 30)))
+        for _ in range(3):
+            probe = _dt(0) + timedelta(minutes=5 * rng.randrange(3200))
+            duration = timedelta(minutes=15 * rng.randint(1, 8))
+            assert busy.first_free(probe, duration) == _first_free_by_walk(list(busy), probe, duration)
+    assert busy.copy().first_free(_dt(0), timedelta(hours=2)) == _first_free_by_walk(
+        list(busy), _dt(0), timedelta(hours=2))
+
+
+def test_find_next_available_slot_accepts_legacy_dict_list():
+    busy = [{'start': _dt(9), 'end': _dt(10, 15)}]
+    slot = find_next_available_slot(_dt(9), timedelta(minutes=60), busy, None, {})
+    assert slot == _dt(10, 30)
+
+
+def test_schedule_tasks_places_many_tasks_back_to_back():
+    tasks = [make_task(i, duration=30) for i in range(200)]
+    result = schedule_tasks(tasks, [], {})
+    assert len(result) == 200
+    starts = [r['scheduled_start'] for r in result]
+    assert starts == sorted(starts)
+    for prev, nxt in zip(result, result[1:]):
+        assert prev['scheduled_end'] == nxt['scheduled_start']
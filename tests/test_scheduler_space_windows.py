@@ -0,0 +1,72 @@
+"""Compiled weekly space windows (`scheduler.SpaceWindows`).
+
+2030-01-07 is a Monday, so `day=0` constraints apply to it.
+"""
+
+from datetime import datetime, timedelta
+
+from conftest import make_task
+from scheduler import (
+    SpaceWindows,
+    compile_space_constraints,
+    find_next_available_slot,
+    get_next_valid_time_for_space,
+    is_within_space_constraints,
+    schedule_tasks,
+)
+
+MONDAY = datetime(2030, 1, 7)
+
+WORK = [
+    {'day': 0, 'start': '09:00', 'end': '12:00'},
+    {'day': 0, 'start': '13:00', 'end': '17:00'},
+    {'day': 2, 'start': '18:00', 'end': '22:00'},
+]
+
+
+def test_contains_requires_slot_inside_one_window():
+    windows = SpaceWindows(WORK)
+    assert windows.contains(MONDAY.replace(hour=9), MONDAY.replace(hour=12))
+    assert not windows.contains(MONDAY.replace(hour=11), MONDAY.replace(hour=13))
+    assert not windows.contains(MONDAY.replace(hour=8, minute=30), MONDAY.replace(hour=9, minute=30))
+    assert windows.max_length == 4 * 3600
+
+
+def test_next_start_wraps_to_next_week():
+    windows = SpaceWindows(WORK)
+    assert windows.next_start(MONDAY.replace(hour=12)) == MONDAY.replace(hour=13)
+    assert windows.next_start(MONDAY.replace(hour=13)) == MONDAY.replace(hour=13)
+    assert windows.next_start(MONDAY.replace(hour=13), inclusive=False) == \
+        MONDAY + timedelta(days=2, hours=18)
+    thursday = MONDAY + timedelta(days=3)
+    assert windows.next_start(thursday) == MONDAY + timedelta(days=7, hours=9)
+
+
+def test_legacy_helpers_match_raw_and_compiled_constraints():
+    raw = {'work': WORK}
+    compiled = compile_space_constraints(raw)
+    slot = (MONDAY.replace(hour=14), MONDAY.replace(hour=15))
+    assert is_within_space_constraints(*slot, 'work', raw)
+    assert is_within_space_constraints(*slot, 'work', compiled)
+    assert is_within_space_constraints(*slot, 'unknown', raw)
+    assert get_next_valid_time_for_space(MONDAY, 'work', raw) == MONDAY.replace(hour=9)
+    assert get_next_valid_time_for_space(MONDAY, 'work', compiled) == MONDAY.replace(hour=9)
+
+
+def test_compile_shares_one_table_for_id_and_name_keys():
+    compiled = compile_space_constraints({1: WORK, 'work': WORK, 2: []})
+    assert compiled[1] is compiled['work']
+    assert compiled[2] is None
+
+
+def test_task_longer_than_every_window_is_rejected():
+    slot = find_next_available_slot(MONDAY, timedelta(hours=5), [], 'work', {'work': WORK})
+    assert slot is None
+
+
+def test_schedule_tasks_uses_space_id_constraints():
+    task = make_task(1, space_id=7)
+    only_sunday_night = [{'day': 6, 'start': '21:00', 'end': '23:00'}]
+    [placed] = schedule_tasks([task], [], {7: only_sunday_night})
+    assert placed['scheduled_start'].weekday() == 6
+    assert placed['scheduled_start'].hour in (21, 22)